@@ -0,0 +1,17 @@
+# ============================================================
+# AGENT FEDERATED DUKCAPIL
+# ============================================================
+# Logika agent dipakai bersama semua instansi: Training/agent.py.
+# Script ini hanya mengisi --instansi & folder instansi.
+#
+#   python agent.py            # jalan terus
+#   python agent.py --once     # satu siklus lalu keluar (cron)
+import sys
+import runpy
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent
+AGENT_PY = BASE_DIR.parent / "Training" / "agent.py"
+
+sys.argv[1:1] = ["--instansi", "dukcapil", "--base-dir", str(BASE_DIR)]
+runpy.run_path(str(AGENT_PY), run_name="__main__")
@@ -1,10 +1,18 @@
+import io
 import os
+import csv
+import json
+import itertools
 import joblib
-import numpy as np
 import pandas as pd
-from flask import Flask, render_template, request, jsonify
+from flask import Flask, Response, render_template, request, jsonify, stream_with_context
 from keras.layers import TFSMLayer
 
+from global_model import load_global_model
+from dispatcher import MicroBatcher
+from input_encoder import InputEncoder
+from model_cache import ModelCache
+
 # ============================================================
 # ⚙️ Konfigurasi Flask
 # ============================================================
@@ -30,87 +38,47 @@ MODELS = {
         "path": "Models/saved_global2_tff",
         "preproc": "Models/fitur_global.pkl"
     },
+    # Model global FedAvg dari bobot (file lokal atau URL server .../model/latest),
+    # dimuat per layer. Semua instansi memakai 53 FEATURE_COLS yang sama.
+    "global": {
+        "weights": os.environ.get("GLOBAL_WEIGHTS", "Models/global_model_fedavg_20251216_040729.npz"),
+        "preproc": "Models/saved_dinsos_tff/preprocess.pkl"
+    },
 }
 
 
 # ============================================================
-# 🧩 Fungsi Preprocessing Input
+# 🧠 Prediksi Model dengan Threshold Otomatis Adaptif
 # ============================================================
-def preprocess_input(data, preproc):
-    """Melakukan preprocessing input dari form sesuai fitur model"""
-    feature_cols = list(preproc["FEATURE_COLS"])
-    mins = pd.Series(preproc["mins"]).reindex(feature_cols).fillna(0)
-    rng = pd.Series(preproc["rng"]).reindex(feature_cols).replace(0, 1)
-
-    def norm(x):
-        return str(x).strip().lower()
-
-    CANON = {
-        "status_pekerjaan": {
-            "karyawan tetap": "pegawai tetap",
-            "pegawai tetap": "pegawai tetap",
-            "pns": "PNS",
-            "buruh": "buruh harian",
-        },
-        "kondisi_rumah": {
-            "tdk layak": "tidak layak",
-            "sangat sederhana": "sangat sederhana",
-            "semi permanen": "semi permanen",
-            "sederhana": "sederhana",
-            "layak": "layak",
-            "mewah": "mewah",
-        }
-    }
-
-    # DataFrame kosong berisi semua kolom fitur
-    df = pd.DataFrame([0]*len(feature_cols), index=feature_cols).T
+def load_model(model_name, cfg):
+    """(predict, encoder) satu entri MODELS; dipanggil ModelCache saat (re)load."""
+    preproc = joblib.load(cfg["preproc"])
+    if "weights" in cfg:
+        # Bobot FedAvg → arsitektur Keras, dipasang per layer
+        model = load_global_model(cfg["weights"], len(preproc["FEATURE_COLS"]))
 
-    # Isi kolom numerik
-    for num_col in ["penghasilan", "jumlah_tanggungan", "lama_tinggal_tahun",
-                    "jumlah_anggota_kk", "usia_kepala_keluarga"]:
-        if num_col in data and str(data[num_col]).strip() != "":
-            try:
-                df[num_col] = float(data[num_col])
-            except:
-                df[num_col] = 0.0
-
-    # One-hot encoding (exact match)
-    for col in feature_cols:
-        if "_" not in col:
-            continue
-        base, cat = col.rsplit("_", 1)
-        if base in data:
-            raw = data[base]
-            v = norm(raw)
-            if base in CANON:
-                v = norm(CANON[base].get(v, raw))
-            if norm(cat) == v:
-                df[col] = 1
-
-    # Normalisasi sesuai skala training
-    df = ((df - mins) / rng).fillna(0.0)
-    return df.astype("float32").to_numpy()
+        def predict(X):
+            return model(X, training=False).numpy().reshape(-1)
+    else:
+        model = TFSMLayer(cfg["path"], call_endpoint="serving_default")
 
+        def predict(X):
+            outputs = model(X, training=False)
+            return list(outputs.values())[0].numpy().reshape(-1)
+    # preprocessing input dikompilasi sekali per model (input_encoder.py)
+    return predict, InputEncoder(preproc)
 
-# ============================================================
-# 🧠 Prediksi Model dengan Threshold Otomatis Adaptif
-# ============================================================
-def predict_with_threshold(model_name, data):
-    model_path = MODELS[model_name]["path"]
-    preproc_path = MODELS[model_name]["preproc"]
 
-    if not os.path.exists(model_path):
-        return {"error": f"Model {model_name} tidak ditemukan."}
+# satu cache per proses, dipakai bersama semua thread request
+model_cache = ModelCache(MODELS, load_model)
 
-    # Load model & preprocessor
-    model = TFSMLayer(model_path, call_endpoint="serving_default")
-    preproc = joblib.load(preproc_path)
+# request /predict tunggal yang bersamaan digabung jadi satu forward pass
+# (dispatcher.py); MICROBATCH=0 → setiap request memanggil model sendiri
+batcher = MicroBatcher() if os.environ.get("MICROBATCH", "1") != "0" else None
 
-    # Preprocess input
-    X = preprocess_input(data, preproc)
-    outputs = model(X, training=False)
-    y_prob = float(list(outputs.values())[0].numpy().flatten()[0])
 
+def threshold_result(y_prob):
+    """Probabilitas model → {prediksi, probabilitas, threshold}."""
     # ========================================================
     # 🔍 Threshold Otomatis (Dynamic)
     # ========================================================
@@ -134,6 +102,78 @@ def predict_with_threshold(model_name, data):
     }
 
 
+def predict_with_threshold(model_name, data):
+    try:
+        loaded = model_cache.get(model_name)
+    except FileNotFoundError:
+        return {"error": f"Model {model_name} tidak ditemukan."}
+
+    X = loaded.encoder.encode(data)
+    if batcher is not None:
+        y_prob = batcher.predict(loaded, X[0])
+    else:
+        y_prob = float(loaded.predict(X)[0])
+    return threshold_result(y_prob)
+
+
+# ============================================================
+# 📚 Scoring Batch (array JSON / upload CSV)
+# ============================================================
+# Input dibaca & di-preprocess per chunk BATCH_CHUNK baris, satu forward pass
+# per chunk, hasil di-stream per chunk → memori sebanding ukuran chunk, bukan
+# ukuran file (upload CSV besar di-spool werkzeug ke disk). Array JSON sudah
+# utuh di memori saat diparse; untuk jutaan baris gunakan CSV.
+BATCH_CHUNK = int(os.environ.get("BATCH_CHUNK", 4096))
+
+
+class BatchInputError(ValueError):
+    pass
+
+
+def batch_chunks(encoder, id_col=None):
+    """Generator (baris awal, ids, X) dari request; BatchInputError jika input tidak valid."""
+    if "file" in request.files or request.mimetype == "text/csv":
+        if "file" in request.files:
+            # file upload ditutup werkzeug saat view selesai, sebelum response
+            # di-stream → stream dilepas dari FileStorage dan ditutup generator
+            upload = request.files["file"]
+            source, upload.stream = upload.stream, io.BytesIO()
+        else:
+            source = request.stream
+        try:
+            reader = pd.read_csv(source, dtype=str, keep_default_na=False, chunksize=BATCH_CHUNK)
+            first = next(reader, None)
+        except (pd.errors.EmptyDataError, pd.errors.ParserError, UnicodeDecodeError) as e:
+            source.close()
+            raise BatchInputError(f"CSV tidak valid: {e}")
+        if first is None or first.empty:
+            source.close()
+            raise BatchInputError("CSV tidak berisi baris data")
+        if id_col and id_col not in first.columns:
+            source.close()
+            raise BatchInputError(f"Kolom id '{id_col}' tidak ada di CSV")
+
+        def frames():
+            start = 0
+            try:
+                for df in itertools.chain([first], reader):
+                    ids = df[id_col].tolist() if id_col else None
+                    yield start, ids, encoder.encode_frame(df)
+                    start += len(df)
+            finally:
+                source.close()
+        return frames()
+
+    records = request.get_json(force=True, silent=True)
+    if not isinstance(records, list) or not all(isinstance(d, dict) for d in records):
+        raise BatchInputError("Body harus array JSON berisi objek, atau upload CSV (field 'file')")
+
+    def chunks():
+        for start in range(0, len(records), BATCH_CHUNK):
+            part = records[start:start + BATCH_CHUNK]
+            ids = [d.get(id_col) for d in part] if id_col else None
+            yield start, ids, encoder.encode_records(part)
+    return chunks()
 # ============================================================
 # 🌐 ROUTES
 # ============================================================
@@ -148,12 +188,105 @@ def predict(model):
         return jsonify({"error": "Model tidak dikenali"}), 400
 
     data = request.get_json(force=True)
-    result = predict_with_threshold(model, data)
+    try:
+        result = predict_with_threshold(model, data)
+    except TimeoutError as e:   # antrean micro-batch macet / model terlalu lambat
+        return jsonify({"error": str(e)}), 503
     return jsonify(result)
 
 
+@app.route("/predict-batch/<model>", methods=["POST"])
+def predict_batch(model):
+    """
+    Scoring banyak pemohon: array JSON (body) atau CSV (upload field 'file' /
+    body text/csv). Output di-stream: NDJSON (default) atau CSV (?format=csv
+    / Accept: text/csv). ?id=<kolom> menyertakan kolom id input di setiap baris.
+    """
+    if model not in MODELS:
+        return jsonify({"error": "Model tidak dikenali"}), 400
+    try:
+        # satu versi model untuk seluruh batch walau terjadi hot reload
+        loaded = model_cache.get(model)
+    except FileNotFoundError:
+        return jsonify({"error": f"Model {model} tidak ditemukan."}), 404
+
+    id_col = request.args.get("id")
+    fmt = request.args.get("format") or (
+        "csv" if request.accept_mimetypes.best_match(["application/x-ndjson", "text/csv"]) == "text/csv"
+        else "ndjson")
+    if fmt not in ("ndjson", "csv"):
+        return jsonify({"error": "format harus ndjson atau csv"}), 400
+    try:
+        chunks = batch_chunks(loaded.encoder, id_col)
+    except BatchInputError as e:
+        return jsonify({"error": str(e)}), 400
+
+    fields = ["baris"] + ([id_col] if id_col else []) + ["prediksi", "probabilitas", "threshold"]
+
+    def rows():
+        for start, ids, X in chunks:
+            probs = loaded.predict(X)
+            for i, y_prob in enumerate(probs.tolist()):
+                row = {"baris": start + i}
+                if id_col:
+                    row[id_col] = ids[i]
+                row.update(threshold_result(y_prob))
+                yield row
+
+    def ndjson():
+        try:
+            batch = []
+            for row in rows():
+                batch.append(json.dumps(row))
+                if len(batch) == BATCH_CHUNK:
+                    yield "\n".join(batch) + "\n"
+                    batch = []
+            if batch:
+                yield "\n".join(batch) + "\n"
+        except Exception as e:   # status HTTP sudah terkirim → error sebagai baris terakhir
+            yield json.dumps({"error": str(e)}) + "\n"
+
+    def as_csv():
+        buf = io.StringIO()
+        writer = csv.DictWriter(buf, fieldnames=fields, lineterminator="\n")
+        writer.writeheader()
+        try:
+            for n, row in enumerate(rows(), 1):
+                writer.writerow(row)
+                if n % BATCH_CHUNK == 0:
+                    yield buf.getvalue()
+                    buf.seek(0)
+                    buf.truncate()
+        except Exception as e:
+            buf.write(f"# error: {e}\n")
+        yield buf.getvalue()
+
+    body, mimetype = (as_csv(), "text/csv") if fmt == "csv" else (ndjson(), "application/x-ndjson")
+    return Response(stream_with_context(body), mimetype=mimetype,
+                    headers={"X-Model-Sha256": loaded.sha256[:12]})
+
+
+@app.route("/microbatch")
+def microbatch_stats():
+    """Kedalaman antrean & histogram ukuran batch micro-batching per model."""
+    if batcher is None:
+        return jsonify({"enabled": False})
+    return jsonify({"enabled": True, **batcher.stats()})
+
+
+@app.route("/ready")
+def ready():
+    """Status warm-up & waktu load tiap model (503 selama warm-up berjalan / model gagal dimuat)."""
+    status = model_cache.status()
+    return jsonify(status), 200 if status["ready"] else 503
+
+
 # ============================================================
 # 🚀 MAIN ENTRY
 # ============================================================
+# warm-up semua model saat proses start (MODEL_WARMUP=0 → load saat request pertama)
+if os.environ.get("MODEL_WARMUP", "1") != "0":
+    model_cache.warm_async()
+
 if __name__ == "__main__":
     app.run(debug=True)
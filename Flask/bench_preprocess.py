@@ -0,0 +1,132 @@
+"""
+Benchmark preprocessing input per request: DataFrame pandas (versi lama
+app.py) vs InputEncoder terkompilasi (input_encoder.py), plus cek bit-identik.
+Jalur batch (encode_records / encode_frame, endpoint /predict-batch) juga
+dicek identik dengan encode per baris.
+
+    python bench_preprocess.py
+    python bench_preprocess.py --preproc Models/saved_kemenkes_tff/preprocess.pkl --n 20000
+"""
+import io
+import time
+import argparse
+
+import joblib
+import numpy as np
+import pandas as pd
+
+from input_encoder import CANON, NUMERIC_COLS, InputEncoder, norm
+
+
+def preprocess_input_pandas(data, preproc):
+    """Implementasi lama app.preprocess_input (referensi)."""
+    feature_cols = list(preproc["FEATURE_COLS"])
+    mins = pd.Series(preproc["mins"]).reindex(feature_cols).fillna(0)
+    rng = pd.Series(preproc["rng"]).reindex(feature_cols).replace(0, 1)
+
+    df = pd.DataFrame([0]*len(feature_cols), index=feature_cols).T
+
+    for num_col in NUMERIC_COLS:
+        if num_col in data and str(data[num_col]).strip() != "":
+            try:
+                df[num_col] = float(data[num_col])
+            except:
+                df[num_col] = 0.0
+
+    for col in feature_cols:
+        if "_" not in col:
+            continue
+        base, cat = col.rsplit("_", 1)
+        if base in data:
+            raw = data[base]
+            v = norm(raw)
+            if base in CANON:
+                v = norm(CANON[base].get(v, raw))
+            if norm(cat) == v:
+                df[col] = 1
+
+    df = ((df - mins) / rng).fillna(0.0)
+    return df.astype("float32").to_numpy()
+
+
+def sample_inputs(preproc, n, seed=0):
+    """Input form acak: kategori training, varian CANON/kapital/spasi, nilai kosong & rusak."""
+    rnd = np.random.default_rng(seed)
+    cats = {}
+    for col in preproc["FEATURE_COLS"]:
+        if "_" in col and col not in NUMERIC_COLS:
+            base, cat = col.rsplit("_", 1)
+            cats.setdefault(base, []).append(cat)
+    for base, variants in CANON.items():
+        cats.setdefault(base, []).extend(variants)
+    odd = ["", " ", "abc", "nan", "inf", "-1e3", None, True, "1,5"]
+
+    inputs = []
+    for _ in range(n):
+        data = {}
+        for col in NUMERIC_COLS:
+            r = rnd.random()
+            if r < 0.8:
+                data[col] = str(round(float(rnd.uniform(0, 5e6 if col == "penghasilan" else 80)), 2))
+            elif r < 0.9:
+                data[col] = odd[rnd.integers(len(odd))]
+        for base, values in cats.items():
+            r = rnd.random()
+            if r < 0.85:
+                v = values[rnd.integers(len(values))]
+                data[base] = v.upper() if rnd.random() < 0.2 else f" {v} " if rnd.random() < 0.2 else v
+            elif r < 0.92:
+                data[base] = odd[rnd.integers(len(odd))]
+        inputs.append(data)
+    return inputs
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--preproc", default="Models/saved_dinsos_tff/preprocess.pkl")
+    parser.add_argument("--n", type=int, default=5000, help="jumlah input acak")
+    args = parser.parse_args()
+
+    preproc = joblib.load(args.preproc)
+    inputs = sample_inputs(preproc, args.n)
+
+    t0 = time.perf_counter()
+    encoder = InputEncoder(preproc)
+    t_compile = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    ref = [preprocess_input_pandas(d, preproc) for d in inputs]
+    t_pandas = (time.perf_counter() - t0) / len(inputs)
+
+    t0 = time.perf_counter()
+    out = [encoder.encode(d) for d in inputs]
+    t_encoder = (time.perf_counter() - t0) / len(inputs)
+
+    mismatch = [i for i, (a, b) in enumerate(zip(ref, out))
+                if a.shape != b.shape or a.dtype != b.dtype or a.tobytes() != b.tobytes()]
+
+    # batch JSON: array dict apa adanya
+    t0 = time.perf_counter()
+    batch = encoder.encode_records(inputs)
+    t_records = (time.perf_counter() - t0) / len(inputs)
+    mismatch += [i for i in range(len(inputs)) if batch[i].tobytes() != out[i][0].tobytes()]
+
+    # batch CSV: semua nilai string, sel kosong = "" (kolom ada di setiap baris)
+    as_csv = [{col: "" if d.get(col) is None else str(d.get(col)) for col in encoder.input_cols}
+              for d in inputs]
+    csv_text = pd.DataFrame(as_csv).to_csv(index=False)
+    t0 = time.perf_counter()
+    frame = pd.read_csv(io.StringIO(csv_text), dtype=str, keep_default_na=False)
+    batch = encoder.encode_frame(frame)
+    t_frame = (time.perf_counter() - t0) / len(inputs)
+    mismatch += [i for i, d in enumerate(as_csv) if batch[i].tobytes() != encoder.encode(d)[0].tobytes()]
+
+    print(f"{args.preproc}: {encoder.dim} fitur, {len(inputs):,} input")
+    print(f"  compile encoder : {t_compile * 1e3:8.2f} ms (sekali per model)")
+    print(f"  pandas          : {t_pandas * 1e6:8.1f} µs / request")
+    print(f"  InputEncoder    : {t_encoder * 1e6:8.1f} µs / request  ({t_pandas / t_encoder:.0f}× lebih cepat)")
+    print(f"  batch JSON      : {t_records * 1e6:8.1f} µs / baris")
+    print(f"  batch CSV       : {t_frame * 1e6:8.1f} µs / baris (termasuk read_csv)")
+    print(f"  bit-identik     : {'ya' if not mismatch else f'TIDAK ({len(mismatch)} beda, mis. input {mismatch[0]})'}")
+    if mismatch:
+        raise SystemExit(1)
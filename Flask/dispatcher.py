@@ -0,0 +1,168 @@
+# ============================================================
+# 🚦 MICRO-BATCHING — gabungkan request /predict tunggal yang bersamaan
+# ============================================================
+# Form web mengirim satu pemohon per request; di bawah beban setiap request
+# menjalankan forward pass sendiri (overhead TF per panggilan jauh lebih
+# besar dari komputasi MLP kecil kita). Dispatcher ini mengantrekan baris
+# fitur per model; satu thread worker per model mengambil baris pertama,
+# menunggu paling lama MAX_WAIT_MS untuk baris lain (atau sampai MAX_BATCH),
+# lalu menjalankan satu forward pass untuk semuanya dan mengembalikan
+# probabilitas ke masing-masing request.
+#
+# Selama forward pass berjalan, request baru menumpuk di antrean dan ikut
+# batch berikutnya, jadi makin tinggi beban makin besar batch-nya. Pada beban
+# rendah biaya tambahannya paling lama MAX_WAIT_MS per request.
+# stats() → kedalaman antrean & histogram ukuran batch per model.
+#
+# Request menunggu hasil paling lama MICROBATCH_TIMEOUT_S; setelah itu barisnya
+# dibatalkan (dilewati worker jika belum diambil) dan request gagal dengan
+# TimeoutError, bukan menggantung selamanya.
+import os
+import time
+import queue
+import threading
+from concurrent.futures import Future, TimeoutError as FutureTimeout
+
+import numpy as np
+
+MAX_WAIT_MS = float(os.environ.get("MICROBATCH_MAX_WAIT_MS", 2.0))
+MAX_BATCH = int(os.environ.get("MICROBATCH_MAX_BATCH", 64))
+TIMEOUT_S = float(os.environ.get("MICROBATCH_TIMEOUT_S", 30.0))
+
+
+def _bucket(n: int) -> str:
+    """Bucket histogram pangkat dua: 1, 2, 3-4, 5-8, 9-16, ..."""
+    if n <= 2:
+        return str(n)
+    hi = 1 << (n - 1).bit_length()
+    return f"{hi // 2 + 1}-{hi}"
+
+
+class _Stats:
+    """Counter per model; ditulis thread request & worker, jadi semua akses lewat lock."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.batches = 0
+        self.max_queue_depth = 0
+        self.wait_s = 0.0          # total waktu baris di antrean sebelum forward pass
+        self.predict_s = 0.0
+        self.histogram = {}
+
+    def record_depth(self, depth: int):
+        with self._lock:
+            if depth > self.max_queue_depth:
+                self.max_queue_depth = depth
+
+    def record_batch(self, size: int, wait_s: float, predict_s: float):
+        key = _bucket(size)
+        with self._lock:
+            self.requests += size
+            self.batches += 1
+            self.wait_s += wait_s
+            self.predict_s += predict_s
+            self.histogram[key] = self.histogram.get(key, 0) + 1
+
+    def snapshot(self) -> dict:
+        """Salinan konsisten (requests, batches & rata-rata dari update yang sama)."""
+        with self._lock:
+            s = {"max_queue_depth": self.max_queue_depth, "requests": self.requests,
+                 "batches": self.batches, "wait_s": self.wait_s, "predict_s": self.predict_s,
+                 "histogram": dict(self.histogram)}
+        return s
+
+
+class MicroBatcher:
+    def __init__(self, max_wait_ms: float = MAX_WAIT_MS, max_batch: int = MAX_BATCH,
+                 timeout_s: float = TIMEOUT_S):
+        self.max_wait = max_wait_ms / 1000.0
+        self.max_batch = max_batch
+        self.timeout = timeout_s
+        self._queues = {}
+        self._stats = {}
+        self._lock = threading.Lock()
+
+    def _queue(self, name) -> queue.Queue:
+        q = self._queues.get(name)
+        if q is None:
+            with self._lock:
+                q = self._queues.get(name)
+                if q is None:
+                    q = self._queues[name] = queue.Queue()
+                    self._stats[name] = _Stats()
+                    threading.Thread(target=self._worker, args=(name, q),
+                                     name=f"microbatch-{name}", daemon=True).start()
+        return q
+
+    def predict(self, loaded, row: np.ndarray) -> float:
+        """Probabilitas satu baris fitur (dim,) lewat batch bersama request lain."""
+        q = self._queue(loaded.name)
+        future = Future()
+        q.put((loaded, row, future, time.perf_counter()))
+        self._stats[loaded.name].record_depth(q.qsize())
+        try:
+            return future.result(timeout=self.timeout)
+        except FutureTimeout:
+            future.cancel()
+            raise TimeoutError(f"Model {loaded.name}: tidak ada hasil dalam {self.timeout:g}s") from None
+
+    def _collect(self, q: queue.Queue) -> list:
+        batch = [q.get()]
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.max_batch:
+            remaining = deadline - time.monotonic()
+            try:
+                batch.append(q.get(timeout=remaining) if remaining > 0 else q.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _worker(self, name, q: queue.Queue):
+        stats = self._stats[name]
+        while True:
+            # baris yang request-nya sudah timeout (future dibatalkan) dilewati
+            batch = [item for item in self._collect(q) if item[2].set_running_or_notify_cancel()]
+            if not batch:
+                continue
+            t0 = time.perf_counter()
+            # normalnya satu versi model; saat hot reload baris dari versi
+            # lama & baru di-forward terpisah
+            groups = {}
+            for item in batch:
+                groups.setdefault(id(item[0]), []).append(item)
+            for items in groups.values():
+                try:
+                    X = np.stack([row for _, row, _, _ in items])
+                    probs = items[0][0].predict(X)
+                    if len(probs) != len(items):
+                        raise ValueError(f"Model {items[0][0].name} mengembalikan {len(probs)} "
+                                         f"probabilitas untuk {len(items)} baris")
+                    for (_, _, future, _), p in zip(items, probs.tolist()):
+                        future.set_result(p)
+                except Exception as e:
+                    for _, _, future, _ in items:
+                        if not future.done():
+                            future.set_exception(e)
+
+            stats.record_batch(len(batch), sum(t0 - queued for _, _, _, queued in batch),
+                               time.perf_counter() - t0)
+
+    def stats(self) -> dict:
+        out = {"max_wait_ms": self.max_wait * 1000.0, "max_batch": self.max_batch, "models": {}}
+        for name, q in list(self._queues.items()):
+            s = self._stats[name].snapshot()
+            out["models"][name] = {
+                "queue_depth": q.qsize(),
+                "max_queue_depth": s["max_queue_depth"],
+                "requests": s["requests"],
+                "batches": s["batches"],
+                "mean_batch_size": round(s["requests"] / s["batches"], 2) if s["batches"] else None,
+                "mean_queue_wait_ms": (round(s["wait_s"] / s["requests"] * 1000, 3)
+                                       if s["requests"] else None),
+                "mean_predict_ms": (round(s["predict_s"] / s["batches"] * 1000, 3)
+                                    if s["batches"] else None),
+                "batch_size_histogram": dict(sorted(s["histogram"].items(),
+                                                    key=lambda kv: int(kv[0].split("-")[0]))),
+            }
+        return out
@@ -0,0 +1,97 @@
+# ============================================================
+# 🌍 MODEL GLOBAL FEDAVG — build arsitektur & muat bobot per layer
+# ============================================================
+# Sumber bobot:
+#   - file lokal (.npz lama atau container dari Server/codec.py)
+#   - URL server, mis. https://federatedinstitusi.up.railway.app/model/latest
+#     → index diambil dari <url>/layers, lalu setiap layer diunduh terpisah
+#       dan dicek sha256-nya sebelum dipasang ke model.
+import sys
+import hashlib
+from pathlib import Path
+
+import numpy as np
+import tensorflow as tf
+
+# codec container dipakai bersama dengan server
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "Server"))
+import codec
+
+TIMEOUT = 60  # detik per request layer
+
+
+def build_global_model(feature_dim):
+    """Arsitektur yang sama dengan training institusi (Dense-BN-Dropout-Dense-Dense-Dense)."""
+    return tf.keras.Sequential([
+        tf.keras.layers.Input(shape=(feature_dim,)),
+        tf.keras.layers.Dense(128, activation="relu"),
+        tf.keras.layers.BatchNormalization(),
+        tf.keras.layers.Dropout(0.3),
+        tf.keras.layers.Dense(64, activation="relu"),
+        tf.keras.layers.Dense(32, activation="relu"),
+        tf.keras.layers.Dense(1, activation="sigmoid"),
+    ])
+
+
+class RemoteWeights:
+    """Bobot di server, diunduh per layer lewat /model/<file>/layer/<i>."""
+
+    def __init__(self, model_url: str):
+        import requests
+
+        self._session = requests.Session()
+        model_url = model_url.rstrip("/")
+        res = self._session.get(f"{model_url}/layers", timeout=TIMEOUT)
+        res.raise_for_status()
+        self.index = res.json()
+        # "latest" di-resolve ke file konkret agar semua layer dari versi yang sama
+        self.base = model_url.rsplit("/", 1)[0] + "/" + self.index["file"]
+        self.names = [t["name"] for t in self.index["layers"]]
+
+    def __len__(self):
+        return len(self.names)
+
+    def __getitem__(self, i: int) -> np.ndarray:
+        t = self.index["layers"][i]
+        res = self._session.get(f"{self.base}/layer/{i}", timeout=TIMEOUT)
+        res.raise_for_status()
+        if hashlib.sha256(res.content).hexdigest() != t["sha256"]:
+            raise ValueError(f"sha256 layer {t['name']} tidak cocok")
+        return np.frombuffer(res.content, dtype=np.dtype(t["dtype"])).reshape(t["shape"])
+
+    def close(self):
+        self._session.close()
+
+
+def open_weights(source):
+    """Sumber bobot (path lokal / URL server) → objek berindeks per tensor."""
+    source = str(source)
+    if source.startswith(("http://", "https://")):
+        return RemoteWeights(source)
+    return codec.LazyWeights(source)
+
+
+def load_global_model(source, feature_dim):
+    """
+    Bangun model lalu pasang bobot layer demi layer: hanya tensor milik layer
+    yang sedang dipasang yang dibaca/diunduh.
+    """
+    model = build_global_model(feature_dim)
+    weights = open_weights(source)
+    try:
+        pos = 0
+        for layer in model.layers:
+            n = len(layer.weights)
+            if n == 0:
+                continue
+            layer.set_weights([weights[pos + k] for k in range(n)])
+            pos += n
+
+        if pos != len(weights):
+            raise ValueError(
+                f"Jumlah tensor tidak sesuai arsitektur: model {pos}, file {len(weights)}"
+            )
+    finally:
+        weights.close()
+    return model
+
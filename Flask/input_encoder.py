@@ -0,0 +1,175 @@
+# ============================================================
+# 🧩 ENCODER INPUT TERKOMPILASI — form/JSON → baris fitur float32
+# ============================================================
+# Pengganti preprocess_input berbasis DataFrame satu baris. Semua yang tidak
+# bergantung pada input dihitung sekali per model (saat ModelCache memuat
+# model):
+#   - (kolom dasar, nilai kanonik) → index kolom one-hot
+#   - index kolom numerik & vektor mins / rng float64
+#   - baris "kosong" ((0 - mins) / rng) dan nilai one-hot aktif
+#     ((1 - mins) / rng), keduanya sudah float32
+# Per request hanya: salin baris kosong, isi kolom numerik, set index one-hot.
+# encode_columns melakukan hal yang sama untuk satu chunk banyak baris
+# (endpoint batch): skala numerik & set one-hot per kolom, bukan per baris.
+#
+# Hasil bit-identik dengan versi pandas (lihat bench_preprocess.py): skala
+# dihitung float64 lalu dibulatkan ke float32, NaN → 0, rng 0 → 1, mins yang
+# hilang → 0, dan one-hot menimpa nilai numerik pada kolom yang sama.
+import numpy as np
+import pandas as pd
+
+NUMERIC_COLS = ["penghasilan", "jumlah_tanggungan", "lama_tinggal_tahun",
+                "jumlah_anggota_kk", "usia_kepala_keluarga"]
+
+# nilai form → kategori yang dipakai saat training
+CANON = {
+    "status_pekerjaan": {
+        "karyawan tetap": "pegawai tetap",
+        "pegawai tetap": "pegawai tetap",
+        "pns": "PNS",
+        "buruh": "buruh harian",
+    },
+    "kondisi_rumah": {
+        "tdk layak": "tidak layak",
+        "sangat sederhana": "sangat sederhana",
+        "semi permanen": "semi permanen",
+        "sederhana": "sederhana",
+        "layak": "layak",
+        "mewah": "mewah",
+    }
+}
+
+MISSING = object()   # penanda key tidak ada di input (beda dengan nilai None / "")
+
+
+def norm(x):
+    return str(x).strip().lower()
+
+
+def canonical(base, raw):
+    """Nilai input kolom dasar dalam bentuk yang dibandingkan dengan kategori one-hot."""
+    v = norm(raw)
+    if base in CANON:
+        v = norm(CANON[base].get(v, raw))
+    return v
+
+
+def _float_or_zero(x):
+    try:
+        return float(x)
+    except (TypeError, ValueError, OverflowError):
+        return 0.0
+
+
+class InputEncoder:
+    """Dibangun sekali dari preprocess.pkl (FEATURE_COLS, mins, rng)."""
+
+    def __init__(self, preproc):
+        self.preproc = preproc
+        self.feature_cols = list(preproc["FEATURE_COLS"])
+        self.dim = len(self.feature_cols)
+        index = {col: i for i, col in enumerate(self.feature_cols)}
+
+        mins = pd.Series(preproc["mins"]).reindex(self.feature_cols).fillna(0)
+        rng = pd.Series(preproc["rng"]).reindex(self.feature_cols).replace(0, 1)
+        self.mins = mins.to_numpy(dtype=np.float64)
+        self.rng = rng.to_numpy(dtype=np.float64)   # NaN (rng hilang) → kolom selalu 0
+
+        with np.errstate(invalid="ignore"):
+            self.empty = np.nan_to_num((0.0 - self.mins) / self.rng, nan=0.0,
+                                       posinf=np.inf, neginf=-np.inf).astype(np.float32)
+            self.on = np.nan_to_num((1.0 - self.mins) / self.rng, nan=0.0,
+                                    posinf=np.inf, neginf=-np.inf).astype(np.float32)
+
+        # kolom numerik yang ada di model: (nama, index, min, rng)
+        self.numeric = [(col, index[col], float(self.mins[index[col]]), float(self.rng[index[col]]))
+                        for col in NUMERIC_COLS if col in index]
+
+        # kolom dasar → {kategori ternormalisasi: array index}; satu nilai bisa
+        # mengaktifkan lebih dari satu kolom (mis. nama kolom numerik ber-"_")
+        onehot = {}
+        for col in self.feature_cols:
+            if "_" not in col:
+                continue
+            base, cat = col.rsplit("_", 1)
+            onehot.setdefault(base, {}).setdefault(norm(cat), []).append(index[col])
+        self.onehot = {base: {cat: np.array(idx) for cat, idx in cats.items()}
+                       for base, cats in onehot.items()}
+        # key input yang dibaca encoder
+        self.input_cols = [col for col, *_ in self.numeric] + list(self.onehot)
+
+    def encode_into(self, data: dict, row: np.ndarray) -> np.ndarray:
+        """Isi row (float32, panjang dim) dari satu input dict."""
+        row[:] = self.empty
+        for col, i, lo, span in self.numeric:
+            if col in data and str(data[col]).strip() != "":
+                v = (_float_or_zero(data[col]) - lo) / span
+                row[i] = 0.0 if v != v else v
+        for base, cats in self.onehot.items():
+            if base in data:
+                idx = cats.get(canonical(base, data[base]))
+                if idx is not None:
+                    row[idx] = self.on[idx]
+        return row
+
+    def encode(self, data: dict) -> np.ndarray:
+        """Satu input → array (1, dim) float32 siap masuk model."""
+        X = np.empty((1, self.dim), dtype=np.float32)
+        self.encode_into(data, X[0])
+        return X
+
+    def encode_columns(self, columns: dict, n: int) -> np.ndarray:
+        """
+        Batch: {kolom input: n nilai (MISSING = key tidak ada)} → (n, dim) float32.
+        Setiap baris identik dengan encode() atas dict baris tersebut.
+        """
+        X = np.empty((n, self.dim), dtype=np.float32)
+        X[:] = self.empty
+
+        for col, i, lo, span in self.numeric:
+            values = columns.get(col)
+            if values is None:
+                continue
+            x = np.zeros(n, dtype=np.float64)
+            present = np.zeros(n, dtype=bool)
+            for r, v in enumerate(values):
+                if v is not MISSING and str(v).strip() != "":
+                    x[r] = _float_or_zero(v)
+                    present[r] = True
+            with np.errstate(invalid="ignore"):
+                scaled = (x[present] - lo) / span
+            scaled[np.isnan(scaled)] = 0.0
+            X[present, i] = scaled
+
+        for base, cats in self.onehot.items():
+            values = columns.get(base)
+            if values is None:
+                continue
+            memo, rows, idxs = {}, [], []
+            for r, v in enumerate(values):
+                if v is MISSING:
+                    continue
+                try:
+                    idx = memo[(type(v), v)]      # nilai kategori berulang → sekali kanonisasi
+                except KeyError:
+                    idx = memo[(type(v), v)] = cats.get(canonical(base, v))
+                except TypeError:                 # nilai tidak hashable (list/dict dari JSON)
+                    idx = cats.get(canonical(base, v))
+                if idx is not None:
+                    rows.append(r)
+                    idxs.append(idx)
+            if rows:
+                cols = np.concatenate(idxs)
+                rows = np.repeat(rows, [len(idx) for idx in idxs])
+                X[rows, cols] = self.on[cols]
+        return X
+
+    def encode_records(self, records: list) -> np.ndarray:
+        """List dict (array JSON) → (n, dim) float32."""
+        columns = {col: [d.get(col, MISSING) for d in records] for col in self.input_cols}
+        return self.encode_columns(columns, len(records))
+
+    def encode_frame(self, df: pd.DataFrame) -> np.ndarray:
+        """Chunk CSV (dtype str, sel kosong = "") → (n, dim) float32."""
+        columns = {col: df[col].tolist() for col in self.input_cols if col in df.columns}
+        return self.encode_columns(columns, len(df))
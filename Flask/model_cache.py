@@ -0,0 +1,211 @@
+# ============================================================
+# 🗃️ CACHE MODEL & PREPROCESSOR — satu kali load per proses
+# ============================================================
+# Sebelumnya setiap request /predict/<model> membuat TFSMLayer baru dari disk
+# dan joblib.load preprocessor (ratusan ms per request). Di sini setiap entri
+# MODELS dimuat sekali (warm-up saat start), lalu dipakai bersama oleh semua
+# thread server.
+#
+# Hot reload: paling sering sekali per CHECK_INTERVAL detik, mtime & ukuran
+# file model/preprocessor dicek (os.stat, murah). Jika berubah, sha256 isi
+# file dihitung; hanya jika hash berbeda model dimuat ulang. Selama reload,
+# request lain tetap memakai versi lama sampai versi baru siap (swap atomik).
+# Reload yang gagal tidak mengganti versi lama; errornya tampil di status().
+#
+# Bobot dari URL server (MODELS[...]["weights"] = https://...) tidak punya
+# file lokal untuk dicek, jadi dimuat sekali per proses.
+import os
+import time
+import hashlib
+import threading
+from pathlib import Path
+
+CHECK_INTERVAL = float(os.environ.get("MODEL_CHECK_INTERVAL", 2.0))  # detik
+
+
+def model_files(cfg) -> list:
+    """File lokal yang menentukan isi satu entri MODELS (model + preprocessor)."""
+    paths = []
+    if "path" in cfg:
+        root = Path(cfg["path"])
+        paths += sorted(p for p in root.rglob("*") if p.is_file()
+                        and (p.suffix in (".pb", ".index") or p.parent.name == "variables"))
+    source = str(cfg.get("weights", ""))
+    if source and not source.startswith(("http://", "https://")):
+        paths.append(Path(source))
+    paths.append(Path(cfg["preproc"]))
+    return paths
+
+
+def stat_signature(paths) -> tuple:
+    sig = []
+    for p in paths:
+        try:
+            st = p.stat()
+            sig.append((str(p), st.st_mtime_ns, st.st_size))
+        except OSError:
+            sig.append((str(p), None, None))
+    return tuple(sig)
+
+
+def content_sha256(paths) -> str:
+    h = hashlib.sha256()
+    for p in paths:
+        h.update(str(p).encode("utf-8"))
+        with open(p, "rb") as f:
+            for chunk in iter(lambda: f.read(1 << 20), b""):
+                h.update(chunk)
+    return h.hexdigest()
+
+
+class LoadedModel:
+    """Satu versi model yang sudah dimuat; tidak diubah setelah dibuat."""
+
+    __slots__ = ("name", "predict", "encoder", "signature", "sha256", "loaded_at", "load_s")
+
+    def __init__(self, name, predict, encoder, signature, sha256, load_s):
+        self.name = name
+        self.predict = predict        # X float32 (n, fitur) → probabilitas (n,)
+        self.encoder = encoder        # input dict → X (input_encoder.InputEncoder)
+        self.signature = signature
+        self.sha256 = sha256
+        self.loaded_at = time.time()
+        self.load_s = load_s
+
+
+class ModelCache:
+    """
+    models  : dict konfigurasi (MODELS di app.py)
+    loader  : fungsi (name, cfg) → (predict, encoder), dipanggil saat (re)load
+    """
+
+    def __init__(self, models: dict, loader, check_interval: float = CHECK_INTERVAL):
+        self._models = models
+        self._loader = loader
+        self._check_interval = check_interval
+        self._entries = {}
+        self._checked = {}
+        self._errors = {}
+        self._reloads = {name: 0 for name in models}
+        self._locks = {name: threading.Lock() for name in models}
+        self._warm_thread = None
+        self.warmup_s = None
+
+    # --------------------------------------------------------
+    def _load(self, name) -> LoadedModel:
+        cfg = self._models[name]
+        paths = model_files(cfg)
+        missing = [str(p) for p in paths if not p.exists()]
+        if missing or ("path" in cfg and not Path(cfg["path"]).is_dir()):
+            raise FileNotFoundError(f"Model {name} tidak ditemukan: {', '.join(missing) or cfg['path']}")
+        signature = stat_signature(paths)
+        sha = content_sha256(paths)
+        t0 = time.perf_counter()
+        predict, encoder = self._loader(name, cfg)
+        return LoadedModel(name, predict, encoder, signature, sha, time.perf_counter() - t0)
+
+    def _changed(self, entry: LoadedModel) -> bool:
+        """True jika isi file berubah; mtime berubah tanpa isi berubah → hanya catat stat baru."""
+        try:
+            paths = model_files(self._models[entry.name])
+            signature = stat_signature(paths)
+            if signature == entry.signature:
+                return False
+            if any(size is None for _, _, size in signature):
+                return False   # file sedang diganti / dihapus → tetap pakai versi lama
+            sha = content_sha256(paths)
+        except OSError:
+            return False       # file diganti di antara stat & baca → cek lagi interval berikutnya
+        if sha != entry.sha256:
+            return True
+        entry.signature = signature
+        return False
+
+    def get(self, name) -> LoadedModel:
+        """Model siap pakai; load pertama kali atau reload jika file berubah."""
+        entry = self._entries.get(name)
+        if entry is None:
+            with self._locks[name]:
+                entry = self._entries.get(name)
+                if entry is None:
+                    try:
+                        entry = self._entries[name] = self._load(name)
+                        self._errors.pop(name, None)
+                    except Exception as e:
+                        self._errors[name] = str(e)
+                        raise
+                    self._checked[name] = time.monotonic()
+            return entry
+
+        now = time.monotonic()
+        if now - self._checked.get(name, 0.0) < self._check_interval:
+            return entry
+        # satu thread mengecek/reload, thread lain langsung memakai versi saat ini
+        if not self._locks[name].acquire(blocking=False):
+            return entry
+        try:
+            self._checked[name] = now
+            if self._entries[name] is entry and self._changed(entry):
+                try:
+                    entry = self._entries[name] = self._load(name)
+                    self._reloads[name] += 1
+                    self._errors.pop(name, None)
+                    print(f"🔄 Model {name} dimuat ulang ({entry.load_s:.2f}s, sha256 {entry.sha256[:12]})")
+                except Exception as e:
+                    self._errors[name] = f"reload gagal: {e}"
+            return self._entries[name]
+        finally:
+            self._locks[name].release()
+
+    # --------------------------------------------------------
+    def warm(self, names=None):
+        """Load semua model sekarang; model yang gagal dicatat di status()."""
+        t0 = time.perf_counter()
+        for name in names or self._models:
+            try:
+                entry = self.get(name)
+                print(f"📦 Model {name} siap ({entry.load_s:.2f}s)")
+            except Exception as e:
+                print(f"⚠️ Model {name} tidak dimuat: {e}")
+        self.warmup_s = time.perf_counter() - t0
+
+    def warm_async(self):
+        """Warm-up di thread latar agar server langsung menerima request."""
+        self._warm_thread = threading.Thread(target=self.warm, name="model-warmup", daemon=True)
+        self._warm_thread.start()
+
+    @property
+    def warming(self) -> bool:
+        return self._warm_thread is not None and self._warm_thread.is_alive()
+
+    @property
+    def ready(self) -> bool:
+        """
+        Siap jika tidak ada model yang gagal dimuat tanpa versi yang bisa
+        dipakai; dengan warm-up juga menunggu warm-up selesai. Tanpa warm-up
+        (load saat request pertama) model yang belum pernah diminta tidak
+        menahan readiness.
+        """
+        loaded = all(name in self._entries for name in self._errors)
+        if self._warm_thread is not None or self.warmup_s is not None:
+            return self.warmup_s is not None and not self.warming and loaded
+        return loaded
+
+    def status(self) -> dict:
+        models = {}
+        for name in self._models:
+            entry = self._entries.get(name)
+            models[name] = {
+                "loaded": entry is not None,
+                "load_s": round(entry.load_s, 3) if entry else None,
+                "loaded_at": (time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(entry.loaded_at))
+                              if entry else None),
+                "sha256": entry.sha256[:12] if entry else None,
+                "reloads": self._reloads[name],
+                "error": self._errors.get(name),
+            }
+        return {
+            "ready": self.ready,
+            "warmup_s": round(self.warmup_s, 3) if self.warmup_s is not None else None,
+            "models": models,
+        }
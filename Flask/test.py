@@ -26,20 +26,9 @@ PREPROC_PATHS = {
 # ============================================================
 # 🧠 LOAD MODEL GLOBAL
 # ============================================================
-def load_global_model(npz_path, feature_dim):
-    model = tf.keras.Sequential([
-        tf.keras.layers.Input(shape=(feature_dim,)),
-        tf.keras.layers.Dense(128, activation="relu"),
-        tf.keras.layers.BatchNormalization(),
-        tf.keras.layers.Dropout(0.3),
-        tf.keras.layers.Dense(64, activation="relu"),
-        tf.keras.layers.Dense(32, activation="relu"),
-        tf.keras.layers.Dense(1, activation="sigmoid"),
-    ])
-
-    weights = np.load(npz_path)
-    model.set_weights([weights[k] for k in weights.files])
-    return model
+# Bobot dipasang layer demi layer (lihat global_model.py). GLOBAL_MODEL_NPZ
+# boleh berupa file lokal (.npz / container) atau URL server .../model/latest
+from global_model import load_global_model
 
 # ============================================================
 # 🧩 PREPROCESS INPUT
@@ -0,0 +1,5 @@
+import sys
+from pathlib import Path
+
+# modul Flask diimport flat (import input_encoder, import model_cache) seperti di app.py
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
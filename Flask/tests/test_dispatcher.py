@@ -0,0 +1,115 @@
+import sys
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pytest
+
+from dispatcher import MicroBatcher, _Stats, _bucket
+
+
+class Model:
+    """Pengganti LoadedModel: probabilitas = jumlah fitur baris."""
+
+    def __init__(self, name="dinsos", delay=0.0, drop=0):
+        self.name = name
+        self.delay = delay
+        self.drop = drop
+        self.batches = []
+
+    def predict(self, X):
+        self.batches.append(len(X))
+        time.sleep(self.delay)
+        probs = X.sum(axis=1).astype(np.float32)
+        return probs[:len(probs) - self.drop]
+
+
+def rows(n, dim=4):
+    return [np.full(dim, i, dtype=np.float32) for i in range(n)]
+
+
+def test_concurrent_requests_are_batched():
+    model = Model(delay=0.01)
+    batcher = MicroBatcher(max_wait_ms=20, max_batch=16)
+    with ThreadPoolExecutor(32) as pool:
+        results = list(pool.map(lambda r: batcher.predict(model, r), rows(64)))
+    assert results == [4.0 * i for i in range(64)]
+    assert max(model.batches) > 1 and max(model.batches) <= 16
+    stats = batcher.stats()["models"]["dinsos"]
+    assert stats["requests"] == 64 and stats["batches"] == len(model.batches)
+
+
+def test_short_result_fails_every_request():
+    """Regresi: zip() dulu diam-diam melewatkan future → request menggantung."""
+    model = Model(delay=0.01, drop=1)
+    batcher = MicroBatcher(max_wait_ms=50, max_batch=8, timeout_s=5)
+    with ThreadPoolExecutor(8) as pool:
+        futures = [pool.submit(batcher.predict, model, r) for r in rows(8)]
+        for f in futures:
+            with pytest.raises(ValueError, match="probabilitas"):
+                f.result(timeout=10)
+
+
+def test_model_error_propagates():
+    class Broken(Model):
+        def predict(self, X):
+            raise RuntimeError("forward pass gagal")
+
+    batcher = MicroBatcher(max_wait_ms=1)
+    with pytest.raises(RuntimeError, match="forward pass gagal"):
+        batcher.predict(Broken(), rows(1)[0])
+
+
+def test_timeout_and_cancelled_rows_skipped():
+    gate = threading.Event()
+
+    class Stuck(Model):
+        def predict(self, X):
+            gate.wait(5)
+            return super().predict(X)
+
+    model = Stuck()
+    batcher = MicroBatcher(max_wait_ms=1, max_batch=1, timeout_s=0.1)
+    with ThreadPoolExecutor(2) as pool:
+        first = pool.submit(batcher.predict, model, rows(1)[0])     # menahan worker
+        time.sleep(0.02)
+        with pytest.raises(TimeoutError):
+            batcher.predict(model, rows(2)[1])                      # antre lalu timeout
+        with pytest.raises(TimeoutError):
+            first.result()
+    gate.set()
+    # baris yang sudah dibatalkan tidak di-forward; worker tetap hidup
+    batcher.timeout = 5
+    assert batcher.predict(model, rows(3)[2]) == 8.0
+    assert model.batches == [1, 1]
+
+
+def test_stats_updates_are_not_lost():
+    """Thread request (record_depth) & worker (record_batch) menulis counter bersamaan."""
+    interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)                 # paksa pergantian thread di tengah update
+    try:
+        stats = _Stats()
+
+        def hammer(i):
+            for n in range(1, 2001):
+                stats.record_batch(1 + n % 4, 0.001, 0.002)
+                stats.record_depth(i * 10_000 + n)
+
+        threads = [threading.Thread(target=hammer, args=(i,)) for i in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+    finally:
+        sys.setswitchinterval(interval)
+    s = stats.snapshot()
+    assert s["batches"] == 8 * 2000 and s["requests"] == 8 * 5000
+    assert sum(s["histogram"].values()) == s["batches"]
+    assert s["max_queue_depth"] == 7 * 10_000 + 2000
+
+
+def test_bucket():
+    assert [_bucket(n) for n in (1, 2, 3, 4, 5, 8, 9, 64)] == \
+        ["1", "2", "3-4", "3-4", "5-8", "5-8", "9-16", "33-64"]
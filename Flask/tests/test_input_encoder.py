@@ -0,0 +1,65 @@
+import io
+from pathlib import Path
+
+import joblib
+import numpy as np
+import pandas as pd
+import pytest
+
+from bench_preprocess import preprocess_input_pandas, sample_inputs
+from input_encoder import MISSING, InputEncoder
+
+PREPROCS = sorted((Path(__file__).resolve().parent.parent / "Models").glob("saved_*_tff/preprocess.pkl"))
+
+
+@pytest.fixture(scope="module", params=PREPROCS, ids=lambda p: p.parent.name)
+def preproc(request):
+    return joblib.load(request.param)
+
+
+def same_bits(a, b):
+    return a.shape == b.shape and a.dtype == b.dtype and a.tobytes() == b.tobytes()
+
+
+def test_bit_identical_to_pandas(preproc):
+    encoder = InputEncoder(preproc)
+    for i, data in enumerate(sample_inputs(preproc, 500, seed=1)):
+        assert same_bits(encoder.encode(data), preprocess_input_pandas(data, preproc)), i
+
+
+def test_records_match_single_rows(preproc):
+    encoder = InputEncoder(preproc)
+    inputs = sample_inputs(preproc, 300, seed=2)
+    inputs.append({"status_pekerjaan": ["tidak", "hashable"], "penghasilan": {"x": 1}})
+    batch = encoder.encode_records(inputs)
+    assert batch.shape == (len(inputs), encoder.dim) and batch.dtype == np.float32
+    for i, data in enumerate(inputs):
+        assert batch[i].tobytes() == encoder.encode(data)[0].tobytes(), i
+
+
+def test_csv_frame_matches_single_rows(preproc):
+    encoder = InputEncoder(preproc)
+    rows = [{col: "" if d.get(col) is None else str(d.get(col)) for col in encoder.input_cols}
+            for d in sample_inputs(preproc, 200, seed=3)]
+    frame = pd.read_csv(io.StringIO(pd.DataFrame(rows).to_csv(index=False)),
+                        dtype=str, keep_default_na=False)
+    batch = encoder.encode_frame(frame)
+    for i, data in enumerate(rows):
+        assert batch[i].tobytes() == encoder.encode(data)[0].tobytes(), i
+
+
+def test_missing_key_differs_from_empty_value(preproc):
+    encoder = InputEncoder(preproc)
+    col = encoder.input_cols[0]
+    X = encoder.encode_columns({col: [MISSING, "", "12"]}, 3)
+    assert X[0].tobytes() == X[1].tobytes() == encoder.encode({})[0].tobytes()
+    assert X[2].tobytes() == encoder.encode({col: "12"})[0].tobytes()
+
+
+def test_encode_into_reuses_row(preproc):
+    encoder = InputEncoder(preproc)
+    a, b = sample_inputs(preproc, 2, seed=4)
+    row = np.empty(encoder.dim, dtype=np.float32)
+    encoder.encode_into(a, row)
+    encoder.encode_into(b, row)            # sisa nilai input sebelumnya tidak boleh tertinggal
+    assert row.tobytes() == encoder.encode(b)[0].tobytes()
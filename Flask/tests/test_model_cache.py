@@ -0,0 +1,130 @@
+import os
+import threading
+
+import pytest
+
+import model_cache
+from model_cache import ModelCache
+
+
+@pytest.fixture
+def files(tmp_path):
+    weights = tmp_path / "dinsos.npz"
+    preproc = tmp_path / "preprocess.pkl"
+    weights.write_bytes(b"v1")
+    preproc.write_bytes(b"pre")
+    return weights, preproc
+
+
+def make_cache(files, loader=None, **kw):
+    weights, preproc = files
+    calls = []
+
+    def default_loader(name, cfg):
+        calls.append(name)
+        version = open(cfg["weights"], "rb").read()
+        return (lambda X: version), None
+
+    models = {"dinsos": {"weights": str(weights), "preproc": str(preproc)}}
+    return ModelCache(models, loader or default_loader, check_interval=0, **kw), calls
+
+
+def touch(path, data):
+    path.write_bytes(data)
+    st = path.stat()
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000))
+
+
+def test_loads_once_and_reloads_on_content_change(files):
+    cache, calls = make_cache(files)
+    assert cache.get("dinsos").predict(None) == b"v1"
+    assert cache.get("dinsos").predict(None) == b"v1"
+    assert calls == ["dinsos"]
+
+    touch(files[0], b"v1")                 # mtime berubah, isi sama → tidak reload
+    assert cache.get("dinsos").predict(None) == b"v1"
+    assert calls == ["dinsos"]
+
+    touch(files[0], b"v2")
+    assert cache.get("dinsos").predict(None) == b"v2"
+    assert cache.status()["models"]["dinsos"]["reloads"] == 1
+
+
+def test_failed_reload_keeps_old_version(files):
+    fail = threading.Event()
+
+    def loader(name, cfg):
+        if fail.is_set():
+            raise RuntimeError("model rusak")
+        return (lambda X: open(cfg["weights"], "rb").read()), None
+
+    cache, _ = make_cache(files, loader)
+    old = cache.get("dinsos")
+    fail.set()
+    touch(files[0], b"broken")
+    assert cache.get("dinsos") is old
+    assert "model rusak" in cache.status()["models"]["dinsos"]["error"]
+
+
+def test_file_replaced_during_hash_keeps_old_version(files, monkeypatch):
+    cache, calls = make_cache(files)
+    old = cache.get("dinsos")
+    touch(files[0], b"v2")
+
+    def vanished(paths):
+        raise FileNotFoundError(str(paths[0]))
+
+    monkeypatch.setattr(model_cache, "content_sha256", vanished)
+    assert cache.get("dinsos") is old          # bukan 500
+    monkeypatch.undo()
+    assert cache.get("dinsos").predict(None) == b"v2"
+
+
+def test_ready_with_warmup(files):
+    release = threading.Event()
+
+    def slow_loader(name, cfg):
+        release.wait(5)
+        return (lambda X: None), None
+
+    cache, _ = make_cache(files, slow_loader)
+    cache.warm_async()
+    assert cache.status()["ready"] is False      # 503 selama warm-up
+    release.set()
+    cache._warm_thread.join()
+    status = cache.status()
+    assert status["ready"] is True and status["warmup_s"] is not None
+    assert status["models"]["dinsos"]["loaded"]
+
+
+def test_ready_false_when_model_fails_during_warmup(files):
+    weights, preproc = files
+    good = {"weights": str(weights), "preproc": str(preproc)}
+    bad = {"weights": str(weights.with_name("hilang.npz")), "preproc": str(preproc)}
+    cache = ModelCache({"dinsos": good, "kemenkes": bad},
+                       lambda name, cfg: ((lambda X: None), None), check_interval=0)
+    cache.warm_async()
+    cache._warm_thread.join()
+    status = cache.status()
+    assert status["models"]["dinsos"]["loaded"] and status["models"]["kemenkes"]["error"]
+    assert status["ready"] is False              # /ready 503 selama ada model gagal
+
+    weights.with_name("hilang.npz").write_bytes(b"v1")
+    cache.get("kemenkes")
+    assert cache.status()["ready"] is True
+
+
+def test_ready_without_warmup(files):
+    """MODEL_WARMUP=0: /ready tidak boleh 503 selamanya."""
+    weights, preproc = files
+    cache, _ = make_cache(files)
+    assert cache.status()["ready"] is True
+
+    weights.unlink()
+    with pytest.raises(FileNotFoundError):
+        cache.get("dinsos")
+    assert cache.status()["ready"] is False     # gagal dimuat, tidak ada versi lama
+
+    weights.write_bytes(b"v1")
+    cache.get("dinsos")
+    assert cache.status()["ready"] is True
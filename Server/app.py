@@ -2,7 +2,7 @@
 import os
 from pathlib import Path
 from datetime import datetime
-from flask import Flask, request, jsonify, send_file
+from flask import Flask, request, jsonify, send_file, Response, stream_with_context
 from flask_cors import CORS
 import tensorflow as tf
 import numpy as np
@@ -10,10 +10,21 @@ import base64
 import io
 import json
 import shutil
+import threading
 import zipfile
 import tempfile
 from werkzeug.utils import secure_filename
 
+from locking import LockTimeout, snapshot_key
+from storage import (
+    storage_from_env, normalize_key, read_json, write_json,
+    save_weights, load_weights, weight_index, unique_key, object_sha256,
+)
+import codec
+import secagg
+from audit import AuditLog, verify_inclusion
+from notify import GlobalVersionWatcher
+
 # ==========================================================
 # 🚀 INISIALISASI FLASK + CORS
 # ==========================================================
@@ -45,75 +56,121 @@ def apply_cors(response):
     return response
 
 # ==========================================================
-# 🗂️ FOLDERS
+# 🗂️ MODEL STORE
 # ==========================================================
-MODELS_DIR = Path("models")            # lowercase "models" dipakai konsisten
-MODELS_DIR.mkdir(parents=True, exist_ok=True)
+# Default: folder lokal "models" (env MODELS_DIR). STORAGE_BACKEND=s3 → bucket
+# bersama, sehingga beberapa replika server bisa berjalan di belakang load balancer.
+STORAGE = storage_from_env()
+print(f"🗂️ Model store: {STORAGE.backend} → {STORAGE.describe()}")
+
+LOGS_PREFIX = "logs"
+
+# Codec bobot per tier (npz | raw | fast, lihat codec.py). Sufiks key mengikuti
+# codec (codec.SUFFIXES), jadi container tidak pernah tersimpan dengan nama .npz:
+# - bobot client hanya dibaca agregasi → raw (<client>_weights.raw, mmap tanpa inflate)
+# - model global → npz: /download-global & /download dikirim apa adanya (tanpa
+#   encode ulang per request, X-Global-Sha256 = sha registry). GLOBAL_CODEC=raw
+#   membuat /model/<file>/layer/<i> membaca per layer langsung dari objek, dengan
+#   biaya encode ulang ke NPZ di setiap download client lama.
+STORE_CODEC = os.environ.get("STORE_CODEC", "raw")
+GLOBAL_CODEC = os.environ.get("GLOBAL_CODEC", "npz")
+
+# Batas tunggu lock model store (detik) — agregasi lain / delete sedang berjalan
+LOCK_TIMEOUT = float(os.environ.get("MODELS_LOCK_TIMEOUT", 300))
+
+# Audit log append-only (Merkle tree) untuk setiap upload & agregasi
+AUDIT = AuditLog(STORAGE, "audit")
+
+# Versi model global terbaru (long-poll /global/version & SSE /events)
+VERSIONS = GlobalVersionWatcher(
+    STORAGE, "global_version.json",
+    poll_interval=float(os.environ.get("VERSION_POLL_INTERVAL", 1.0)),
+)
+LONGPOLL_MAX = float(os.environ.get("LONGPOLL_MAX", 60))   # detik maksimal per long-poll
+SSE_HEARTBEAT = 15                                          # detik antar komentar keep-alive
+# Setiap subscriber /events menahan satu thread gthread selama koneksi terbuka
+# (Procfile: --threads 32). Di atas batas ini /events menjawab 503 dan client
+# beralih ke long-poll /global/version, supaya thread tersisa untuk request lain.
+SSE_MAX_STREAMS = int(os.environ.get("SSE_MAX_STREAMS", 16))  # per proses worker
+SSE_SLOTS = threading.BoundedSemaphore(SSE_MAX_STREAMS)
+
 
-LOGS_DIR = MODELS_DIR / "logs"
-LOGS_DIR.mkdir(parents=True, exist_ok=True)
+def models_lock():
+    """Lock tunggal untuk semua operasi yang mengubah isi model store."""
+    return STORAGE.lock("models", timeout=LOCK_TIMEOUT)
+
+
+def display_path(key: str) -> str:
+    """Lokasi objek untuk ditampilkan di response (mis. models/x.npz atau s3://...)."""
+    local = STORAGE.local_path(key)
+    return str(local) if local is not None else f"{STORAGE.describe()}{key}"
+
+def weights_key(stem: str, fmt: str) -> str:
+    """Key objek bobot dengan sufiks codec tersimpan (dinsos_weights.raw, global_...npz)."""
+    return stem + codec.SUFFIXES[fmt]
+
+def weights_stem(key: str, tail: str):
+    """'dinsos_weights.raw' + '_weights' → 'dinsos'; None jika bukan objek bobot tersebut."""
+    stem, fmt = codec.split_suffix(key)
+    if fmt is None or not stem.endswith(tail):
+        return None
+    return stem[:-len(tail)]
+
+def client_weight_keys(client: str) -> list:
+    """Semua objek bobot milik client (satu per codec; sisa STORE_CODEC lama ikut terhitung)."""
+    return [k for k in (weights_key(f"{client}_weights", f) for f in codec.CODECS) if STORAGE.exists(k)]
+
+def masked_keys(round_dir: str) -> dict:
+    """{client: key} upload ter-mask di satu secure round."""
+    keys = {}
+    for o in STORAGE.list(round_dir):
+        client = weights_stem(o.name, "_masked")
+        if client is not None:
+            keys[client] = f"{round_dir}/{o.name}"
+    return keys
+
+def layer_names_of(index):
+    """Nama layer dari header container (None untuk NPZ / nama default arr_i)."""
+    if not index:
+        return None
+    names = [t["name"] for t in index["tensors"]]
+    return None if names == [f"arr_{i}" for i in range(len(names))] else names
 
 # ==========================================================
 # UTIL: path safety
 # ==========================================================
-def safe_model_path(filename: str):
+def safe_model_key(filename: str):
     """
-    Kembalikan path absolut aman untuk file di folder models.
+    Kembalikan key aman untuk objek di model store.
     Mencegah path traversal (../../).
     """
-    model_folder = MODELS_DIR.resolve()
-    candidate = model_folder / filename
-    try:
-        candidate_resolved = candidate.resolve(strict=False)
-        if not str(candidate_resolved).startswith(str(model_folder)):
-            # Path traversal detected
-            return None
-        return candidate_resolved
-    except Exception:
-        return None
+    return normalize_key(filename)
 
 def remove_logs_for_client(client: str) -> dict:
     """
-    Hapus best_accuracy & history untuk client dari LOGS_DIR dan juga
-    dari folder client di MODELS_DIR jika ada.
+    Hapus best_accuracy, history & telemetry untuk client dari logs/ dan juga
+    dari folder client di model store jika ada.
     Mengembalikan dict berisi info berkas yg dihapus.
     """
-    deleted = {"best": False, "history": False, "folder_best": False, "folder_history": False}
+    deleted = {"best": False, "history": False, "telemetry": False,
+               "folder_best": False, "folder_history": False}
     try:
-        best_path = LOGS_DIR / f"{client}_best_accuracy.txt"
-        history_path = LOGS_DIR / f"{client}_accuracy_history.txt"
-
-        if best_path.exists():
-            try:
-                best_path.unlink()
-                deleted["best"] = True
-            except Exception as e:
-                print(f"⚠️ Gagal menghapus {best_path}: {e}")
-
-        if history_path.exists():
+        targets = {
+            "best": f"{LOGS_PREFIX}/{client}_best_accuracy.txt",
+            "history": f"{LOGS_PREFIX}/{client}_accuracy_history.txt",
+            "telemetry": f"{LOGS_PREFIX}/{client}_telemetry.jsonl",
+            # Cek juga jika ada folder models/<client>/best_accuracy.txt dll.
+            "folder_best": f"{client}/best_accuracy.txt",
+            "folder_history": f"{client}/accuracy_history.txt",
+        }
+        for name, key in targets.items():
             try:
-                history_path.unlink()
-                deleted["history"] = True
+                if name in ("history", "telemetry", "folder_history"):
+                    deleted[name] = STORAGE.delete_log(key)   # log bersegmen di S3
+                else:
+                    deleted[name] = STORAGE.delete(key)
             except Exception as e:
-                print(f"⚠️ Gagal menghapus {history_path}: {e}")
-
-        # Cek juga jika ada folder models/<client>/best_accuracy.txt dll.
-        client_folder = MODELS_DIR / client
-        if client_folder.exists() and client_folder.is_dir():
-            folder_best = client_folder / "best_accuracy.txt"
-            folder_history = client_folder / "accuracy_history.txt"
-            if folder_best.exists():
-                try:
-                    folder_best.unlink()
-                    deleted["folder_best"] = True
-                except Exception as e:
-                    print(f"⚠️ Gagal menghapus {folder_best}: {e}")
-            if folder_history.exists():
-                try:
-                    folder_history.unlink()
-                    deleted["folder_history"] = True
-                except Exception as e:
-                    print(f"⚠️ Gagal menghapus {folder_history}: {e}")
+                print(f"⚠️ Gagal menghapus {key}: {e}")
 
     except Exception as e:
         print(f"⚠️ Error saat remove_logs_for_client({client}): {e}")
@@ -128,8 +185,10 @@ def upload_model():
     Ekspektasi JSON body:
     {
       "client": "BANK_A",
-      "compressed_weights": "<base64 npz>",
-      "metrics": { "best_accuracy": 0.9123, "history": [...] }   # optional
+      "compressed_weights": "<base64 npz / container>",
+      "layer_names": ["dense/kernel", ...],   # optional
+      "metrics": { "best_accuracy": 0.9123, "history": [...],    # optional
+                   "telemetry": [{"round": 1, "wall_s": 5.1, ...}, ...] }
       // atau "accuracy": 0.9123
     }
     """
@@ -146,18 +205,45 @@ def upload_model():
         if not compressed_weights:
             return jsonify({"status": "error", "message": "compressed_weights missing"}), 400
 
-        # Decode base64 -> load npz from bytes
+        # Decode base64 -> load npz / container from bytes
         try:
             binary_data = base64.b64decode(compressed_weights)
-            buffer = io.BytesIO(binary_data)
-            npzfile = np.load(buffer, allow_pickle=True)
-            weights = [npzfile[key] for key in npzfile]
+            weights = codec.decode(binary_data, allow_pickle=True)
         except Exception as e:
             return jsonify({"status": "error", "message": f"failed to decode/load npz: {e}"}), 400
 
-        # Simpan bobot model
-        save_path = MODELS_DIR / f"{client}_weights.npz"
-        np.savez_compressed(save_path, *weights)
+        # Nama layer: dari body atau dari header container yang di-upload
+        layer_names = data.get("layer_names") or layer_names_of(
+            codec.read_index(lambda start, length: binary_data[start:start + length])
+        )
+        if layer_names is not None and len(layer_names) != len(weights):
+            return jsonify({"status": "error", "message": "layer_names tidak sesuai jumlah tensor"}), 400
+
+        # Simpan bobot model (atomic, diserialisasi terhadap agregasi)
+        secagg_meta = data.get("secagg")
+        with models_lock():
+            if secagg_meta:
+                # bobot ter-mask → disimpan per round, tidak ikut FedAvg biasa
+                save_key, err = save_masked_upload(client, weights, secagg_meta, layer_names)
+                if err:
+                    return jsonify({"status": "error", "message": err}), 400
+            else:
+                save_key = weights_key(f"{client}_weights", STORE_CODEC)
+                save_weights(STORAGE, save_key, weights, STORE_CODEC, layer_names)
+                # STORE_CODEC berganti → buang objek lama agar client tidak teragregasi dua kali
+                for old in client_weight_keys(client):
+                    if old != save_key:
+                        STORAGE.delete(old)
+
+            audit_info = AUDIT.append({
+                "type": "upload",
+                "timestamp": datetime.utcnow().isoformat() + "Z",
+                "client": client,
+                "file": save_key,
+                "sha256": object_sha256(STORAGE, save_key),
+                "secagg_round": secagg_meta.get("round") if secagg_meta else None,
+            })
+        save_path = display_path(save_key)
         print(f"✅ Model dari {client} disimpan di {save_path}")
 
         # -------------------------
@@ -182,8 +268,15 @@ def upload_model():
         if isinstance(metrics, dict):
             history_items = metrics.get("history") or metrics.get("accuracy_history")
 
-        best_path = LOGS_DIR / f"{client}_best_accuracy.txt"
-        history_path = LOGS_DIR / f"{client}_accuracy_history.txt"
+        # record telemetry per round (Training/telemetry.py)
+        telemetry_items = None
+        if isinstance(metrics, dict):
+            telemetry_items = metrics.get("telemetry")
+
+        best_key = f"{LOGS_PREFIX}/{client}_best_accuracy.txt"
+        history_key = f"{LOGS_PREFIX}/{client}_accuracy_history.txt"
+        history_path = display_path(history_key)
+        telemetry_key = f"{LOGS_PREFIX}/{client}_telemetry.jsonl"
 
         metrics_log = {}
 
@@ -214,20 +307,31 @@ def upload_model():
                 else:
                     lines = [str(history_items)]
 
-                with open(history_path, "a", encoding="utf-8") as hf:
-                    for ln in lines:
-                        ln = ln.strip()
-                        if not ln:
-                            continue
-                        hf.write(ln + "\n")
+                text = "".join(ln.strip() + "\n" for ln in lines if ln.strip())
+                with models_lock():
+                    STORAGE.append_log(history_key, text.encode("utf-8"))
 
                 metrics_log["history_written"] = len(lines)
-                metrics_log["history_path"] = str(history_path)
+                metrics_log["history_path"] = history_path
                 print(f"📈 History untuk {client} ditambahkan ({len(lines)} baris) -> {history_path}")
             except Exception as e:
                 metrics_log["history_error"] = str(e)
                 print(f"⚠️ Gagal menulis history untuk {client}: {e}")
 
+        # 1b) append telemetry sebagai JSONL (satu record per round)
+        if isinstance(telemetry_items, list) and telemetry_items:
+            try:
+                records = [item for item in telemetry_items if isinstance(item, dict)]
+                text = "".join(json.dumps(rec, ensure_ascii=False) + "\n" for rec in records)
+                with models_lock():
+                    STORAGE.append_log(telemetry_key, text.encode("utf-8"))
+                metrics_log["telemetry_written"] = len(records)
+                metrics_log["telemetry_path"] = display_path(telemetry_key)
+                print(f"📊 Telemetry untuk {client} ditambahkan ({len(records)} round)")
+            except Exception as e:
+                metrics_log["telemetry_error"] = str(e)
+                print(f"⚠️ Gagal menulis telemetry untuk {client}: {e}")
+
         # 2) handle scalar/best accuracy update (update best jika meningkat)
         if accuracy_value is not None:
             try:
@@ -235,28 +339,28 @@ def upload_model():
                 acc = max(0.0, min(1.0, acc))  # clamp to [0,1]
 
                 timestamp = datetime.utcnow().isoformat() + "Z"
-                # append to history as timestamped entry
-                try:
-                    with open(history_path, "a", encoding="utf-8") as hf:
-                        hf.write(f"{timestamp}\t{acc:.6f}\n")
-                except Exception:
-                    pass
-
-                prev_val = -1.0
-                if best_path.exists():
+                with models_lock():
+                    # append to history as timestamped entry
                     try:
-                        prev_txt = best_path.read_text(encoding="utf-8").strip()
-                        prev_val = float(prev_txt) if prev_txt else -1.0
+                        STORAGE.append_log(history_key, f"{timestamp}\t{acc:.6f}\n".encode("utf-8"))
                     except Exception:
-                        prev_val = -1.0
+                        pass
+
+                    prev_val = -1.0
+                    if STORAGE.exists(best_key):
+                        try:
+                            prev_txt = STORAGE.read_bytes(best_key).decode("utf-8").strip()
+                            prev_val = float(prev_txt) if prev_txt else -1.0
+                        except Exception:
+                            prev_val = -1.0
 
-                written_best = False
-                if acc > prev_val:
-                    best_path.write_text(f"{acc:.6f}\n", encoding="utf-8")
-                    written_best = True
+                    written_best = False
+                    if acc > prev_val:
+                        STORAGE.write_bytes(best_key, f"{acc:.6f}\n".encode("utf-8"))
+                        written_best = True
 
                 metrics_log.update({
-                    "best_path": str(best_path),
+                    "best_path": display_path(best_key),
                     "reported_accuracy": acc,
                     "written_best": written_best
                 })
@@ -269,202 +373,585 @@ def upload_model():
         resp = {
             "status": 200,
             "client": client,
-            "saved_weights": str(save_path),
-            "message": "model uploaded"
+            "saved_weights": save_path,
+            "message": "model uploaded",
+            "audit": audit_info
         }
         if metrics_log:
             resp["metrics"] = metrics_log
 
         return jsonify(resp), 200
 
+    except LockTimeout as e:
+        return jsonify({"status": "error", "message": str(e)}), 503
     except Exception as e:
         return jsonify({"status": "error", "message": str(e)}), 500
 
 # ==========================================================
 # 2️⃣ ENDPOINT: AGREGASI SEMUA MODEL (FedAvg sederhana)
 # ==========================================================
-LAST_WEIGHT_FILE = MODELS_DIR / "last_avg_weight.json"
+LAST_WEIGHT_FILE = "last_avg_weight.json"
+LAST_AGGREGATE_FILE = "last_aggregate.json"
+
+def read_last_aggregate():
+    """Hasil agregasi terakhir beserta snapshot input-nya (untuk dipakai ulang)."""
+    try:
+        return read_json(STORAGE, LAST_AGGREGATE_FILE)
+    except Exception:
+        return None
+
+
+def reusable_aggregate(snapshot: str):
+    """Response agregasi terakhir jika snapshot sama dan model globalnya masih ada."""
+    last = read_last_aggregate()
+    if last and last.get("snapshot") == snapshot and STORAGE.exists(last.get("saved_key", "")):
+        print(f"♻️ Snapshot input sama, pakai ulang {last['response']['saved']}")
+        return dict(last["response"], reused=True)
+    return None
+
 
 @app.route('/aggregate', methods=['POST'])
 def aggregate_models():
     try:
-        model_dir = MODELS_DIR
-        client_files = [f for f in os.listdir(model_dir) if f.endswith("_weights.npz")]
-
         # Data size (optional) → untuk perhitungan kontribusi FedAvg
         req_json = request.get_json(silent=True) or {}
         data_sizes = req_json.get("data_sizes", {})
 
-        # Jika model kurang dari 2 → beri pesan lebih informatif
-        if len(client_files) < 2:
-            if len(client_files) == 0:
-                msg = (
-                    "Tidak ada model lokal yang ditemukan. "
-                    "Setidaknya dua client harus mengirimkan model sebelum agregasi dapat dilakukan."
-                )
-            else:  # hanya 1 model
-                msg = (
-                    f"Hanya ditemukan 1 model lokal ({client_files[0]}). "
-                    "Minimal 2 model diperlukan untuk melakukan Federated Averaging."
-                )
-
-            return jsonify({
-                "status": "error",
-                "message": msg,
-                "found_models": client_files,
-                "required": 2,
-                "current": len(client_files)
-            }), 400
-
-        print(f"🧮 Memulai Federated Averaging untuk {len(client_files)} client...")
+        # Mode secure aggregation: agregasi upload ter-mask milik satu round
+        if req_json.get("secagg_round") is not None:
+            return aggregate_secure(str(req_json["secagg_round"]))
 
         # =======================================
-        # LOAD semua bobot client
+        # SINGLE-FLIGHT: hanya satu agregasi per snapshot input.
+        # Request lain menunggu lock lalu memakai ulang hasilnya.
         # =======================================
-        all_weights = []
-        client_weights_dict = {}   # untuk dimasukkan ke response
-        client_mean_dict = {}      # untuk perhitungan kontribusi mean weight
+        with models_lock():
+            client_files = [o.key for o in STORAGE.list("") if weights_stem(o.key, "_weights") is not None]
+
+            # Jika model kurang dari 2 → beri pesan lebih informatif
+            if len(client_files) < 2:
+                if len(client_files) == 0:
+                    msg = (
+                        "Tidak ada model lokal yang ditemukan. "
+                        "Setidaknya dua client harus mengirimkan model sebelum agregasi dapat dilakukan."
+                    )
+                else:  # hanya 1 model
+                    msg = (
+                        f"Hanya ditemukan 1 model lokal ({client_files[0]}). "
+                        "Minimal 2 model diperlukan untuk melakukan Federated Averaging."
+                    )
+
+                return jsonify({
+                    "status": "error",
+                    "message": msg,
+                    "found_models": client_files,
+                    "required": 2,
+                    "current": len(client_files)
+                }), 400
+
+            snapshot = snapshot_key(STORAGE, client_files, {"data_sizes": data_sizes})
+            reused = reusable_aggregate(snapshot)
+            if reused:
+                return jsonify(reused)
+
+            response_json = run_fedavg(client_files, data_sizes)
+            response_json["snapshot"] = snapshot
+            response_json["reused"] = False
+
+            write_json(STORAGE, LAST_AGGREGATE_FILE, {
+                "snapshot": snapshot,
+                "saved_key": response_json.pop("saved_key"),
+                "response": response_json,
+            })
 
-        for fname in client_files:
-            npz = np.load(model_dir / fname, allow_pickle=True)
-            weights = [npz[key] for key in npz]
-            all_weights.append(weights)
+        # 🔥 INI YANG AKAN MUNCUL DI RAILWAY LOG
+        print("\n========== FEDAVG JSON RESULT ==========")
+        print(json.dumps(response_json, indent=2))
+        print("========================================\n")
 
-            # convert ke JSON-friendly
-            client_weights_dict[fname] = [w.tolist() for w in weights]
+        # ⬇️ Baru return JSON ke client
+        return jsonify(response_json)
 
-            # Hitung rata-rata bobot client
-            flat = np.concatenate([w.flatten() for w in weights])
-            client_mean_dict[fname] = float(np.mean(flat))
+    except LockTimeout as e:
+        return jsonify({"status": "error", "message": str(e)}), 503
+    except Exception as e:
+        return jsonify({"status": "error", "message": str(e)}), 500
 
-            print(f"✅ {fname} dimuat ({len(weights)} layer)")
 
-        num_layers = len(all_weights[0])
-        avg_weights = []
+def run_fedavg(client_files: list, data_sizes: dict) -> dict:
+    """FedAvg atas client_files. Dipanggil saat lock model store sedang dipegang."""
+    print(f"🧮 Memulai Federated Averaging untuk {len(client_files)} client...")
 
-        # =======================================
-        # RATA-RATA FEDAVG
-        # =======================================
-        for layer_idx in range(num_layers):
-            layer_values = [client[layer_idx] for client in all_weights]
-            try:
-                stacked = np.stack(layer_values, axis=0)
-                averaged = np.mean(stacked, axis=0)
-                avg_weights.append(averaged)
-            except Exception:
-                avg_weights.append(layer_values[-1])
-                print(f"⚠️ Layer {layer_idx} BatchNorm moving stats, tidak di-average")
+    # =======================================
+    # LOAD semua bobot client
+    # =======================================
+    all_weights = []
+    client_mean_dict = {}      # untuk perhitungan kontribusi mean weight
+    input_hashes = {}          # untuk audit log
 
-        # =======================================
-        # SIMPAN MODEL GLOBAL
-        # =======================================
-        from datetime import datetime
+    for fname in client_files:
+        input_hashes[fname] = object_sha256(STORAGE, fname)
+        weights = load_weights(STORAGE, fname, allow_pickle=True)
+        all_weights.append(weights)
 
-        # ============================
-        # BUAT NAMA FILE PAKAI TIMESTAMP
-        # ============================
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        filename = f"global_model_fedavg_{timestamp}.npz"
-        save_path = model_dir / filename
+        # Hitung rata-rata bobot client
+        flat = np.concatenate([w.flatten() for w in weights])
+        client_mean_dict[fname] = float(np.mean(flat))
 
-        np.savez_compressed(save_path, *avg_weights)
+        print(f"✅ {fname} dimuat ({len(weights)} layer)")
 
-        print(f"🎯 FedAvg selesai → disimpan di {save_path}")
+    num_layers = len(all_weights[0])
+    avg_weights = []
+    layer_names = layer_names_of(weight_index(STORAGE, client_files[0]))
 
+    # =======================================
+    # RATA-RATA FEDAVG
+    # =======================================
+    for layer_idx in range(num_layers):
+        layer_values = [client[layer_idx] for client in all_weights]
+        try:
+            stacked = np.stack(layer_values, axis=0)
+            averaged = np.mean(stacked, axis=0)
+            avg_weights.append(averaged)
+        except Exception:
+            avg_weights.append(layer_values[-1])
+            print(f"⚠️ Layer {layer_idx} BatchNorm moving stats, tidak di-average")
+
+    summary = save_global_model(avg_weights, layer_names)
+    summary["audit"] = audit_aggregation(
+        "FedAvg", input_hashes, summary["saved_key"],
+        {c: round(1 / len(client_files), 6) for c in client_files},
+        data_sizes=data_sizes or None,
+    )
+
+    # =======================================
+    # KONTRIBUSI 1 — Persentase berdasarkan Mean Weight
+    # =======================================
+    abs_means = {c: abs(v) for c, v in client_mean_dict.items()}
+    total_abs_mean = sum(abs_means.values())
+
+    mean_weight_percentage = {
+        c: round((abs_means[c] / total_abs_mean) * 100, 4) if total_abs_mean != 0 else 0
+        for c in client_files
+    }
 
-        # =======================================
-        # HITUNG TOTAL PARAMETER
-        # =======================================
-        total_params = sum(w.size for w in avg_weights)
+    # =======================================
+    # KONTRIBUSI 2 — FedAvg contribution (berdasarkan jumlah data)
+    # =======================================
+    if data_sizes:
+        total_data = sum(data_sizes.values())
+        # key boleh nama client atau nama file (termasuk <client>_weights.npz lama)
+        by_client = {(weights_stem(k, "_weights") or k): v for k, v in data_sizes.items()}
+        fedavg_contrib = {
+            c: round((by_client.get(weights_stem(c, "_weights"), 0) / total_data) * 100, 4)
+            if total_data != 0 else 0
+            for c in client_files
+        }
+    else:
+        fedavg_contrib = None  # Jika tidak ada data size
 
-        # =======================================
-        # HITUNG RATA-RATA BOBOT GLOBAL
-        # =======================================
-        flat_weights = np.concatenate([w.flatten() for w in avg_weights])
-        avg_global_weight = float(np.mean(flat_weights))
+    # =======================================
+    # RESPONSE SUCCESS
+    # =======================================
+    return {
+        "status": "success",
+        "method": "FedAvg",
+        "num_clients": len(client_files),
+        **summary,
+
+        "client_mean_weight": client_mean_dict,
+        "client_mean_weight_percentage": mean_weight_percentage,
+        "fedavg_data_contribution_percentage": fedavg_contrib
+    }
 
-        # =======================================
-        # BACA NILAI SEBELUMNYA
-        # =======================================
-        last_weight_path = model_dir / "last_avg_weight.json"
-        last_weight = None
 
-        if last_weight_path.exists():
-            with open(last_weight_path, "r") as f:
-                last_weight = json.load(f).get("avg_global_weight", None)
+def audit_aggregation(method: str, input_hashes: dict, saved_key: str, weights: dict, **extra) -> dict:
+    """Catat satu agregasi ke audit log: input → output + bobot yang dipakai."""
+    return AUDIT.append({
+        "type": "aggregate",
+        "timestamp": datetime.utcnow().isoformat() + "Z",
+        "method": method,
+        "inputs": input_hashes,
+        "output": saved_key,
+        "output_sha256": object_sha256(STORAGE, saved_key),
+        "weights": weights,
+        **extra,
+    })
+
+
+def save_global_model(avg_weights: list, layer_names=None, method: str = "FedAvg") -> dict:
+    """Simpan bobot global + hitung ringkasan (dipakai FedAvg biasa & secure)."""
+    # =======================================
+    # SIMPAN MODEL GLOBAL
+    # =======================================
+    # Nama file pakai timestamp; sufiks _N jika detik yang sama sudah terpakai
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    save_key = unique_key(STORAGE, weights_key(f"global_model_fedavg_{timestamp}", GLOBAL_CODEC))
+    save_path = display_path(save_key)
+
+    save_weights(STORAGE, save_key, avg_weights, GLOBAL_CODEC, layer_names)
+
+    print(f"🎯 FedAvg selesai → disimpan di {save_path}")
+
+    # =======================================
+    # HITUNG TOTAL PARAMETER
+    # =======================================
+    total_params = sum(w.size for w in avg_weights)
+
+    # =======================================
+    # HITUNG RATA-RATA BOBOT GLOBAL
+    # =======================================
+    flat_weights = np.concatenate([w.flatten() for w in avg_weights])
+    avg_global_weight = float(np.mean(flat_weights))
+
+    # =======================================
+    # BACA NILAI SEBELUMNYA
+    # =======================================
+    last_weight = (read_json(STORAGE, LAST_WEIGHT_FILE) or {}).get("avg_global_weight", None)
+
+    # =======================================
+    # HITUNG PERSENTASE PERUBAHAN GLOBAL
+    # =======================================
+    if last_weight is not None and last_weight != 0:
+        change_percent = ((avg_global_weight - last_weight) / abs(last_weight)) * 100
+    else:
+        change_percent = 0.0  # Agregasi pertama
 
-        # =======================================
-        # HITUNG PERSENTASE PERUBAHAN GLOBAL
-        # =======================================
-        if last_weight is not None and last_weight != 0:
-            change_percent = ((avg_global_weight - last_weight) / abs(last_weight)) * 100
-        else:
-            change_percent = 0.0  # Agregasi pertama
+    # =======================================
+    # SIMPAN NILAI TERBARU
+    # =======================================
+    write_json(STORAGE, LAST_WEIGHT_FILE, {"avg_global_weight": avg_global_weight})
 
-        # =======================================
-        # SIMPAN NILAI TERBARU
-        # =======================================
-        with open(last_weight_path, "w") as f:
-            json.dump({"avg_global_weight": avg_global_weight}, f)
+    # =======================================
+    # PUBLISH VERSI BARU → bangunkan long-poll / SSE
+    # =======================================
+    version = VERSIONS.publish(
+        save_key, object_sha256(STORAGE, save_key), STORAGE.stat(save_key).size, method=method
+    )
 
-        # =======================================
-        # KONTRIBUSI 1 — Persentase berdasarkan Mean Weight
-        # =======================================
-        abs_means = {c: abs(v) for c, v in client_mean_dict.items()}
-        total_abs_mean = sum(abs_means.values())
+    return {
+        "num_layers": len(avg_weights),
+        "total_parameters": int(total_params),
+        "avg_global_weight": avg_global_weight,
+        "avg_global_weight_change_percent": round(change_percent, 6),
+        "saved": save_path,
+        "saved_key": save_key,
+        "version": version["version"],
+    }
 
-        mean_weight_percentage = {
-            c: round((abs_means[c] / total_abs_mean) * 100, 4) if total_abs_mean != 0 else 0
-            for c in client_files
-        }
 
-        # =======================================
-        # KONTRIBUSI 2 — FedAvg contribution (berdasarkan jumlah data)
-        # =======================================
-        if data_sizes:
-            total_data = sum(data_sizes.values())
-            fedavg_contrib = {
-                c: round((data_sizes.get(c, 0) / total_data) * 100, 4) if total_data != 0 else 0
-                for c in client_files
-            }
-        else:
-            fedavg_contrib = None  # Jika tidak ada data size
+# ==========================================================
+# 🔐 SECURE AGGREGATION (pairwise masking, opsional)
+# ==========================================================
+# secagg/<round>/round.json       → public key, participants, seed yang dibuka
+# secagg/<round>/<client>_masked.raw → bobot ter-mask (uint64)
+SECAGG_PREFIX = "secagg"
 
-        # =======================================
-        # RESPONSE SUCCESS
-        # =======================================
-        # =======================================
-        # RESPONSE SUCCESS
-        # =======================================
+
+def secagg_round_dir(round_id: str):
+    """Prefix key round (secagg/<round>), None jika round id tidak valid."""
+    name = secure_filename(str(round_id))
+    return f"{SECAGG_PREFIX}/{name}" if name else None
+
+
+def round_name(round_dir: str) -> str:
+    return round_dir.rsplit("/", 1)[-1]
+
+
+def read_round(round_dir: str) -> dict:
+    state = read_json(STORAGE, f"{round_dir}/round.json")
+    return state or {"public_keys": {}, "participants": None, "revealed": {}}
+
+
+def write_round(round_dir: str, state: dict):
+    write_json(STORAGE, f"{round_dir}/round.json", state)
+
+
+def round_status(round_dir: str, state: dict) -> dict:
+    uploaded = sorted(masked_keys(round_dir))
+    participants = state.get("participants") or sorted(state["public_keys"])
+    dropped = [c for c in participants if c not in uploaded]
+    needed = [
+        f"{s}|{d}" for s in uploaded for d in dropped
+        if f"{s}|{d}" not in state["revealed"]
+    ]
+    return {
+        "round": round_name(round_dir),
+        "public_keys": state["public_keys"],
+        "participants": participants,
+        "locked": state.get("participants") is not None,
+        "uploaded": uploaded,
+        "dropped": dropped,
+        "needed_reveals": needed,
+    }
+
+
+def save_masked_upload(client: str, weights: list, meta: dict, layer_names=None):
+    """Validasi & simpan upload ter-mask. Return (key, error). Lock sudah dipegang."""
+    round_dir = secagg_round_dir(meta.get("round", ""))
+    if round_dir is None:
+        return None, "secagg.round missing"
+
+    state = read_round(round_dir)
+    if client not in state["public_keys"]:
+        return None, f"{client} belum register di round {round_name(round_dir)}"
+    if any(k.endswith(f"|{client}") for k in state["revealed"]):
+        return None, f"seed {client} sudah dibuka (dianggap drop), upload ditolak"
+    if any(np.asarray(w).dtype != np.uint64 for w in weights):
+        return None, "bobot ter-mask harus bertipe uint64"
+    if int(meta.get("scale_bits", secagg.SCALE_BITS)) != secagg.SCALE_BITS:
+        return None, f"scale_bits harus {secagg.SCALE_BITS}"
+
+    participants = sorted(meta.get("participants") or [])
+    if state["participants"] is None:
+        if set(participants) - set(state["public_keys"]):
+            return None, "participants berisi client yang belum register"
+        state["participants"] = participants  # kunci set peserta di upload pertama
+        write_round(round_dir, state)
+    elif participants != state["participants"]:
+        return None, f"participants tidak cocok dengan round: {state['participants']}"
+
+    save_key = weights_key(f"{round_dir}/{client}_masked", "raw")
+    save_weights(STORAGE, save_key, weights, "raw", layer_names)   # uint64 acak, kompresi tidak berguna
+    return save_key, None
+
+
+@app.route('/secagg/<round_id>/register', methods=['POST'])
+def secagg_register(round_id):
+    try:
+        round_dir = secagg_round_dir(round_id)
+        data = request.get_json(silent=True) or {}
+        client = data.get("client")
+        public_key = data.get("public_key")
+
+        if round_dir is None:
+            return jsonify({"status": "error", "message": "round id tidak valid"}), 400
+        if not client or client != secure_filename(client):
+            return jsonify({"status": "error", "message": "client missing / tidak valid"}), 400
+        try:
+            pk = int(str(public_key), 16)
+            if not (1 < pk < secagg.MODP_P - 1):
+                raise ValueError
+        except Exception:
+            return jsonify({"status": "error", "message": "public_key (hex) tidak valid"}), 400
+
+        with models_lock():
+            state = read_round(round_dir)
+            old = state["public_keys"].get(client)
+            if state["participants"] is not None and old != f"{pk:x}":
+                return jsonify({
+                    "status": "error",
+                    "message": "Round sudah dikunci, peserta/public key tidak bisa diubah"
+                }), 409
+            state["public_keys"][client] = f"{pk:x}"
+            write_round(round_dir, state)
+
+        print(f"🔐 {client} register di secure round {round_name(round_dir)}")
+        return jsonify({"status": "success", "round": round_name(round_dir),
+                        "registered": sorted(state["public_keys"])})
+
+    except LockTimeout as e:
+        return jsonify({"status": "error", "message": str(e)}), 503
+    except Exception as e:
+        return jsonify({"status": "error", "message": str(e)}), 500
+
+
+@app.route('/secagg/<round_id>', methods=['GET'])
+def secagg_status(round_id):
+    round_dir = secagg_round_dir(round_id)
+    if round_dir is None:
+        return jsonify({"status": "error", "message": "round id tidak valid"}), 400
+    return jsonify(round_status(round_dir, read_round(round_dir)))
+
+
+@app.route('/secagg/<round_id>/reveal', methods=['POST'])
+def secagg_reveal(round_id):
+    """Client yang selamat membuka seed pasangan dengan client yang drop."""
+    try:
+        round_dir = secagg_round_dir(round_id)
+        data = request.get_json(silent=True) or {}
+        client = data.get("client")
+        seeds = data.get("seeds") or {}
+        if round_dir is None or not client or not isinstance(seeds, dict):
+            return jsonify({"status": "error", "message": "client & seeds required"}), 400
+
+        with models_lock():
+            state = read_round(round_dir)
+            status = round_status(round_dir, state)
+            if client not in status["uploaded"]:
+                return jsonify({"status": "error", "message": f"{client} belum upload di round ini"}), 400
+
+            for dropped, seed_hex in seeds.items():
+                if dropped not in status["dropped"]:
+                    return jsonify({"status": "error", "message": f"{dropped} tidak drop"}), 400
+                if len(bytes.fromhex(seed_hex)) != 32:
+                    return jsonify({"status": "error", "message": "seed harus 32 byte hex"}), 400
+                state["revealed"][f"{client}|{dropped}"] = seed_hex
+            write_round(round_dir, state)
+
+        return jsonify({"status": "success", **round_status(round_dir, state)})
+
+    except LockTimeout as e:
+        return jsonify({"status": "error", "message": str(e)}), 503
+    except Exception as e:
+        return jsonify({"status": "error", "message": str(e)}), 500
+
+
+def aggregate_secure(round_id: str):
+    """Jumlahkan upload ter-mask; server hanya melihat rata-rata akhirnya."""
+    round_dir = secagg_round_dir(round_id)
+    if round_dir is None:
+        return jsonify({"status": "error", "message": "round id tidak valid"}), 400
+
+    with models_lock():
+        state = read_round(round_dir)
+        status = round_status(round_dir, state)
+        uploaded = status["uploaded"]
+
+        if len(uploaded) < 2:
+            return jsonify({
+                "status": "error",
+                "message": "Minimal 2 upload ter-mask diperlukan untuk secure aggregation.",
+                "found_models": uploaded,
+                "required": 2,
+                "current": len(uploaded)
+            }), 400
+
+        if status["needed_reveals"]:
+            return jsonify({
+                "status": "error",
+                "message": "Ada client yang drop. Client yang selamat harus membuka seed via /secagg/<round>/reveal.",
+                "dropped": status["dropped"],
+                "needed_reveals": status["needed_reveals"]
+            }), 409
+
+        keys = masked_keys(round_dir)
+        files = [keys[c] for c in uploaded]
+        snapshot = snapshot_key(STORAGE, files,
+                                {"revealed": sorted(state["revealed"])})
+        last = state.get("result")
+        if last and last.get("snapshot") == snapshot and STORAGE.exists(last.get("saved_key", "")):
+            print(f"♻️ Secure round {round_name(round_dir)} sudah diagregasi, pakai ulang hasil")
+            return jsonify(dict(last["response"], reused=True))
+
+        print(f"🔐 Secure aggregation round {round_name(round_dir)}: {len(uploaded)} client, drop={status['dropped']}")
+        masked = {}
+        for c in uploaded:
+            masked[c] = load_weights(STORAGE, keys[c])
+
+        revealed = {
+            tuple(k.split("|", 1)): bytes.fromhex(v) for k, v in state["revealed"].items()
+        }
+        avg_weights = secagg.unmask_mean(masked, status["participants"], revealed)
+        layer_names = layer_names_of(weight_index(STORAGE, files[0]))
+        summary = save_global_model(avg_weights, layer_names, method="FedAvg-SecAgg")
+        saved_key = summary.pop("saved_key")
+        summary["audit"] = audit_aggregation(
+            "FedAvg-SecAgg",
+            {f: object_sha256(STORAGE, f) for f in files},
+            saved_key,
+            {c: round(1 / len(uploaded), 6) for c in uploaded},
+            secagg_round=round_name(round_dir),
+            dropped=status["dropped"],
+        )
 
         response_json = {
             "status": "success",
-            "method": "FedAvg",
-            "num_clients": len(client_files),
-            "num_layers": num_layers,
-            "total_parameters": int(total_params),
-            "avg_global_weight": avg_global_weight,
-            "avg_global_weight_change_percent": round(change_percent, 6),
-            "saved": str(save_path),
-
-            # "client_weights": client_weights_dict,
-            "client_mean_weight": client_mean_dict,
-            "client_mean_weight_percentage": mean_weight_percentage,
-            "fedavg_data_contribution_percentage": fedavg_contrib
+            "method": "FedAvg-SecAgg",
+            "round": round_name(round_dir),
+            "num_clients": len(uploaded),
+            "dropped": status["dropped"],
+            **summary,
+            "snapshot": snapshot,
+            "reused": False,
         }
+        state["result"] = {"snapshot": snapshot, "saved_key": saved_key, "response": response_json}
+        write_round(round_dir, state)
 
-        # 🔥 INI YANG AKAN MUNCUL DI RAILWAY LOG
-        print("\n========== FEDAVG JSON RESULT ==========")
-        print(json.dumps(response_json, indent=2))
-        print("========================================\n")
+    print(json.dumps(response_json, indent=2))
+    return jsonify(response_json)
 
-        # ⬇️ Baru return JSON ke client
-        return jsonify(response_json)
 
+# ==========================================================
+# 📜 AUDIT LOG (Merkle tree, inclusion proof O(log n))
+# ==========================================================
+@app.route('/audit', methods=['GET'])
+def audit_head():
+    size = AUDIT.size()
+    return jsonify({"tree_size": size, "root": AUDIT.root(size)})
 
-    except Exception as e:
-        return jsonify({"status": "error", "message": str(e)}), 500
 
+@app.route('/audit/<int:seq>', methods=['GET'])
+def audit_entry(seq):
+    try:
+        size = request.args.get("tree_size", type=int) or AUDIT.size()
+        return jsonify({
+            "entry": AUDIT.get(seq),
+            "seq": seq,
+            "tree_size": size,
+            "root": AUDIT.root(size),
+            "proof": AUDIT.inclusion_proof(seq, size),
+        })
+    except IndexError as e:
+        return jsonify({"status": "error", "message": str(e)}), 404
+
+
+@app.route('/audit/verify', methods=['POST'])
+def audit_verify():
+    """
+    Body: {"entry": {...}, "seq": 3, "tree_size": 10, "proof": [...], "root": "<hex>"}
+    root opsional — default root server pada tree_size tersebut.
+    """
+    data = request.get_json(silent=True) or {}
+    try:
+        entry = data["entry"]
+        seq = int(data.get("seq", entry.get("seq")))
+        size = int(data.get("tree_size") or AUDIT.size())
+        proof = data.get("proof") or AUDIT.inclusion_proof(seq, size)
+        server_root = AUDIT.root(size)
+    except (KeyError, TypeError, ValueError, IndexError) as e:
+        return jsonify({"status": "error", "message": f"request tidak valid: {e}"}), 400
+
+    root = data.get("root") or server_root
+    valid = verify_inclusion(entry, seq, size, proof, root)
+    return jsonify({
+        "valid": valid,
+        "root_matches_server": root == server_root,
+        "seq": seq,
+        "tree_size": size,
+        "root": root,
+    })
+
+
+@app.route('/audit/file/<path:filename>', methods=['GET'])
+def audit_file(filename):
+    """Hash file di server lalu tunjukkan entry audit + proof yang menyebut file tersebut."""
+    key = safe_model_key(unquote(filename))
+    if key is None or not STORAGE.exists(key):
+        return jsonify({"status": "error", "message": f"{filename} tidak ditemukan"}), 404
+
+    digest = object_sha256(STORAGE, key)
+    size = AUDIT.size()
+    root = AUDIT.root(size)
+    records = []
+    for seq in AUDIT.find_by_hash(digest):
+        entry = AUDIT.get(seq)
+        proof = AUDIT.inclusion_proof(seq, size)
+        records.append({
+            "seq": seq,
+            "entry": entry,
+            "proof": proof,
+            "valid": verify_inclusion(entry, seq, size, proof, root),
+        })
+
+    return jsonify({
+        "file": filename,
+        "sha256": digest,
+        "tree_size": size,
+        "root": root,
+        "audited": bool(records),
+        "records": records,
+    })
 
 
 # ==========================================================
@@ -473,21 +960,18 @@ def aggregate_models():
 @app.route('/logs', methods=['GET'])
 def list_files():
     try:
-        files = os.listdir(MODELS_DIR)
+        # list() hanya mengembalikan objek (bukan folder) di level teratas
+        objects = STORAGE.list("")
         result = []
 
-        for fname in files:
-
-            # Abaikan folder
-            if os.path.isdir(MODELS_DIR / fname):
-                continue
+        for obj in objects:
+            fname = obj.key
 
-            # Hanya file .npz
-            if not fname.endswith(".npz"):
+            # Hanya objek bobot (.npz / .raw / .fast)
+            if codec.split_suffix(fname)[1] is None:
                 continue
 
-            file_path = MODELS_DIR / fname
-            file_mtime = file_path.stat().st_mtime   # UNIX timestamp
+            file_mtime = obj.mtime   # UNIX timestamp
 
             # ============================
             # DETEKSI GLOBAL MODEL BARU
@@ -496,8 +980,8 @@ def list_files():
                 client_label = "GLOBAL"
                 message = "Model global hasil agregasi FedAvg"
             else:
-                # File client → contoh: bankA_weights.npz
-                client_label = fname.replace("_weights.npz", "").upper()
+                # File client → contoh: bankA_weights.raw
+                client_label = (weights_stem(fname, "_weights") or fname).upper()
                 message = f"Model dari client {client_label}"
 
             # Format timestamp ISO
@@ -534,13 +1018,58 @@ def list_files():
 # ==========================================================
 # 4️⃣ DOWNLOAD GLOBAL MODELS
 # ==========================================================
+def reencodes_to_npz(key: str) -> bool:
+    """True jika send_object mengirim NPZ hasil encode ulang, bukan byte tersimpan."""
+    if request.args.get("format") == "container":
+        return False
+    return STORAGE.read_range(key, 0, len(codec.MAGIC)) == codec.MAGIC
+
+
+def send_object(key: str, download_name: str = None):
+    """
+    Kirim objek model store sebagai attachment. Backend lokal → send_file;
+    backend lain di-stream per chunk (tidak dimuat utuh ke RAM).
+    Bobot yang disimpan dengan codec container dikirim ulang sebagai NPZ,
+    karena client & Flask memakai np.load (kecuali ?format=container).
+    """
+    download_name = download_name or key.rsplit("/", 1)[-1]
+    if reencodes_to_npz(key):
+        download_name = weights_key(codec.split_suffix(download_name)[0], "npz")
+        data = codec.encode(load_weights(STORAGE, key, allow_pickle=True), "npz")
+        response = Response(data, mimetype="application/octet-stream")
+        response.headers["Content-Disposition"] = f'attachment; filename="{download_name}"'
+        return response
+
+    local = STORAGE.local_path(key)
+    if local is not None:
+        return send_file(os.path.abspath(local), as_attachment=True, download_name=download_name)
+
+    info = STORAGE.stat(key)
+    response = Response(
+        stream_with_context(STORAGE.iter_chunks(key)),
+        mimetype="application/octet-stream",
+    )
+    response.headers["Content-Disposition"] = f'attachment; filename="{download_name}"'
+    response.headers["Content-Length"] = str(info.size)
+    return response
+
+
+def latest_global():
+    """ObjectInfo model global FedAvg terbaru (berdasarkan waktu modifikasi), None jika belum ada."""
+    global_files = [
+        o for o in STORAGE.list("")
+        if o.key.startswith("global_model_fedavg_") and codec.split_suffix(o.key)[1] is not None
+    ]
+    return max(global_files, key=lambda f: f.mtime) if global_files else None
+
+
 @app.route('/download-global', methods=['GET'])
 def download_global():
     try:
-        # Cari semua file global FedAvg dengan timestamp
-        global_files = list(MODELS_DIR.glob("global_model_fedavg_*.npz"))
+        # Cari file global FedAvg terbaru
+        latest_file = latest_global()
 
-        if not global_files:
+        if latest_file is None:
             return jsonify({
                 "status": "error",
                 "message": (
@@ -550,25 +1079,26 @@ def download_global():
                 "hint": "Pastikan minimal dua client telah mengunggah model mereka."
             }), 404
 
-        # Ambil file terbaru berdasarkan waktu modifikasi
-        latest_file = max(global_files, key=lambda f: f.stat().st_mtime)
-
-        file_size = latest_file.stat().st_size
-        last_modified = latest_file.stat().st_mtime
+        file_size = latest_file.size
+        last_modified = latest_file.mtime
 
-        print(f"📤 Global model diunduh: {latest_file.name} ({file_size} bytes)")
+        print(f"📤 Global model diunduh: {latest_file.key} ({file_size} bytes)")
 
         # ========== BUAT NAMA FILE BARU UNTUK DOWNLOAD ==========
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        download_name = f"global_model_fedavg_{timestamp}.npz"
+        stored = "npz" if reencodes_to_npz(latest_file.key) else codec.split_suffix(latest_file.key)[1]
+        download_name = weights_key(f"global_model_fedavg_{timestamp}", stored)
 
-        response = send_file(
-            str(latest_file),
-            as_attachment=True,
-            download_name=download_name  # nama file saat di-download
-        )
+        response = send_object(latest_file.key, download_name)  # nama file saat di-download
 
         # Tambahan header info
+        version = VERSIONS.current()
+        if version.get("file") == latest_file.key:
+            response.headers["X-Global-Version"] = version["version"]
+            # sha256 registry = hash objek tersimpan; hanya valid untuk body
+            # jika byte tersimpan dikirim apa adanya (?format=container / NPZ asli)
+            if not reencodes_to_npz(latest_file.key):
+                response.headers["X-Global-Sha256"] = version["sha256"]
         response.headers["X-File-Name"] = download_name
         response.headers["X-File-Size"] = file_size
         response.headers["X-Last-Modified"] = last_modified
@@ -581,16 +1111,157 @@ def download_global():
 
 
 
+# ==========================================================
+# 🔔 NOTIFIKASI VERSI GLOBAL (long-poll & SSE)
+# ==========================================================
+@app.route('/global/version', methods=['GET'])
+def global_version():
+    """
+    ?after=<version>&wait=<detik> → kembali segera jika ada versi > after,
+    atau setelah wait detik (changed=false). Tanpa wait = versi saat ini.
+    """
+    after = request.args.get("after", default=-1, type=int)
+    wait = min(max(request.args.get("wait", default=0.0, type=float), 0.0), LONGPOLL_MAX)
+    current = VERSIONS.wait_newer(after, wait) if wait > 0 else VERSIONS.current()
+    return jsonify({**current, "changed": current.get("version", 0) > after})
+
+
+@app.route('/events', methods=['GET'])
+def global_events():
+    """
+    Server-Sent Events: event "global" setiap kali versi baru dipublish.
+    Resume via header Last-Event-ID atau ?after=<version>.
+    """
+    after = request.headers.get("Last-Event-ID", type=int)
+    if after is None:
+        after = request.args.get("after", default=-1, type=int)
+
+    if not SSE_SLOTS.acquire(blocking=False):
+        response = jsonify({
+            "status": "error",
+            "message": f"Batas {SSE_MAX_STREAMS} stream SSE tercapai, gunakan long-poll",
+            "fallback": f"/global/version?after={after}&wait={int(LONGPOLL_MAX)}",
+        })
+        response.status_code = 503
+        response.headers["Retry-After"] = str(SSE_HEARTBEAT)
+        return response
+
+    def stream(last):
+        yield "retry: 5000\n\n"
+        while True:
+            current = VERSIONS.wait_newer(last, SSE_HEARTBEAT)
+            if current.get("version", 0) > last:
+                last = current["version"]
+                yield f"event: global\nid: {last}\ndata: {json.dumps(current)}\n\n"
+            else:
+                yield ": ping\n\n"
+
+    response = Response(stream_with_context(stream(after)), mimetype="text/event-stream")
+    # slot dilepas saat koneksi ditutup (client putus / worker berhenti)
+    response.call_on_close(SSE_SLOTS.release)
+    response.headers["Cache-Control"] = "no-cache"
+    response.headers["X-Accel-Buffering"] = "no"
+    return response
+
+
 # ==========================================================
 # 5️⃣ DOWNLOAD FILE SPESIFIK
 # ==========================================================
 
 @app.route('/download/<filename>', methods=['GET'])
 def download_file(filename):
-    safe_path = safe_model_path(filename)
-    if safe_path is None or not safe_path.exists():
+    key = safe_model_key(filename)
+    if key is None or not STORAGE.exists(key):
         return jsonify({"status": "error", "message": f"{filename} tidak ditemukan"}), 404
-    return send_file(str(safe_path), as_attachment=True)
+    return send_object(key)
+
+
+# ==========================================================
+# 🧩 AKSES BOBOT PER LAYER
+# ==========================================================
+def resolve_weight_key(filename: str):
+    """'latest' → model global terbaru; selain itu key aman di model store."""
+    if filename == "latest":
+        latest = latest_global()
+        return latest.key if latest else None
+    key = safe_model_key(unquote(filename))
+    return key if key is not None and STORAGE.exists(key) else None
+
+
+def weight_layers(key: str):
+    """(header index, reader, codec tersimpan) untuk objek bobot. NPZ lama diindeks di memori."""
+    index = weight_index(STORAGE, key)
+    if index is not None:
+        return index, lambda start, length: STORAGE.read_range(key, start, length), index["codec"]
+
+    # NPZ: tidak bisa dibaca per layer, ubah sekali ke container raw di memori
+    data = codec.encode(load_weights(STORAGE, key, allow_pickle=True), "raw")
+
+    def reader(start, length):
+        return data[start:start + length]
+
+    return codec.read_index(reader), reader, "npz"
+
+
+@app.route('/model/<path:filename>/layers', methods=['GET'])
+def model_layers(filename):
+    """Index layer (nama, dtype, shape, ukuran, sha256) tanpa mengunduh bobot."""
+    key = resolve_weight_key(filename)
+    if key is None:
+        return jsonify({"status": "error", "message": f"{filename} tidak ditemukan"}), 404
+    try:
+        index, _, stored_codec = weight_layers(key)
+        return jsonify({
+            "file": key,
+            "codec": stored_codec,
+            "size": STORAGE.stat(key).size,
+            "layers": [
+                {
+                    "index": i,
+                    "name": t["name"],
+                    "dtype": t["dtype"],
+                    "shape": t["shape"],
+                    "nbytes": t["nbytes"],
+                    "sha256": t["sha256"],
+                }
+                for i, t in enumerate(index["tensors"])
+            ],
+        })
+    except Exception as e:
+        return jsonify({"status": "error", "message": str(e)}), 500
+
+
+@app.route('/model/<path:filename>/layer/<layer>', methods=['GET'])
+def model_layer(filename, layer):
+    """
+    Byte mentah satu layer (C-order, dtype & shape di header X-Dtype / X-Shape).
+    ?start=&stop= → hanya elemen [start:stop) dari layer yang di-flatten.
+    Client: np.frombuffer(resp.content, dtype).reshape(shape) tanpa salinan.
+    """
+    key = resolve_weight_key(filename)
+    if key is None:
+        return jsonify({"status": "error", "message": f"{filename} tidak ditemukan"}), 404
+    try:
+        index, reader, _ = weight_layers(key)
+        i = codec.find_tensor(index, layer)
+    except KeyError as e:
+        return jsonify({"status": "error", "message": str(e.args[0])}), 404
+
+    t = index["tensors"][i]
+    start = request.args.get("start", type=int)
+    stop = request.args.get("stop", type=int)
+    partial = start is not None or stop is not None
+    data = codec.read_tensor_bytes(reader, index, i, start or 0, stop)
+
+    response = Response(data, mimetype="application/octet-stream")
+    response.headers["X-File-Name"] = key
+    response.headers["X-Layer-Index"] = str(i)
+    response.headers["X-Layer-Name"] = t["name"]
+    response.headers["X-Dtype"] = t["dtype"]
+    response.headers["X-Shape"] = json.dumps([len(data) // np.dtype(t["dtype"]).itemsize] if partial else t["shape"])
+    if not partial:
+        response.headers["X-Sha256"] = t["sha256"]
+    return response
 
 # ==========================================================
 # 🗑️ HAPUS MODEL (aman) — sekarang juga menghapus history/metrics terkait
@@ -602,20 +1273,19 @@ def delete_file(filename):
     # decode spasi dan karakter URL lain
     filename = unquote(filename)
 
-    safe_path = safe_model_path(filename)
-    if safe_path is None:
+    key = safe_model_key(filename)
+    if key is None:
         return jsonify({"status": "error", "message": "Invalid filename"}), 400
-    if not safe_path.exists():
-        return jsonify({"status": "error", "message": f"File {filename} tidak ditemukan"}), 404
 
     try:
-        safe_path.unlink()
-        print(f"🗑️ File dihapus: {safe_path}")
+        # Tunggu agregasi yang sedang berjalan selesai sebelum menghapus
+        with models_lock():
+            if not STORAGE.delete(key):
+                return jsonify({"status": "error", "message": f"File {filename} tidak ditemukan"}), 404
+        print(f"🗑️ File dihapus: {display_path(key)}")
 
         # Extract client name before "_weights"
-        client = None
-        if filename.endswith("_weights.npz"):
-            client = filename[:-len("_weights.npz")]
+        client = weights_stem(filename, "_weights")
 
         deleted_logs_info = None
         if client:
@@ -628,6 +1298,8 @@ def delete_file(filename):
 
         return jsonify(result)
 
+    except LockTimeout as e:
+        return jsonify({"status": "error", "message": str(e)}), 503
     except Exception as e:
         return jsonify({"status": "error", "message": str(e)}), 500
 
@@ -639,30 +1311,30 @@ def delete_model_by_client():
         client = data.get("client")
         filename = data.get("filename")
 
-        # Build filename correctly even with spaces
+        # Build filename correctly even with spaces; client → bobot di semua codec
         if client:
-            target = f"{client}_weights.npz"
+            targets = [weights_key(f"{client}_weights", f) for f in codec.CODECS]
         elif filename:
-            target = filename
+            targets = [filename]
         else:
             return jsonify({"status": "error", "message": "client atau filename required"}), 400
 
-        safe_path = safe_model_path(target)
-        if safe_path is None:
+        keys = [safe_model_key(t) for t in targets]
+        if None in keys:
             return jsonify({"status": "error", "message": "Invalid filename"}), 400
-        if not safe_path.exists():
-            return jsonify({"status": "error", "message": f"{target} tidak ditemukan"}), 404
 
-        safe_path.unlink()
-        print(f"🗑️ Model dihapus: {safe_path}")
+        # Tunggu agregasi yang sedang berjalan selesai sebelum menghapus
+        with models_lock():
+            deleted = [k for k in keys if STORAGE.delete(k)]
+        if not deleted:
+            target = f"{client}_weights" if client else filename
+            return jsonify({"status": "error", "message": f"{target} tidak ditemukan"}), 404
+        for key in deleted:
+            print(f"🗑️ Model dihapus: {display_path(key)}")
+        target = ", ".join(deleted)
 
         # Determine client_name
-        if client:
-            client_name = client
-        elif target.endswith("_weights.npz"):
-            client_name = target[:-len("_weights.npz")]
-        else:
-            client_name = None
+        client_name = client or weights_stem(filename, "_weights")
 
         deleted_logs_info = None
         if client_name:
@@ -675,6 +1347,8 @@ def delete_model_by_client():
 
         return jsonify(resp)
 
+    except LockTimeout as e:
+        return jsonify({"status": "error", "message": str(e)}), 503
     except Exception as e:
         return jsonify({"status": "error", "message": str(e)}), 500
 
@@ -685,64 +1359,66 @@ def delete_model_by_client():
 # - Cek models/logs/<client>_best_accuracy.txt terlebih dahulu
 # - Jika tidak ada, cari folder yang cocok di models/* dan baca best_accuracy.txt di sana
 # ==========================================================
+def read_best(key: str):
+    """(best_accuracy, source) dari file best_accuracy; (None, None) jika gagal dibaca."""
+    try:
+        return float(STORAGE.read_bytes(key).decode("utf-8").strip()), display_path(key)
+    except Exception:
+        return None, None
+
+
+def read_history_tail(key: str, n: int = 20) -> list:
+    try:
+        lines = STORAGE.read_log(key).decode("utf-8").strip().splitlines()
+        return lines[-n:] if len(lines) > n else lines
+    except Exception:
+        return []
+
+
+def read_telemetry_tail(key: str, n: int = 20) -> list:
+    """Record telemetry terakhir (JSONL); baris rusak dilewati."""
+    records = []
+    for line in read_history_tail(key, n):
+        try:
+            records.append(json.loads(line))
+        except ValueError:
+            continue
+    return records
+
+
 @app.route('/accuracy/<client>', methods=['GET'])
 def get_accuracy(client):
     try:
         # 1) Cek logs folder dulu (preferred)
-        best_path = LOGS_DIR / f"{client}_best_accuracy.txt"
-        history_path = LOGS_DIR / f"{client}_accuracy_history.txt"
+        best_key = f"{LOGS_PREFIX}/{client}_best_accuracy.txt"
+        history_key = f"{LOGS_PREFIX}/{client}_accuracy_history.txt"
+        telemetry_key = f"{LOGS_PREFIX}/{client}_telemetry.jsonl"
 
         best = None
         history_tail = []
         source = None
 
-        if best_path.exists():
-            # baca best dari logs
-            try:
-                with open(best_path, "r", encoding="utf-8") as bf:
-                    best = float(bf.read().strip())
-                source = str(best_path)
-            except Exception:
-                best = None
-
+        if STORAGE.exists(best_key):
+            best, source = read_best(best_key)
             # baca beberapa baris terakhir dari history jika ada
-            if history_path.exists():
-                try:
-                    with open(history_path, "r", encoding="utf-8") as hf:
-                        lines = hf.read().strip().splitlines()
-                        history_tail = lines[-20:] if len(lines) > 20 else lines
-                except Exception:
-                    history_tail = []
+            history_tail = read_history_tail(history_key)
+            return jsonify({"client": client, "best_accuracy": best, "history_tail": history_tail,
+                            "telemetry_tail": read_telemetry_tail(telemetry_key), "source": source})
 
-            return jsonify({"client": client, "best_accuracy": best, "history_tail": history_tail, "source": source})
-
-        # 2) Jika tidak ada, cari folder model yang cocok di MODELS_DIR
+        # 2) Jika tidak ada, cari folder model yang cocok di model store
         found_folder = None
-        for p in MODELS_DIR.iterdir():
-            if p.is_dir() and client.lower() in p.name.lower():
-                found_folder = p
+        for name in STORAGE.list_dirs(""):
+            if client.lower() in name.lower():
+                found_folder = name
                 break
 
         # Jika ditemukan folder, coba baca best_accuracy.txt di sana
         if found_folder:
-            candidate_best = found_folder / "best_accuracy.txt"
-            candidate_history = found_folder / "accuracy_history.txt"  # mungkin tidak ada
-            if candidate_best.exists():
-                try:
-                    with open(candidate_best, "r", encoding="utf-8") as bf:
-                        best = float(bf.read().strip())
-                    source = str(candidate_best)
-                except Exception:
-                    best = None
-
-            if candidate_history.exists():
-                try:
-                    with open(candidate_history, "r", encoding="utf-8") as hf:
-                        lines = hf.read().strip().splitlines()
-                        history_tail = lines[-20:] if len(lines) > 20 else lines
-                except Exception:
-                    history_tail = []
-
+            candidate_best = f"{found_folder}/best_accuracy.txt"
+            candidate_history = f"{found_folder}/accuracy_history.txt"  # mungkin tidak ada
+            if STORAGE.exists(candidate_best):
+                best, source = read_best(candidate_best)
+            history_tail = read_history_tail(candidate_history)
             return jsonify({"client": client, "best_accuracy": best, "history_tail": history_tail, "source": source})
 
         # 3) Tidak ditemukan
@@ -764,9 +1440,20 @@ def home():
             "/aggregate": "Lakukan agregasi global (POST)",
             "/logs": "Lihat file di models (GET)",
             "/download/<filename>": "Download file (GET)",
+            "/global/version?after=&wait=": "Versi model global, long-poll sampai ada versi baru (GET)",
+            "/events": "Server-Sent Events versi model global baru (GET, 503 jika SSE_MAX_STREAMS penuh)",
+            "/model/<filename|latest>/layers": "Index layer bobot: nama, shape, dtype, sha256 (GET)",
+            "/model/<filename|latest>/layer/<index|name>": "Byte mentah satu layer, opsional ?start=&stop= (GET)",
             "/delete/<filename>": "Hapus file (DELETE)",
             "/delete-model": "Hapus file via POST JSON",
-            "/accuracy/<client>": "Ambil best accuracy & riwayat (GET)"
+            "/accuracy/<client>": "Ambil best accuracy & riwayat (GET)",
+            "/secagg/<round>": "Status secure aggregation round (GET)",
+            "/secagg/<round>/register": "Daftarkan public key client (POST)",
+            "/secagg/<round>/reveal": "Buka seed pasangan client yang drop (POST)",
+            "/audit": "Root & ukuran audit log (GET)",
+            "/audit/<seq>": "Entry audit + inclusion proof (GET)",
+            "/audit/verify": "Verifikasi inclusion proof (POST)",
+            "/audit/file/<filename>": "Cek file model tercatat di audit log (GET)"
         }
     }
 
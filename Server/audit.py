@@ -0,0 +1,208 @@
+"""
+Audit log (append-only) untuk upload & agregasi, berbentuk Merkle tree
+ala RFC 6962 (Certificate Transparency), disimpan lewat storage backend.
+
+Objek di <prefix> (default "audit/"):
+- head.json               : {"size": n} — ditulis terakhir = commit point
+- entries/<blok>.jsonl    : entry JSON, ENTRIES_PER_BLOCK baris per blok
+- level_<k>/<blok>.bin    : hash node subtree sempurna berukuran 2^k
+                            (32 byte per node, NODES_PER_BLOCK node per blok)
+
+Append menulis paling banyak log2(n)+2 blok kecil, dan setiap subtree yang
+dibutuhkan inclusion proof dibaca langsung (range read 32 byte) dari
+level_<k>, sehingga proof berukuran O(log n) tanpa menghitung ulang tree.
+Bekerja sama di disk lokal maupun S3 (tidak butuh append-in-place).
+Pemanggil bertanggung jawab memegang lock model store saat append.
+"""
+import json
+import hashlib
+
+HASH_SIZE = 32
+
+
+def leaf_hash(data: bytes) -> bytes:
+    return hashlib.sha256(b"\x00" + data).digest()
+
+
+def node_hash(left: bytes, right: bytes) -> bytes:
+    return hashlib.sha256(b"\x01" + left + right).digest()
+
+
+def canonical(entry: dict) -> bytes:
+    return json.dumps(entry, sort_keys=True, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+
+def _largest_pow2_below(n: int) -> int:
+    """k = 2^i terbesar dengan k < n (n > 1)."""
+    return 1 << ((n - 1).bit_length() - 1)
+
+
+# ==========================================================
+# ✅ VERIFIKASI (tanpa akses ke log)
+# ==========================================================
+def root_from_proof(leaf: bytes, index: int, tree_size: int, proof: list) -> bytes:
+    """Hitung root dari leaf + audit path (RFC 9162 §2.1.3.2)."""
+    if index >= tree_size:
+        raise ValueError("index di luar tree")
+    fn, sn = index, tree_size - 1
+    r = leaf
+    for p in proof:
+        if sn == 0:
+            raise ValueError("proof terlalu panjang")
+        if fn & 1 or fn == sn:
+            r = node_hash(p, r)
+            if not fn & 1:
+                while fn and not fn & 1:
+                    fn >>= 1
+                    sn >>= 1
+        else:
+            r = node_hash(r, p)
+        fn >>= 1
+        sn >>= 1
+    if sn != 0:
+        raise ValueError("proof terlalu pendek")
+    return r
+
+
+def verify_inclusion(entry: dict, index: int, tree_size: int, proof_hex: list, root_hex: str) -> bool:
+    try:
+        proof = [bytes.fromhex(p) for p in proof_hex]
+        return root_from_proof(leaf_hash(canonical(entry)), index, tree_size, proof).hex() == root_hex
+    except ValueError:
+        return False
+
+
+# ==========================================================
+# 📜 AUDIT LOG
+# ==========================================================
+NODES_PER_BLOCK = 1024
+ENTRIES_PER_BLOCK = 256
+
+
+class AuditLog:
+    def __init__(self, storage, prefix: str = "audit"):
+        self.storage = storage
+        self.prefix = prefix.strip("/")
+        # index sha256 file → daftar seq (dibangun bertahap dari entries)
+        self._hash_index = {}
+        self._indexed_upto = 0
+
+    def _head_key(self) -> str:
+        return f"{self.prefix}/head.json"
+
+    def _node_key(self, level: int, block: int) -> str:
+        return f"{self.prefix}/level_{level}/{block:08d}.bin"
+
+    def _entry_key(self, block: int) -> str:
+        return f"{self.prefix}/entries/{block:08d}.jsonl"
+
+    # ---------- ukuran & pembacaan node ----------
+    def size(self) -> int:
+        key = self._head_key()
+        if not self.storage.exists(key):
+            return 0
+        return int(json.loads(self.storage.read_bytes(key))["size"])
+
+    def _read_node(self, level: int, index: int) -> bytes:
+        block, pos = divmod(index, NODES_PER_BLOCK)
+        data = self.storage.read_range(self._node_key(level, block), pos * HASH_SIZE, HASH_SIZE)
+        if len(data) != HASH_SIZE:
+            raise IndexError(f"node level {level} index {index} tidak ada")
+        return data
+
+    def _subtree(self, lo: int, hi: int) -> bytes:
+        """MTH(D[lo:hi]). Subtree sempurna & sejajar dibaca langsung dari level_<k>."""
+        n = hi - lo
+        if n & (n - 1) == 0 and lo % n == 0:
+            return self._read_node(n.bit_length() - 1, lo // n)
+        k = _largest_pow2_below(n)
+        return node_hash(self._subtree(lo, lo + k), self._subtree(lo + k, hi))
+
+    def root(self, tree_size: int = None) -> str:
+        n = self.size() if tree_size is None else tree_size
+        if n == 0:
+            return hashlib.sha256(b"").hexdigest()
+        return self._subtree(0, n).hex()
+
+    def _path(self, m: int, lo: int, hi: int) -> list:
+        """PATH(m, D[lo:hi]) dari RFC 6962 §2.1.1."""
+        n = hi - lo
+        if n <= 1:
+            return []
+        k = _largest_pow2_below(n)
+        if m < k:
+            return self._path(m, lo, lo + k) + [self._subtree(lo + k, hi)]
+        return self._path(m - k, lo + k, hi) + [self._subtree(lo, lo + k)]
+
+    def inclusion_proof(self, index: int, tree_size: int = None) -> list:
+        n = self.size() if tree_size is None else tree_size
+        if not 0 <= index < n <= self.size():
+            raise IndexError("index / tree_size di luar log")
+        return [h.hex() for h in self._path(index, 0, n)]
+
+    # ---------- entry ----------
+    def _entry_block(self, block: int) -> list:
+        key = self._entry_key(block)
+        if not self.storage.exists(key):
+            return []
+        return self.storage.read_bytes(key).splitlines()
+
+    def get(self, index: int) -> dict:
+        if not 0 <= index < self.size():
+            raise IndexError(f"entry {index} tidak ada")
+        block, pos = divmod(index, ENTRIES_PER_BLOCK)
+        return json.loads(self._entry_block(block)[pos])
+
+    def find_by_hash(self, sha256_hex: str) -> list:
+        """Seq entry yang menyebut sha256 tersebut (input, output, atau file upload)."""
+        n = self.size()
+        seq = self._indexed_upto
+        while seq < n:
+            block = seq // ENTRIES_PER_BLOCK
+            lines = self._entry_block(block)
+            for pos in range(seq % ENTRIES_PER_BLOCK, min(len(lines), n - block * ENTRIES_PER_BLOCK)):
+                entry = json.loads(lines[pos])
+                hashes = set(entry.get("inputs", {}).values())
+                for key in ("sha256", "output_sha256"):
+                    if entry.get(key):
+                        hashes.add(entry[key])
+                for h in hashes:
+                    self._hash_index.setdefault(h, []).append(block * ENTRIES_PER_BLOCK + pos)
+            seq = (block + 1) * ENTRIES_PER_BLOCK
+        self._indexed_upto = n
+        return list(self._hash_index.get(sha256_hex, []))
+
+    # ---------- append ----------
+    def _append_to_block(self, key: str, keep: int, data: bytes, lines=False):
+        """Tulis ulang blok: pertahankan `keep` item pertama (buang sisa crash) + data baru."""
+        old = self.storage.read_bytes(key) if keep and self.storage.exists(key) else b""
+        if lines:
+            old = b"".join(ln + b"\n" for ln in old.splitlines()[:keep])
+        else:
+            old = old[:keep * HASH_SIZE]
+        self.storage.write_bytes(key, old + data)
+
+    def append(self, entry: dict) -> dict:
+        """Tambah entry; return {seq, leaf_hash, root, tree_size}."""
+        n = self.size()
+        entry = dict(entry, seq=n)
+        data = canonical(entry)
+        leaf = leaf_hash(data)
+
+        # node parent yang menjadi lengkap karena leaf ini
+        nodes, node, idx, level = [(0, n, leaf)], leaf, n, 0
+        while idx & 1:
+            node = node_hash(self._read_node(level, idx - 1), node)
+            idx >>= 1
+            level += 1
+            nodes.append((level, idx, node))
+
+        block, pos = divmod(n, ENTRIES_PER_BLOCK)
+        self._append_to_block(self._entry_key(block), pos, data + b"\n", lines=True)
+        for level, idx, node in nodes:
+            block, pos = divmod(idx, NODES_PER_BLOCK)
+            self._append_to_block(self._node_key(level, block), pos, node)
+
+        # commit
+        self.storage.write_bytes(self._head_key(), json.dumps({"size": n + 1}).encode("utf-8"))
+        return {"seq": n, "leaf_hash": leaf.hex(), "root": self.root(n + 1), "tree_size": n + 1}
@@ -0,0 +1,88 @@
+"""
+Benchmark codec bobot: ukuran & throughput encode/decode (lihat codec.py).
+
+    python bench_codec.py                  # model kita + 1M + 10M parameter
+    python bench_codec.py --repeat 5 --sizes 50000000
+"""
+import os
+import time
+import argparse
+import tempfile
+
+import numpy as np
+
+import codec
+
+FEATURE_DIM = 53   # len(fitur_global.pkl)
+
+
+def mlp_shapes(feature_dim):
+    """Shape bobot arsitektur training (Dense-BN-Dropout-Dense-Dense-Dense)."""
+    return [
+        (feature_dim, 128), (128,), (128,), (128,), (128,), (128,),
+        (128, 64), (64,), (64, 32), (32,), (32, 1), (1,),
+    ]
+
+
+def dense_shapes(n_params):
+    cols = 1024
+    return [(n_params // cols, cols), (cols,)]
+
+
+def trained_like(shapes, seed=0):
+    """Bobot float32 mirip hasil training (normal kecil, BN var ~1)."""
+    rng = np.random.default_rng(seed)
+    return [(rng.normal(scale=0.05, size=s)).astype(np.float32) for s in shapes]
+
+
+def best_of(fn, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def touch(weights):
+    """Paksa data benar-benar dibaca (mmap bersifat lazy)."""
+    return sum(float(w.sum()) for w in weights)
+
+
+def run_case(label, weights, repeat, workdir):
+    nbytes = sum(w.nbytes for w in weights)
+    mb = nbytes / 1e6
+    print(f"\n📦 {label}: {sum(w.size for w in weights):,} parameter ({mb:.2f} MB float32)")
+    print(f"{'codec':<6} {'size':>10} {'ratio':>6} | {'encode':>10} | {'decode':>10} | {'load file':>10}")
+
+    for name in codec.CODECS:
+        data = codec.encode(weights, name)
+        path = os.path.join(workdir, f"bench_{name}.npz")
+        with open(path, "wb") as f:
+            f.write(data)
+
+        t_enc = best_of(lambda: codec.encode(weights, name), repeat)
+        t_dec = best_of(lambda: touch(codec.decode(data)), repeat)
+        t_load = best_of(lambda: touch(codec.load(path, mmap=True)), repeat)
+
+        for a, b in zip(weights, codec.load(path)):
+            assert np.array_equal(a, b), f"codec {name} tidak lossless"
+
+        print(
+            f"{name:<6} {len(data) / 1e6:>8.2f}MB {nbytes / len(data):>6.2f} | "
+            f"{mb / t_enc:>7.0f}MB/s | {mb / t_dec:>7.0f}MB/s | {mb / t_load:>7.0f}MB/s"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--sizes", type=int, nargs="*", default=[1_000_000, 10_000_000])
+    args = parser.parse_args()
+
+    compressor = "zstd" if codec.zstandard is not None else "zlib-1"
+    print(f"🗜️ Codec benchmark (best of {args.repeat}, fast = shuffle + {compressor})")
+    with tempfile.TemporaryDirectory() as workdir:
+        run_case(f"MLP dim={FEATURE_DIM}", trained_like(mlp_shapes(FEATURE_DIM)), args.repeat, workdir)
+        for n in args.sizes:
+            run_case(f"dense {n // 1_000_000}M", trained_like(dense_shapes(n)), args.repeat, workdir)
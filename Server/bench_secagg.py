@@ -0,0 +1,91 @@
+"""
+Benchmark overhead secure aggregation vs FedAvg biasa.
+
+    python bench_secagg.py                 # model kita + 1M + 10M parameter
+    python bench_secagg.py --clients 5 --repeat 5
+"""
+import time
+import argparse
+import numpy as np
+
+import secagg
+
+FEATURE_DIM = 53   # len(fitur_global.pkl)
+
+
+def mlp_shapes(feature_dim):
+    """Shape bobot arsitektur training (Dense-BN-Dropout-Dense-Dense-Dense)."""
+    return [
+        (feature_dim, 128), (128,), (128,), (128,), (128,), (128,),
+        (128, 64), (64,), (64, 32), (32,), (32, 1), (1,),
+    ]
+
+
+def dense_shapes(n_params):
+    """Model sintetis dengan ~n_params parameter (satu matriks besar + bias)."""
+    cols = 1024
+    return [(n_params // cols, cols), (cols,)]
+
+
+def plain_fedavg(all_weights):
+    return [np.mean(np.stack(layer, axis=0), axis=0) for layer in zip(*all_weights)]
+
+
+def best_of(fn, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def run_case(label, shapes, n_clients, repeat):
+    rng = np.random.default_rng(0)
+    names = [f"client{i}" for i in range(n_clients)]
+    weights = {n: [rng.normal(scale=0.1, size=s).astype(np.float32) for s in shapes] for n in names}
+    keys = {n: secagg.generate_keypair() for n in names}
+    public = {n: keys[n][1] for n in names}
+    n_params = sum(int(np.prod(s)) for s in shapes)
+
+    t_plain = best_of(lambda: plain_fedavg(list(weights.values())), repeat)
+
+    masked = {}
+
+    def mask_all():
+        for n in names:
+            masked[n] = secagg.mask_weights(weights[n], n, keys[n][0], public, "bench")
+
+    t_mask = best_of(mask_all, repeat) / n_clients   # waktu per client
+    t_unmask = best_of(lambda: secagg.unmask_mean(masked, names, {}), repeat)
+
+    # dropout: client terakhir tidak upload, yang lain membuka seed
+    dropped = names[-1]
+    survivors = {n: masked[n] for n in names[:-1]}
+    revealed = {
+        (s, dropped): secagg.pair_seed(keys[s][0], public[dropped], "bench", s, dropped)
+        for s in survivors
+    }
+    t_drop = best_of(lambda: secagg.unmask_mean(survivors, names, revealed), repeat)
+
+    avg = secagg.unmask_mean(masked, names, {})
+    err = max(float(np.max(np.abs(a - b))) for a, b in zip(avg, plain_fedavg(list(weights.values()))))
+
+    print(
+        f"{label:<14} {n_params:>11,} | plain {t_plain * 1e3:9.2f} ms | "
+        f"mask/client {t_mask * 1e3:9.2f} ms | unmask {t_unmask * 1e3:9.2f} ms | "
+        f"unmask+drop {t_drop * 1e3:9.2f} ms | x{(t_unmask / t_plain):6.1f} | max err {err:.1e}"
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--clients", type=int, default=3)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--sizes", type=int, nargs="*", default=[1_000_000, 10_000_000])
+    args = parser.parse_args()
+
+    print(f"🔐 Secure aggregation benchmark ({args.clients} client, best of {args.repeat})")
+    run_case(f"MLP dim={FEATURE_DIM}", mlp_shapes(FEATURE_DIM), args.clients, args.repeat)
+    for n in args.sizes:
+        run_case(f"dense {n // 1_000_000}M", dense_shapes(n), args.clients, args.repeat)
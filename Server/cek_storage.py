@@ -0,0 +1,31 @@
+"""
+Cek cepat storage backend sesuai env (STORAGE_BACKEND, MODELS_DIR, S3_*).
+
+    python cek_storage.py
+    STORAGE_BACKEND=s3 S3_BUCKET=fl-models S3_ENDPOINT_URL=http://localhost:9000 python cek_storage.py
+"""
+import io
+import uuid
+
+from storage import storage_from_env
+
+storage = storage_from_env()
+print(f"🗂️ Backend: {storage.backend} → {storage.describe()}")
+
+key = f"_cek/{uuid.uuid4().hex}.bin"
+data = b"federated-" * 200_000   # ~2 MB → lewat jalur multi-chunk
+
+with storage.lock("cek", timeout=10):
+    storage.write_file(key, io.BytesIO(data))
+    assert storage.stat(key).size == len(data)
+    assert b"".join(storage.iter_chunks(key)) == data
+    assert storage.read_range(key, 10, 10) == data[10:20]
+    assert any(o.key == key for o in storage.list("_cek"))
+    assert storage.delete(key)
+    log_key = f"_cek/{uuid.uuid4().hex}.log"
+    storage.append_log(log_key, b"a\n")
+    storage.append_log(log_key, b"b\n")
+    assert storage.read_log(log_key) == b"a\nb\n"
+    assert storage.delete_log(log_key)
+
+print("✅ write/stream/range/list/delete/log/lock OK")
@@ -0,0 +1,317 @@
+"""
+Codec serialisasi bobot model (list tensor numpy).
+
+- npz  : np.savez_compressed (zlib) — format lama, tetap dipakai untuk kompatibilitas
+         (download client, Flask inference, upload lama).
+- raw  : satu container tanpa kompresi, setiap tensor disejajarkan 64 byte sehingga
+         bisa dibaca zero-copy / np.memmap (mmap_mode='r') tanpa inflate.
+- fast : container yang sama, tiap tensor di-byte-shuffle lalu dikompres zstd
+         (paket `zstandard`, opsional) atau zlib level 1 jika zstd tidak tersedia.
+
+Format container (raw & fast), little-endian:
+    MAGIC (6 byte) | panjang header uint32 | header JSON (dipad ke kelipatan 64) | data
+Header berisi index tensor: name, dtype, shape, offset (absolut), nbytes, stored,
+sha256 (isi tensor C-order tanpa kompresi). Dengan index ini satu layer bisa dibaca
+lewat range read (read_index / read_tensor) tanpa menyentuh layer lain, dan tensor
+raw dibaca dengan np.frombuffer tanpa salinan.
+Format dideteksi dari magic byte; nama objek di server memakai sufiks per codec
+(SUFFIXES) agar container raw/fast tidak tersimpan dengan nama .npz.
+"""
+import io
+import json
+import zlib
+import struct
+import hashlib
+
+import numpy as np
+
+try:
+    import zstandard
+except ImportError:  # opsional
+    zstandard = None
+
+MAGIC = b"\x93FLWT\x01"
+NPZ_MAGIC = b"PK\x03\x04"
+ALIGN = 64
+CODECS = ("npz", "raw", "fast")
+SUFFIXES = {"npz": ".npz", "raw": ".raw", "fast": ".fast"}
+ZSTD_LEVEL = 3
+ZLIB_LEVEL = 1
+
+_PREFIX = len(MAGIC) + 4
+
+
+def _align(n: int) -> int:
+    return (n + ALIGN - 1) // ALIGN * ALIGN
+
+
+def detect(head: bytes) -> str:
+    """'npz' atau 'container' berdasarkan byte awal file."""
+    if head[:len(MAGIC)] == MAGIC:
+        return "container"
+    if head[:len(NPZ_MAGIC)] == NPZ_MAGIC:
+        return "npz"
+    raise ValueError("format bobot tidak dikenal (bukan NPZ / container)")
+
+
+def split_suffix(name: str):
+    """'dinsos_weights.raw' → ('dinsos_weights', 'raw'); tanpa sufiks bobot → (name, None)."""
+    for fmt, suffix in SUFFIXES.items():
+        if name.endswith(suffix):
+            return name[:-len(suffix)], fmt
+    return name, None
+
+
+# ==========================================================
+# 🗜️ SHUFFLE + KOMPRESI (codec fast)
+# ==========================================================
+def _shuffle(arr: np.ndarray) -> bytes:
+    """Kelompokkan byte ke-k setiap elemen (exponent float jadi berdekatan)."""
+    if arr.itemsize == 1:
+        return arr.tobytes()
+    return arr.reshape(-1).view(np.uint8).reshape(-1, arr.itemsize).T.tobytes()
+
+
+def _unshuffle(data: bytes, dtype: np.dtype, shape) -> np.ndarray:
+    if dtype.itemsize == 1:
+        return np.frombuffer(data, dtype=dtype).reshape(shape)
+    planes = np.frombuffer(data, dtype=np.uint8).reshape(dtype.itemsize, -1)
+    return np.ascontiguousarray(planes.T).view(dtype).reshape(shape)
+
+
+def _compress(data: bytes, compressor: str) -> bytes:
+    if compressor == "zstd":
+        return zstandard.ZstdCompressor(level=ZSTD_LEVEL).compress(data)
+    return zlib.compress(data, ZLIB_LEVEL)
+
+
+def _decompress(data: bytes, compressor: str) -> bytes:
+    if compressor == "zstd":
+        if zstandard is None:
+            raise ImportError("container dikompres zstd, install paket `zstandard`")
+        return zstandard.ZstdDecompressor().decompress(data)
+    return zlib.decompress(data)
+
+
+# ==========================================================
+# 📝 ENCODE
+# ==========================================================
+def _container(arrays, compressed: bool, names=None):
+    # np.asarray + order="C" (ascontiguousarray mengubah skalar 0-d menjadi shape (1,))
+    arrays = [np.asarray(a, order="C") for a in arrays]
+    compressor = ("zstd" if zstandard is not None else "zlib") if compressed else None
+
+    payloads, tensors = [], []
+    for i, arr in enumerate(arrays):
+        if arr.dtype.hasobject:
+            raise ValueError(f"tensor arr_{i} bertipe object, tidak bisa disimpan di container")
+        raw = arr.tobytes()
+        data = _compress(_shuffle(arr), compressor) if compressed else raw
+        payloads.append(data)
+        tensors.append({
+            "name": names[i] if names else f"arr_{i}",
+            "dtype": arr.dtype.str,
+            "shape": list(arr.shape),
+            "nbytes": int(arr.nbytes),
+            "stored": len(data),
+            "sha256": hashlib.sha256(raw).hexdigest(),
+        })
+
+    header = {"codec": "fast" if compressed else "raw", "compressor": compressor, "tensors": tensors}
+    # offset bergantung pada panjang header → hitung ulang sampai stabil
+    data_start = 0
+    while True:
+        offset = data_start
+        for t in tensors:
+            t["offset"] = offset
+            offset = _align(offset + t["stored"])
+        blob = json.dumps(header, separators=(",", ":")).encode("utf-8")
+        needed = _align(_PREFIX + len(blob))
+        if needed == data_start:
+            break
+        data_start = needed
+
+    blob = blob.ljust(data_start - _PREFIX, b" ")
+    return MAGIC + struct.pack("<I", len(blob)) + blob, tensors, payloads
+
+
+def write(fileobj, arrays, codec: str = "npz", names=None):
+    """Tulis list tensor ke file-like dengan codec tertentu (names: nama layer opsional)."""
+    if codec == "npz":
+        np.savez_compressed(fileobj, *arrays)
+        return
+    if codec not in CODECS:
+        raise ValueError(f"codec tidak dikenal: {codec} (pilih {', '.join(CODECS)})")
+
+    head, tensors, payloads = _container(arrays, compressed=(codec == "fast"), names=names)
+    fileobj.write(head)
+    pos = len(head)
+    for t, data in zip(tensors, payloads):
+        fileobj.write(b"\0" * (t["offset"] - pos))
+        fileobj.write(data)
+        pos = t["offset"] + len(data)
+
+
+def encode(arrays, codec: str = "npz", names=None) -> bytes:
+    buf = io.BytesIO()
+    write(buf, arrays, codec, names)
+    return buf.getvalue()
+
+
+# ==========================================================
+# 📖 DECODE
+# ==========================================================
+def read_header(head: bytes) -> dict:
+    """Header container dari byte awal file (minimal 10 byte + panjang header)."""
+    if head[:len(MAGIC)] != MAGIC:
+        raise ValueError("bukan container bobot")
+    (length,) = struct.unpack("<I", head[len(MAGIC):_PREFIX])
+    if len(head) < _PREFIX + length:
+        raise ValueError("header container terpotong")
+    return json.loads(head[_PREFIX:_PREFIX + length])
+
+
+def _tensor(buf, header: dict, t: dict) -> np.ndarray:
+    dtype = np.dtype(t["dtype"])
+    if t["nbytes"] == 0:
+        return np.empty(t["shape"], dtype=dtype)
+    if header["codec"] == "raw":
+        # zero-copy: view langsung ke buffer (bytes / mmap)
+        return np.frombuffer(buf, dtype=dtype, count=t["nbytes"] // dtype.itemsize,
+                             offset=t["offset"]).reshape(t["shape"])
+    data = bytes(buf[t["offset"]:t["offset"] + t["stored"]])
+    return _unshuffle(_decompress(data, header["compressor"]), dtype, t["shape"])
+
+
+def decode(data, allow_pickle: bool = False) -> list:
+    """bytes / memoryview (NPZ atau container) → list tensor."""
+    if detect(bytes(data[:8])) == "npz":
+        with np.load(io.BytesIO(data), allow_pickle=allow_pickle) as npz:
+            return [npz[k] for k in npz.files]
+    (length,) = struct.unpack("<I", bytes(data[len(MAGIC):_PREFIX]))
+    header = read_header(bytes(data[:_PREFIX + length]))
+    return [_tensor(data, header, t) for t in header["tensors"]]
+
+
+def load(path, mmap: bool = True, allow_pickle: bool = False) -> list:
+    """
+    Baca file lokal. Container raw + mmap=True → tensor read-only yang di-mmap
+    (halaman dibaca OS saat disentuh, tanpa salinan penuh di RAM).
+    """
+    with open(path, "rb") as f:
+        head = f.read(_PREFIX)
+        if detect(head) == "npz":
+            f.seek(0)
+            with np.load(f, allow_pickle=allow_pickle) as npz:
+                return [npz[k] for k in npz.files]
+        (length,) = struct.unpack("<I", head[len(MAGIC):])
+        header = read_header(head + f.read(length))
+        if header["codec"] == "raw" and mmap:
+            buf = np.memmap(path, dtype=np.uint8, mode="r")
+        else:
+            f.seek(0)
+            buf = f.read()
+    return [_tensor(buf, header, t) for t in header["tensors"]]
+
+
+# ==========================================================
+# 🧩 AKSES PER LAYER (range read)
+# ==========================================================
+def read_index(read_range):
+    """
+    Header container memakai read_range(start, length) -> bytes
+    (mis. storage.read_range atau file). None jika objek bukan container.
+    """
+    head = read_range(0, _PREFIX)
+    if head[:len(MAGIC)] != MAGIC:
+        return None
+    (length,) = struct.unpack("<I", head[len(MAGIC):_PREFIX])
+    return read_header(head + read_range(_PREFIX, length))
+
+
+def find_tensor(header: dict, layer) -> int:
+    """Posisi tensor berdasarkan index (int / str angka) atau nama layer."""
+    tensors = header["tensors"]
+    if isinstance(layer, int) or str(layer).isdigit():
+        i = int(layer)
+        if 0 <= i < len(tensors):
+            return i
+    else:
+        for i, t in enumerate(tensors):
+            if t["name"] == layer:
+                return i
+    raise KeyError(f"layer {layer} tidak ada")
+
+
+def read_tensor_bytes(read_range, header: dict, i: int, start: int = 0, stop: int = None) -> bytes:
+    """
+    Byte C-order tensor ke-i, opsional hanya elemen [start:stop) dari tensor yang
+    di-flatten. Container raw hanya membaca byte yang diminta.
+    """
+    t = header["tensors"][i]
+    itemsize = np.dtype(t["dtype"]).itemsize
+    count = t["nbytes"] // itemsize
+    start, stop, _ = slice(start, stop).indices(count)
+    stop = max(start, stop)
+    if header["codec"] == "raw":
+        if stop == start:
+            return b""
+        return read_range(t["offset"] + start * itemsize, (stop - start) * itemsize)
+    data = _decompress(read_range(t["offset"], t["stored"]), header["compressor"])
+    planes = np.frombuffer(data, dtype=np.uint8).reshape(itemsize, -1)
+    return np.ascontiguousarray(planes[:, start:stop].T).tobytes()
+
+
+def tensor_from_bytes(data: bytes, t: dict) -> np.ndarray:
+    """Bytes satu tensor utuh → ndarray (zero-copy, read-only)."""
+    return np.frombuffer(data, dtype=np.dtype(t["dtype"])).reshape(t["shape"])
+
+
+class LazyWeights:
+    """
+    Akses bobot file lokal per tensor tanpa memuat seluruh file.
+    Container raw di-mmap, container fast didekompres per layer, NPZ dibaca per member.
+    """
+
+    def __init__(self, path, allow_pickle: bool = False):
+        self.path = str(path)
+        self._file = open(self.path, "rb")
+        self.header = read_index(self._read_range)
+        self._npz = None
+        self._mmap = None
+        if self.header is None:
+            self._npz = np.load(self.path, allow_pickle=allow_pickle)
+            self.names = list(self._npz.files)
+        else:
+            self.names = [t["name"] for t in self.header["tensors"]]
+            if self.header["codec"] == "raw":
+                self._mmap = np.memmap(self.path, dtype=np.uint8, mode="r")
+
+    def _read_range(self, start: int, length: int) -> bytes:
+        self._file.seek(start)
+        return self._file.read(length)
+
+    def __len__(self):
+        return len(self.names)
+
+    def __getitem__(self, layer) -> np.ndarray:
+        if self._npz is not None:
+            name = self.names[layer] if isinstance(layer, int) else layer
+            return self._npz[name]
+        i = find_tensor(self.header, layer)
+        t = self.header["tensors"][i]
+        if self._mmap is not None:
+            return _tensor(self._mmap, self.header, t)
+        return tensor_from_bytes(read_tensor_bytes(self._read_range, self.header, i), t)
+
+    def close(self):
+        self._file.close()
+        if self._npz is not None:
+            self._npz.close()
+        self._mmap = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
@@ -1,57 +1,155 @@
+import os
+import json
+import time
+import hashlib
+import argparse
 import requests
 import numpy as np
 from pathlib import Path
 
+import codec
+
 SERVER_URL = "https://federatedinstitusi.up.railway.app"
 DOWNLOAD_DIR = Path("models/global")
 DOWNLOAD_DIR.mkdir(parents=True, exist_ok=True)
 
+# versi global terakhir yang sudah diunduh (untuk --watch)
+VERSION_FILE = DOWNLOAD_DIR / "last_version.json"
+LONGPOLL_WAIT = 55   # detik per long-poll (server membatasi maks 60)
+
 url = f"{SERVER_URL}/download-global"
 
-print("🌍 Mengunduh model global terbaru...")
-print(url)
 
-try:
-    response = requests.get(url, timeout=120)
-except requests.exceptions.RequestException as e:
-    print(f"❌ Gagal koneksi: {e}")
-    raise SystemExit(1)
+def download_latest(session=requests):
+    print("🌍 Mengunduh model global terbaru...")
+    print(url)
 
-if response.status_code != 200:
-    print(f"❌ Gagal download ({response.status_code})")
     try:
-        print("📨 Pesan server:", response.json())
-    except Exception:
-        print(response.text)
-    raise SystemExit(1)
-
-filename = response.headers.get("X-File-Name", "global_model_fedavg_latest.npz")
-save_path = DOWNLOAD_DIR / filename
-
-with open(save_path, "wb") as f:
-    f.write(response.content)
-
-# --- Validasi dasar ---
-if save_path.stat().st_size < 1024:
-    print("❌ File terlalu kecil, kemungkinan invalid.")
-    raise SystemExit(1)
-
-# --- Validasi NPZ ---
-try:
-    data = np.load(save_path)
-    print(f"🔎 NPZ valid: {len(data.files)} tensor")
-except Exception as e:
-    print(f"❌ File NPZ rusak: {e}")
-    raise SystemExit(1)
-
-size_mb = save_path.stat().st_size / 1024 / 1024
-
-print("\n✅ BERHASIL")
-print(f"📁 File disimpan : {save_path}")
-print(f"📦 Ukuran        : {size_mb:.2f} MB")
-
-print("\nℹ️ Metadata:")
-print(" - X-File-Name     :", response.headers.get("X-File-Name"))
-print(" - X-File-Size     :", response.headers.get("X-File-Size"))
-print(" - X-Last-Modified :", response.headers.get("X-Last-Modified"))
-print(" - X-Description   :", response.headers.get("X-Description"))
+        response = session.get(url, timeout=120)
+    except requests.exceptions.RequestException as e:
+        print(f"❌ Gagal koneksi: {e}")
+        return None
+
+    if response.status_code != 200:
+        print(f"❌ Gagal download ({response.status_code})")
+        try:
+            print("📨 Pesan server:", response.json())
+        except Exception:
+            print(response.text)
+        return None
+
+    filename = response.headers.get("X-File-Name", "global_model_fedavg_latest.npz")
+    save_path = DOWNLOAD_DIR / filename
+
+    with open(save_path, "wb") as f:
+        f.write(response.content)
+
+    # --- Validasi dasar ---
+    if save_path.stat().st_size < 1024:
+        print("❌ File terlalu kecil, kemungkinan invalid.")
+        return None
+
+    # --- Validasi NPZ ---
+    try:
+        data = np.load(save_path)
+        print(f"🔎 NPZ valid: {len(data.files)} tensor")
+    except Exception as e:
+        print(f"❌ File NPZ rusak: {e}")
+        return None
+
+    size_mb = save_path.stat().st_size / 1024 / 1024
+
+    print("\n✅ BERHASIL")
+    print(f"📁 File disimpan : {save_path}")
+    print(f"📦 Ukuran        : {size_mb:.2f} MB")
+
+    print("\nℹ️ Metadata:")
+    print(" - X-File-Name      :", response.headers.get("X-File-Name"))
+    print(" - X-File-Size      :", response.headers.get("X-File-Size"))
+    print(" - X-Last-Modified  :", response.headers.get("X-Last-Modified"))
+    print(" - X-Global-Version :", response.headers.get("X-Global-Version"))
+    print(" - X-Description    :", response.headers.get("X-Description"))
+    return save_path
+
+
+def download_version(info, session=requests):
+    """
+    Unduh tepat file yang diumumkan /global/version (bukan "terbaru" saat ini)
+    sebagai byte tersimpan (?format=container), lalu cek sha256 registry.
+    """
+    save_path = DOWNLOAD_DIR / Path(info["file"]).name
+    tmp = save_path.with_suffix(".part")
+    h = hashlib.sha256()
+    try:
+        with session.get(f"{SERVER_URL}/download/{info['file']}", params={"format": "container"},
+                         stream=True, timeout=120) as res:
+            if res.status_code != 200:
+                print(f"❌ Gagal download {info['file']} ({res.status_code})")
+                return None
+            with open(tmp, "wb") as f:
+                for chunk in res.iter_content(1 << 20):
+                    h.update(chunk)
+                    f.write(chunk)
+    except requests.exceptions.RequestException as e:
+        print(f"❌ Gagal koneksi: {e}")
+        tmp.unlink(missing_ok=True)
+        return None
+
+    if info.get("sha256") and h.hexdigest() != info["sha256"]:
+        print(f"❌ sha256 {info['file']} tidak cocok dengan versi {info['version']}")
+        tmp.unlink(missing_ok=True)
+        return None
+    try:
+        n_tensors = len(codec.load(tmp, mmap=False))
+    except Exception as e:
+        print(f"❌ File bobot rusak: {e}")
+        tmp.unlink(missing_ok=True)
+        return None
+
+    os.replace(tmp, save_path)
+    print(f"✅ Versi {info['version']} disimpan: {save_path} ({n_tensors} tensor, sha256 cocok)")
+    return save_path
+
+
+def watch():
+    """Long-poll /global/version; unduh hanya saat ada versi global baru."""
+    last = json.loads(VERSION_FILE.read_text())["version"] if VERSION_FILE.exists() else 0
+    print(f"👀 Menunggu model global baru (versi terakhir: {last})...")
+
+    session = requests.Session()
+    backoff = 1
+    while True:
+        try:
+            res = session.get(
+                f"{SERVER_URL}/global/version",
+                params={"after": last, "wait": LONGPOLL_WAIT},
+                timeout=LONGPOLL_WAIT + 30,
+            )
+            res.raise_for_status()
+            info = res.json()
+            backoff = 1
+        except requests.exceptions.RequestException as e:
+            print(f"⚠️ Long-poll gagal: {e} — coba lagi dalam {backoff} detik")
+            time.sleep(backoff)
+            backoff = min(backoff * 2, 60)
+            continue
+
+        if not info.get("changed"):
+            continue
+
+        print(f"\n🔔 Versi global {info['version']} dipublish ({info['file']}, {info['size']} bytes)")
+        if download_version(info, session) is not None:
+            last = info["version"]
+            VERSION_FILE.write_text(json.dumps(info, indent=2))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Download model global dari server")
+    parser.add_argument("--watch", action="store_true",
+                        help="tetap berjalan & unduh setiap kali versi global baru dipublish")
+    args = parser.parse_args()
+
+    if args.watch:
+        watch()
+    elif download_latest() is None:
+        raise SystemExit(1)
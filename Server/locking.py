@@ -0,0 +1,119 @@
+"""
+Koordinasi lintas-proses untuk model store.
+
+- FileLock           : lock eksklusif berbasis file (flock / msvcrt) yang juga
+                       berlaku antar worker gunicorn dan antar thread.
+- snapshot_key       : sidik jari input agregasi (key, ukuran, versi objek client).
+- atomic_write_bytes : tulis file ke temp lalu os.replace, sehingga pembaca tidak
+                       pernah melihat file setengah jadi.
+"""
+import os
+import json
+import time
+import hashlib
+import tempfile
+from pathlib import Path
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+
+class LockTimeout(Exception):
+    """Lock tidak berhasil didapat dalam batas waktu."""
+
+
+# ==========================================================
+# 🔒 FILE LOCK
+# ==========================================================
+class FileLock:
+    """
+    Lock eksklusif pada sebuah file. Setiap acquire membuka file descriptor
+    sendiri, jadi dua thread dalam proses yang sama juga saling menunggu.
+    """
+
+    def __init__(self, path, timeout=None, poll_interval=0.05):
+        self.path = Path(path)
+        self.timeout = timeout
+        self.poll_interval = poll_interval
+        self._fd = None
+
+    def _try_lock(self, fd) -> bool:
+        try:
+            if fcntl is not None:
+                fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            else:
+                msvcrt.locking(fd, msvcrt.LK_NBLCK, 1)
+            return True
+        except OSError:
+            return False
+
+    def acquire(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+        deadline = None if self.timeout is None else time.monotonic() + self.timeout
+
+        while not self._try_lock(fd):
+            if deadline is not None and time.monotonic() >= deadline:
+                os.close(fd)
+                raise LockTimeout(f"Timeout menunggu lock {self.path.name} ({self.timeout}s)")
+            time.sleep(self.poll_interval)
+
+        self._fd = fd
+        return self
+
+    def release(self):
+        if self._fd is None:
+            return
+        try:
+            if fcntl is not None:
+                fcntl.flock(self._fd, fcntl.LOCK_UN)
+            else:
+                os.lseek(self._fd, 0, os.SEEK_SET)
+                msvcrt.locking(self._fd, msvcrt.LK_UNLCK, 1)
+        finally:
+            os.close(self._fd)
+            self._fd = None
+
+    def __enter__(self):
+        return self.acquire()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.release()
+
+
+# ==========================================================
+# 🧾 SNAPSHOT INPUT AGREGASI
+# ==========================================================
+def snapshot_key(storage, keys, extra=None) -> str:
+    """
+    Hash dari (key, ukuran, versi) setiap objek input + parameter tambahan.
+    Dua request dengan snapshot yang sama akan menghasilkan model global yang sama.
+    """
+    h = hashlib.sha256()
+    for key in sorted(keys):
+        info = storage.stat(key)
+        h.update(f"{key}\0{info.size}\0{info.version}\n".encode("utf-8"))
+    if extra:
+        h.update(json.dumps(extra, sort_keys=True, default=str).encode("utf-8"))
+    return h.hexdigest()
+
+
+# ==========================================================
+# 💾 ATOMIC WRITE
+# ==========================================================
+def atomic_write_bytes(path: Path, data: bytes):
+    path = Path(path)
+    fd, tmp = tempfile.mkstemp(prefix=f".{path.name}.", suffix=".tmp", dir=path.parent)
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.unlink(tmp)
+        raise
@@ -0,0 +1,89 @@
+"""
+Registry versi model global + notifikasi (long-poll / SSE).
+
+Setiap kali agregasi menyimpan model global, publish() menulis objek
+global_version.json ({version, file, sha256, size, published_at, method}).
+Request yang menunggu versi baru tidak membaca storage masing-masing:
+satu thread watcher per proses mengecek versi objek tersebut (HEAD / stat)
+setiap poll_interval detik, lalu membangunkan semua penunggu lewat Condition.
+Publish dari proses yang sama langsung membangunkan penunggu tanpa menunggu poll,
+dan worker / replika lain menyusul paling lambat poll_interval detik.
+"""
+import time
+import threading
+from datetime import datetime
+
+from storage import read_json, write_json
+
+
+class GlobalVersionWatcher:
+    def __init__(self, storage, key: str = "global_version.json", poll_interval: float = 1.0):
+        self.storage = storage
+        self.key = key
+        self.poll_interval = poll_interval
+        self._cond = threading.Condition()
+        self._current = None
+        self._object_version = None
+        self._thread = None
+
+    # ---------- baca / tulis ----------
+    def _load(self) -> dict:
+        return read_json(self.storage, self.key) or {"version": 0, "file": None}
+
+    def current(self) -> dict:
+        with self._cond:
+            if self._current is None:
+                self._current = self._load()
+            return dict(self._current)
+
+    def publish(self, file_key: str, sha256: str, size: int, **extra) -> dict:
+        """Daftarkan versi global baru. Pemanggil memegang lock model store."""
+        prev = self._load()
+        entry = {
+            "version": int(prev.get("version", 0)) + 1,
+            "file": file_key,
+            "sha256": sha256,
+            "size": size,
+            "published_at": datetime.utcnow().isoformat() + "Z",
+            **extra,
+        }
+        write_json(self.storage, self.key, entry)
+        self._set(entry)
+        return entry
+
+    def _set(self, entry: dict):
+        with self._cond:
+            if self._current is None or entry["version"] != self._current.get("version"):
+                self._current = entry
+                self._cond.notify_all()
+
+    # ---------- watcher ----------
+    def _ensure_thread(self):
+        with self._cond:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._poll, name="global-version-watcher", daemon=True)
+                self._thread.start()
+
+    def _poll(self):
+        while True:
+            try:
+                obj_version = self.storage.stat(self.key).version if self.storage.exists(self.key) else None
+                if obj_version != self._object_version:
+                    self._object_version = obj_version
+                    self._set(self._load())
+            except Exception as e:
+                print(f"⚠️ Watcher versi global gagal membaca storage: {e}")
+            time.sleep(self.poll_interval)
+
+    def wait_newer(self, after: int, timeout: float) -> dict:
+        """Tunggu sampai version > after atau timeout; return versi saat itu."""
+        self._ensure_thread()
+        deadline = time.monotonic() + max(0.0, timeout)
+        with self._cond:
+            while True:
+                current = self._current if self._current is not None else self._load()
+                self._current = current
+                remaining = deadline - time.monotonic()
+                if current.get("version", 0) > after or remaining <= 0:
+                    return dict(current)
+                self._cond.wait(remaining)
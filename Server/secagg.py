@@ -0,0 +1,191 @@
+"""
+Secure aggregation (pairwise masking) untuk FedAvg.
+
+Alur singkat:
+1. Setiap client membuat keypair Diffie-Hellman per round dan mendaftarkan
+   public key ke server.
+2. Untuk setiap pasangan (i, j) kedua client menghitung seed yang sama
+   s_ij = SHA256(g^(a_i a_j) || round || i || j). Seed diekspansi dengan PRG
+   counter-based (Philox) menjadi vektor mask sepanjang seluruh parameter.
+3. Client i mengirim  enc(x_i) + Σ_{j>i} PRG(s_ij) − Σ_{j<i} PRG(s_ij)  (mod 2^64),
+   dengan enc() = fixed-point int64. Saat semua client dijumlahkan mask saling
+   menghapus, sehingga server hanya mengetahui total (lalu rata-rata).
+4. Dropout: jika client j tidak upload, client yang selamat membuka s_ij
+   (hanya untuk j yang drop) agar server bisa menghapus sisa mask.
+
+Semua operasi mask/unmask divektorisasi atas seluruh tensor (uint64 wrap-around).
+Catatan: ini varian ringkas tanpa self-mask/Shamir. Server yang jujur-tapi-penasaran
+tidak melihat bobot individual, asalkan upload terlambat dari client yang seed-nya
+sudah dibuka ditolak (lihat /secagg/<round>/reveal di app.py).
+"""
+import hashlib
+import secrets
+
+import numpy as np
+
+# RFC 3526 — 2048-bit MODP Group (id 14)
+MODP_P = int(
+    "FFFFFFFFFFFFFFFFC90FDAA22168C234C4C6628B80DC1CD129024E088A67CC74"
+    "020BBEA63B139B22514A08798E3404DDEF9519B3CD3A431B302B0A6DF25F1437"
+    "4FE1356D6D51C245E485B576625E7EC6F44C42E9A637ED6B0BFF5CB6F406B7ED"
+    "EE386BFB5A899FA5AE9F24117C4B1FE649286651ECE45B3DC2007CB8A163BF05"
+    "98DA48361C55D39A69163FA8FD24CF5F83655D23DCA3AD961C62F356208552BB"
+    "9ED529077096966D670C354E4ABC9804F1746C08CA18217C32905E462E36CE3B"
+    "E39E772C180E86039B2783A2EC07A28FB5C55DF06F4C52C9DE2BCBF695581718"
+    "3995497CEA956AE515D2261898FA051015728E5A8AACAA68FFFFFFFFFFFFFFFF",
+    16,
+)
+MODP_G = 2
+
+SCALE_BITS = 32          # resolusi fixed-point 2^-32
+
+
+# ==========================================================
+# 🔑 KEY AGREEMENT
+# ==========================================================
+def generate_keypair():
+    """Return (secret, public) sebagai int."""
+    secret = secrets.randbelow(MODP_P - 3) + 2
+    return secret, pow(MODP_G, secret, MODP_P)
+
+
+def pair_seed(secret: int, peer_public: int, round_id: str, a: str, b: str) -> bytes:
+    """Seed 32-byte yang identik di kedua sisi pasangan (a, b)."""
+    if not (1 < peer_public < MODP_P - 1):
+        raise ValueError("public key peer tidak valid")
+    shared = pow(peer_public, secret, MODP_P)
+    lo, hi = sorted((a, b))
+    h = hashlib.sha256()
+    h.update(shared.to_bytes(256, "big"))
+    h.update(f"\0{round_id}\0{lo}\0{hi}".encode("utf-8"))
+    return h.digest()
+
+
+# ==========================================================
+# 🎲 PRG COUNTER-BASED
+# ==========================================================
+def expand_seed(seed: bytes, n: int) -> np.ndarray:
+    """Ekspansi seed → n uint64 memakai Philox (counter-based, vektorisasi penuh)."""
+    key = np.frombuffer(seed[:16], dtype=np.uint64)
+    bitgen = np.random.Philox(key=key)
+    return bitgen.random_raw(n).astype(np.uint64, copy=False)
+
+
+# ==========================================================
+# 🔢 FIXED-POINT ENCODING
+# ==========================================================
+def flatten(weights):
+    shapes = [np.shape(w) for w in weights]
+    dtypes = [np.asarray(w).dtype for w in weights]
+    flat = np.concatenate([np.asarray(w, dtype=np.float64).ravel() for w in weights])
+    return flat, shapes, dtypes
+
+
+def unflatten(flat, shapes, dtypes=None):
+    out, pos = [], 0
+    for i, shape in enumerate(shapes):
+        size = int(np.prod(shape, dtype=np.int64))
+        arr = flat[pos:pos + size].reshape(shape)
+        if dtypes is not None:
+            arr = arr.astype(dtypes[i])
+        out.append(arr)
+        pos += size
+    return out
+
+
+def max_abs_weight(n_participants: int, scale_bits: int = SCALE_BITS) -> float:
+    """
+    Batas |bobot| per client agar JUMLAH n_participants nilai fixed-point tetap
+    muat di int64 (|Σ| < 2^62, sisa 1 bit untuk pembulatan). Tanpa batas ini
+    jumlah di server wrap-around mod 2^64 tanpa error dan rata-ratanya salah.
+    """
+    return 2.0 ** (62 - scale_bits) / max(int(n_participants), 1)
+
+
+def encode_fixed(flat: np.ndarray, scale_bits: int = SCALE_BITS,
+                 n_participants: int = 1) -> np.ndarray:
+    if flat.size:
+        if not np.all(np.isfinite(flat)):
+            raise ValueError("bobot berisi NaN/inf, tidak bisa di-encode fixed-point")
+        limit = max_abs_weight(n_participants, scale_bits)
+        if np.max(np.abs(flat)) >= limit:
+            raise ValueError(
+                f"nilai bobot terlalu besar untuk secure aggregation {n_participants} client "
+                f"(|w| harus < {limit:.4g}); jumlahnya akan overflow int64"
+            )
+    return np.rint(flat * float(2 ** scale_bits)).astype(np.int64).view(np.uint64)
+
+
+def decode_fixed(values: np.ndarray, scale_bits: int = SCALE_BITS) -> np.ndarray:
+    return values.view(np.int64).astype(np.float64) / float(2 ** scale_bits)
+
+
+# ==========================================================
+# 🎭 MASK (CLIENT)
+# ==========================================================
+def pairwise_mask(me: str, secret: int, public_keys: dict, round_id: str, n: int) -> np.ndarray:
+    """Σ_{j>me} PRG(s_ij) − Σ_{j<me} PRG(s_ij) mod 2^64."""
+    mask = np.zeros(n, dtype=np.uint64)
+    for peer in sorted(public_keys):
+        if peer == me:
+            continue
+        prg = expand_seed(pair_seed(secret, int(public_keys[peer]), round_id, me, peer), n)
+        if me < peer:
+            mask += prg
+        else:
+            mask -= prg
+    return mask
+
+
+def mask_weights(weights, me: str, secret: int, public_keys: dict, round_id: str,
+                 scale_bits: int = SCALE_BITS):
+    """Bobot float → list tensor uint64 ter-mask dengan shape yang sama."""
+    flat, shapes, _ = flatten(weights)
+    # batas dihitung atas semua peserta masking: server menjumlahkan semuanya
+    masked = encode_fixed(flat, scale_bits, n_participants=len(set(public_keys) | {me}))
+    masked += pairwise_mask(me, secret, public_keys, round_id, flat.size)
+    return unflatten(masked, shapes)
+
+
+# ==========================================================
+# 🧮 UNMASK (SERVER)
+# ==========================================================
+def unmask_mean(masked_uploads: dict, participants, revealed_seeds: dict,
+                scale_bits: int = SCALE_BITS, dtypes=None):
+    """
+    masked_uploads : {client: [tensor uint64, ...]} dari client yang selamat
+    participants   : semua client yang dipakai saat masking
+    revealed_seeds : {(survivor, dropped): seed_bytes} untuk setiap client drop
+    Return rata-rata bobot (float32 default) sebagai list tensor.
+    """
+    survivors = sorted(masked_uploads)
+    dropped = sorted(set(participants) - set(survivors))
+    if not survivors:
+        raise ValueError("tidak ada upload ter-mask")
+
+    first = masked_uploads[survivors[0]]
+    shapes = [np.shape(w) for w in first]
+    total = np.zeros(sum(int(np.prod(s, dtype=np.int64)) for s in shapes), dtype=np.uint64)
+
+    for client in survivors:
+        tensors = masked_uploads[client]
+        if [np.shape(w) for w in tensors] != shapes:
+            raise ValueError(f"shape bobot {client} tidak cocok dengan client lain")
+        total += np.concatenate([np.asarray(w, dtype=np.uint64).ravel() for w in tensors])
+
+    # hapus mask yang tidak ter-cancel karena pasangannya drop
+    for s in survivors:
+        for d in dropped:
+            seed = revealed_seeds.get((s, d))
+            if seed is None:
+                raise KeyError(f"seed {s}↔{d} belum dibuka")
+            prg = expand_seed(seed, total.size)
+            if s < d:
+                total -= prg
+            else:
+                total += prg
+
+    mean = decode_fixed(total, scale_bits) / len(survivors)
+    if dtypes is None:
+        dtypes = [np.float32] * len(shapes)
+    return unflatten(mean, shapes, dtypes)
@@ -0,0 +1,5 @@
+import sys
+from pathlib import Path
+
+# modul server diimport flat (import codec, import secagg) seperti di app.py
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
@@ -0,0 +1,89 @@
+import hashlib
+
+import pytest
+
+import audit
+from audit import AuditLog, canonical, leaf_hash, node_hash, verify_inclusion
+from storage import LocalStorage
+
+
+def reference_root(leaves):
+    """MTH dari RFC 6962 §2.1, dihitung langsung dari semua leaf."""
+    if not leaves:
+        return hashlib.sha256(b"").digest()
+    if len(leaves) == 1:
+        return leaves[0]
+    k = audit._largest_pow2_below(len(leaves))
+    return node_hash(reference_root(leaves[:k]), reference_root(leaves[k:]))
+
+
+@pytest.fixture
+def log(tmp_path):
+    return AuditLog(LocalStorage(tmp_path))
+
+
+def entry(i):
+    return {"event": "upload", "client": f"c{i % 3}", "sha256": f"{i:064x}"}
+
+
+def test_root_matches_reference_every_size(log):
+    leaves = []
+    for i in range(37):
+        result = log.append(entry(i))
+        leaves.append(leaf_hash(canonical(dict(entry(i), seq=i))))
+        assert result["seq"] == i and result["tree_size"] == i + 1
+        assert result["root"] == reference_root(leaves).hex()
+    # root historis tetap bisa dihitung dari node yang tersimpan
+    for n in (1, 2, 5, 16, 31):
+        assert log.root(n) == reference_root(leaves[:n]).hex()
+
+
+def test_inclusion_proofs(log):
+    for i in range(21):
+        log.append(entry(i))
+    for size in (1, 7, 8, 21):
+        root = log.root(size)
+        for index in range(size):
+            proof = log.inclusion_proof(index, size)
+            assert len(proof) <= (size - 1).bit_length()
+            assert verify_inclusion(log.get(index), index, size, proof, root)
+    # entry / index / root yang salah ditolak
+    proof = log.inclusion_proof(3)
+    assert not verify_inclusion(log.get(4), 3, 21, proof, log.root())
+    assert not verify_inclusion(log.get(3), 3, 21, proof, log.root(20))
+    assert not verify_inclusion(log.get(3), 3, 21, proof[:-1], log.root())
+    with pytest.raises(IndexError):
+        log.inclusion_proof(21)
+
+
+def test_blocks_and_reopen(tmp_path, monkeypatch):
+    monkeypatch.setattr(audit, "ENTRIES_PER_BLOCK", 4)
+    monkeypatch.setattr(audit, "NODES_PER_BLOCK", 4)
+    store = LocalStorage(tmp_path)
+    log = AuditLog(store)
+    for i in range(19):
+        log.append(entry(i))
+    assert len(store.list("audit/entries")) == 5
+
+    reopened = AuditLog(store)
+    assert reopened.size() == 19 and reopened.root() == log.root()
+    assert reopened.get(17)["sha256"] == entry(17)["sha256"]
+    assert reopened.find_by_hash(entry(5)["sha256"]) == [5]
+    log.append(dict(entry(20), inputs={"c0": entry(5)["sha256"]}))
+    assert reopened.find_by_hash(entry(5)["sha256"]) == [5, 19]
+
+
+def test_crashed_append_is_overwritten(tmp_path):
+    """Entry yang tertulis tanpa head.json (crash sebelum commit) dibuang oleh append berikutnya."""
+    store = LocalStorage(tmp_path)
+    log = AuditLog(store)
+    for i in range(3):
+        log.append(entry(i))
+    head = store.read_bytes("audit/head.json")
+    log.append(entry(99))
+    store.write_bytes("audit/head.json", head)       # rollback commit point
+
+    log.append(entry(3))
+    assert log.size() == 4 and log.get(3)["sha256"] == entry(3)["sha256"]
+    leaves = [leaf_hash(canonical(dict(entry(i), seq=i))) for i in range(4)]
+    assert log.root() == reference_root(leaves).hex()
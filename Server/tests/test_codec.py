@@ -0,0 +1,123 @@
+import io
+
+import numpy as np
+import pytest
+
+import codec
+
+
+def sample():
+    rng = np.random.default_rng(0)
+    return [
+        rng.normal(size=(53, 8)).astype(np.float32),
+        rng.normal(size=(8,)).astype(np.float64),
+        np.arange(6, dtype=np.int64).reshape(2, 3),
+        np.array(3.5, dtype=np.float32),          # skalar 0-d
+        np.empty((0, 4), dtype=np.float32),
+        np.array([1, 0, 1], dtype=np.uint8),
+    ]
+
+
+def assert_same(got, want):
+    assert len(got) == len(want)
+    for g, w in zip(got, want):
+        assert g.dtype == w.dtype and g.shape == w.shape
+        np.testing.assert_array_equal(g, w)
+
+
+@pytest.mark.parametrize("fmt", codec.CODECS)
+def test_round_trip_bytes_and_file(tmp_path, fmt):
+    arrays = sample()
+    data = codec.encode(arrays, fmt)
+    assert codec.detect(data[:8]) == ("npz" if fmt == "npz" else "container")
+    assert_same(codec.decode(data), arrays)
+
+    path = tmp_path / f"w_{fmt}.npz"
+    path.write_bytes(data)
+    for mmap in (True, False):
+        assert_same(codec.load(path, mmap=mmap), arrays)
+
+
+def test_raw_is_aligned_and_mmapped(tmp_path):
+    path = tmp_path / "w.npz"
+    path.write_bytes(codec.encode(sample(), "raw"))
+    header = codec.read_index(lambda s, n: path.read_bytes()[s:s + n])
+    assert all(t["offset"] % codec.ALIGN == 0 for t in header["tensors"])
+    loaded = codec.load(path, mmap=True)
+    base = loaded[0]
+    while base is not None and not isinstance(base, np.memmap):
+        base = base.base
+    assert base is not None                       # view ke file, bukan salinan
+    assert not loaded[0].flags.writeable
+
+
+def test_object_arrays_rejected():
+    with pytest.raises(ValueError):
+        codec.encode([np.array([{"a": 1}], dtype=object)], "raw")
+    with pytest.raises(ValueError):
+        codec.encode(sample(), "pickle")
+    with pytest.raises(ValueError):
+        codec.decode(b"not-weights")
+
+
+@pytest.mark.parametrize("fmt", ["raw", "fast"])
+def test_index_and_per_layer_reads(fmt):
+    arrays = sample()
+    names = ["dense/kernel", "dense/bias", "idx", "scale", "empty", "mask"]
+    blob = codec.encode(arrays, fmt, names=names)
+    reads = []
+
+    def read_range(start, length):
+        reads.append(length)
+        return blob[start:start + length]
+
+    header = codec.read_index(read_range)
+    assert [t["name"] for t in header["tensors"]] == names
+    assert codec.find_tensor(header, "dense/bias") == 1 and codec.find_tensor(header, "2") == 2
+    with pytest.raises(KeyError):
+        codec.find_tensor(header, "nope")
+
+    for i, (t, arr) in enumerate(zip(header["tensors"], arrays)):
+        whole = codec.tensor_from_bytes(codec.read_tensor_bytes(read_range, header, i), t)
+        np.testing.assert_array_equal(whole, arr)
+        flat = arr.reshape(-1)
+        part = codec.read_tensor_bytes(read_range, header, i, 2, 7)
+        assert part == flat[2:7].tobytes()
+
+    # raw: potongan tensor hanya membaca byte yang diminta
+    if fmt == "raw":
+        reads.clear()
+        codec.read_tensor_bytes(read_range, header, 0, 10, 20)
+        assert reads == [10 * 4]
+
+
+def test_read_index_npz_is_none():
+    blob = codec.encode(sample(), "npz")
+    assert codec.read_index(lambda s, n: blob[s:s + n]) is None
+
+
+@pytest.mark.parametrize("fmt", codec.CODECS)
+def test_lazy_weights(tmp_path, fmt):
+    arrays = sample()
+    path = tmp_path / "w.npz"
+    with open(path, "wb") as f:
+        codec.write(f, arrays, fmt)
+    with codec.LazyWeights(path) as lazy:
+        assert len(lazy) == len(arrays)
+        for i, arr in enumerate(arrays):
+            np.testing.assert_array_equal(lazy[i], arr)
+        np.testing.assert_array_equal(lazy[lazy.names[1]], arrays[1])
+
+
+def test_fast_is_smaller_than_raw_for_smooth_weights():
+    w = [np.linspace(-1, 1, 100_000, dtype=np.float32).reshape(1000, 100)]
+    assert len(codec.encode(w, "fast")) < len(codec.encode(w, "raw"))
+    buf = io.BytesIO(codec.encode(w, "fast"))
+    assert_same(codec.decode(buf.getvalue()), w)
+
+
+def test_split_suffix():
+    assert codec.split_suffix("dinsos_weights.raw") == ("dinsos_weights", "raw")
+    assert codec.split_suffix("secagg/R1/a_masked.fast") == ("secagg/R1/a_masked", "fast")
+    assert codec.split_suffix("global_model_fedavg_1.npz") == ("global_model_fedavg_1", "npz")
+    assert codec.split_suffix("last_aggregate.json") == ("last_aggregate.json", None)
@@ -0,0 +1,90 @@
+import numpy as np
+import pytest
+
+import secagg
+
+ROUND = "r1"
+
+
+def setup_clients(names):
+    keys = {n: secagg.generate_keypair() for n in names}
+    public = {n: keys[n][1] for n in names}
+    return keys, public
+
+
+def mask_all(weights, keys, public):
+    return {n: secagg.mask_weights(w, n, keys[n][0], public, ROUND) for n, w in weights.items()}
+
+
+def plain_mean(weights):
+    return [np.mean(np.stack(layer), axis=0) for layer in zip(*weights.values())]
+
+
+@pytest.fixture(scope="module")
+def three():
+    names = ["dinsos", "dukcapil", "kemenkes"]
+    keys, public = setup_clients(names)
+    rng = np.random.default_rng(0)
+    weights = {n: [rng.normal(scale=0.1, size=(53, 8)).astype(np.float32),
+                   rng.normal(scale=0.1, size=(8,)).astype(np.float32)] for n in names}
+    return names, keys, public, weights
+
+
+def test_pair_seed_symmetric(three):
+    _, keys, public, _ = three
+    a = secagg.pair_seed(keys["dinsos"][0], public["kemenkes"], ROUND, "dinsos", "kemenkes")
+    b = secagg.pair_seed(keys["kemenkes"][0], public["dinsos"], ROUND, "kemenkes", "dinsos")
+    assert a == b
+    assert a != secagg.pair_seed(keys["dinsos"][0], public["kemenkes"], "r2", "dinsos", "kemenkes")
+
+
+def test_masks_cancel(three):
+    names, keys, public, weights = three
+    masked = mask_all(weights, keys, public)
+    # upload individual tidak sama dengan bobot asli
+    enc = secagg.encode_fixed(secagg.flatten(weights["dinsos"])[0])
+    assert not np.array_equal(np.concatenate([m.ravel() for m in masked["dinsos"]]), enc)
+
+    avg = secagg.unmask_mean(masked, names, {})
+    for got, want in zip(avg, plain_mean(weights)):
+        assert got.shape == want.shape and got.dtype == np.float32
+        np.testing.assert_allclose(got, want, atol=1e-7)
+
+
+def test_dropout_recovery(three):
+    names, keys, public, weights = three
+    masked = mask_all(weights, keys, public)
+    dropped = "dukcapil"
+    survivors = {n: m for n, m in masked.items() if n != dropped}
+    revealed = {(s, dropped): secagg.pair_seed(keys[s][0], public[dropped], ROUND, s, dropped)
+                for s in survivors}
+
+    avg = secagg.unmask_mean(survivors, names, revealed)
+    want = plain_mean({n: w for n, w in weights.items() if n != dropped})
+    for got, w in zip(avg, want):
+        np.testing.assert_allclose(got, w, atol=1e-7)
+
+    with pytest.raises(KeyError):
+        secagg.unmask_mean(survivors, names, {})
+
+
+def test_sum_overflow_rejected(three):
+    """Regresi: 3 client ≈ 2^29.9 dulu lolos lalu jumlahnya wrap ke nilai negatif."""
+    names, keys, public, _ = three
+    big = {n: [np.full((4,), 2 ** 29.9)] for n in names}
+    with pytest.raises(ValueError, match="overflow"):
+        mask_all(big, keys, public)
+
+
+def test_bound_is_exact_for_participants(three):
+    names, keys, public, _ = three
+    limit = secagg.max_abs_weight(len(names))
+    assert limit == 2.0 ** (62 - secagg.SCALE_BITS) / 3
+    near = {n: [np.full((4,), limit * 0.999)] for n in names}
+    avg = secagg.unmask_mean(mask_all(near, keys, public), names, {}, dtypes=[np.float64])
+    np.testing.assert_allclose(avg[0], limit * 0.999, rtol=1e-12)
+
+
+def test_non_finite_rejected():
+    with pytest.raises(ValueError):
+        secagg.encode_fixed(np.array([0.1, np.nan]))
@@ -0,0 +1,201 @@
+import io
+import json
+import time
+import hashlib
+import datetime
+
+import numpy as np
+import pytest
+
+botocore = pytest.importorskip("botocore")
+from botocore.exceptions import ClientError
+
+import codec
+import storage
+from locking import LockTimeout
+from storage import LocalStorage, S3Lease, S3Storage, load_weights, save_weights
+
+
+def _error(code, status):
+    return ClientError({"Error": {"Code": code}, "ResponseMetadata": {"HTTPStatusCode": status}}, "op")
+
+
+class _Body(io.BytesIO):
+    def iter_chunks(self, chunk_size):
+        return iter(lambda: self.read(chunk_size), b"")
+
+
+class FakeS3:
+    """Bucket di memori dengan semantik If-Match / If-None-Match seperti S3."""
+
+    def __init__(self):
+        self.objects = {}
+        self.gets = 0
+
+    def _etag(self, data):
+        return '"%s"' % hashlib.md5(data + str(time.perf_counter_ns()).encode()).hexdigest()
+
+    def _check(self, Key, IfMatch=None, IfNoneMatch=None):
+        current = self.objects.get(Key)
+        if IfNoneMatch == "*" and current is not None:
+            raise _error("PreconditionFailed", 412)
+        if IfMatch is not None:
+            if current is None:
+                raise _error("NoSuchKey", 404)
+            if current[1] != IfMatch:
+                raise _error("PreconditionFailed", 412)
+
+    def put_object(self, Bucket, Key, Body, IfMatch=None, IfNoneMatch=None):
+        self._check(Key, IfMatch, IfNoneMatch)
+        etag = self._etag(Body)
+        self.objects[Key] = (bytes(Body), etag)
+        return {"ETag": etag}
+
+    def get_object(self, Bucket, Key, Range=None):
+        if Key not in self.objects:
+            raise _error("NoSuchKey", 404)
+        self.gets += 1
+        data, etag = self.objects[Key]
+        if Range:
+            start, stop = map(int, Range[len("bytes="):].split("-"))
+            data = data[start:stop + 1]
+        return {"Body": _Body(data), "ETag": etag, "ContentLength": len(data)}
+
+    def head_object(self, Bucket, Key):
+        if Key not in self.objects:
+            raise _error("404", 404)
+        data, etag = self.objects[Key]
+        return {"ContentLength": len(data), "ETag": etag,
+                "LastModified": datetime.datetime.now(datetime.timezone.utc)}
+
+    def delete_object(self, Bucket, Key, IfMatch=None):
+        self._check(Key, IfMatch)
+        self.objects.pop(Key, None)
+
+    def get_paginator(self, name):
+        return self
+
+    def paginate(self, Bucket, Prefix="", Delimiter=None, StartAfter=""):
+        keys = sorted(k for k in self.objects if k.startswith(Prefix) and k > StartAfter)
+        now = datetime.datetime.now(datetime.timezone.utc)
+        yield {"Contents": [{"Key": k, "Size": len(self.objects[k][0]), "LastModified": now,
+                             "ETag": self.objects[k][1]} for k in keys]}
+
+
+@pytest.fixture
+def s3():
+    return S3Storage("bucket", prefix="fl", client=FakeS3())
+
+
+def _lease(s3, **kw):
+    kw.setdefault("timeout", 0.3)
+    kw.setdefault("poll_interval", 0.01)
+    return S3Lease(s3, "locks/.models.lock", **kw)
+
+
+# ---------- lease ----------
+def test_lease_is_exclusive(s3):
+    with _lease(s3):
+        with pytest.raises(LockTimeout):
+            _lease(s3).acquire()
+    with _lease(s3):
+        pass
+
+
+def test_expired_lease_taken_over_once(s3):
+    dead = _lease(s3, ttl=0.01)
+    dead.acquire()
+    dead._stop.set()                       # proses "mati": heartbeat berhenti, tidak release
+    time.sleep(0.05)
+
+    slow = _lease(s3)
+    current, stale_etag = slow._current()
+    assert current["expires"] < time.time()
+
+    winner = _lease(s3).acquire()
+    # replika lain yang membaca lease sebelum winner mengambil alih tidak boleh menimpanya
+    assert slow._put(slow._body("slow"), IfMatch=stale_etag) is None
+    assert s3_lease_owner(s3) == winner.owner
+
+    # release lease lama tidak menghapus lease milik winner
+    dead.release()
+    assert s3_lease_owner(s3) == winner.owner
+    winner.release()
+    assert s3_lease_owner(s3) is None
+
+
+def test_heartbeat_renews_lease(s3):
+    lease = _lease(s3, ttl=0.15).acquire()
+    try:
+        time.sleep(0.4)                     # > ttl: tanpa heartbeat lease sudah bisa diambil alih
+        assert not lease.lost
+        with pytest.raises(LockTimeout):
+            _lease(s3, timeout=0.1).acquire()
+    finally:
+        lease.release()
+
+
+def test_renew_detects_lost_lease(s3):
+    lease = _lease(s3, ttl=60).acquire()
+    lease._stop.set()
+    s3.client.put_object(Bucket="bucket", Key=s3._k(lease.key), Body=b"{}")   # diambil alih
+    assert lease.renew() is False and lease.lost
+    lease.release()
+    assert s3_lease_owner(s3) == "?"
+
+
+def s3_lease_owner(s3):
+    obj = s3.client.objects.get(s3._k("locks/.models.lock"))
+    return None if obj is None else json.loads(obj[0]).get("owner", "?")
+
+
+# ---------- log bersegmen ----------
+def test_log_segments(s3, monkeypatch):
+    monkeypatch.setattr(storage, "LOG_SEGMENT_MAX", 64)
+    key = "logs/dinsos_accuracy_history.txt"
+    s3.write_bytes(key, b"legacy\n")        # log lama (satu objek) tetap terbaca
+    lines = [f"2024-01-01T00:00:{i:02d}Z\t0.{i:06d}\n".encode() for i in range(20)]
+    for line in lines:
+        s3.append_log(key, line)
+
+    segments = list(s3._log_segments(key))
+    assert len(segments) > 1
+    assert all(len(s3.client.objects[k][0]) <= 64 for k in segments)
+    assert s3.read_log(key) == b"legacy\n" + b"".join(lines)
+
+    # replika lain (cache tail kosong) melanjutkan segmen yang sama
+    other = S3Storage("bucket", prefix="fl", client=s3.client)
+    other.append_log(key, b"x\n")
+    assert s3.read_log(key).endswith(b"x\n")
+
+    assert s3.delete_log(key)
+    assert s3.read_log(key) == b""
+    assert not any(k.startswith(s3._k(key)) for k in s3.client.objects)
+
+
+def test_local_log(tmp_path):
+    local = LocalStorage(tmp_path)
+    assert local.read_log("logs/a.jsonl") == b""
+    local.append_log("logs/a.jsonl", b"1\n")
+    local.append_log("logs/a.jsonl", b"2\n")
+    assert local.read_log("logs/a.jsonl") == b"1\n2\n"
+    assert local.delete_log("logs/a.jsonl") and not local.exists("logs/a.jsonl")
+
+
+# ---------- bobot ----------
+@pytest.mark.parametrize("fmt", ["npz", "raw", "fast"])
+def test_load_weights_streams_from_s3(s3, monkeypatch, fmt):
+    arrays = [np.arange(12, dtype=np.float32).reshape(3, 4), np.ones(5, dtype=np.float64)]
+    s3.write_bytes("global/model.npz", codec.encode(arrays, fmt))
+    monkeypatch.setattr(s3, "read_bytes", None)   # objek tidak boleh dibaca utuh sebagai bytes
+    for got, want in zip(load_weights(s3, "global/model.npz"), arrays):
+        np.testing.assert_array_equal(got, want)
+
+
+def test_save_load_local(tmp_path):
+    local = LocalStorage(tmp_path)
+    arrays = [np.random.default_rng(0).normal(size=(4, 3)).astype(np.float32)]
+    save_weights(local, "clients/x.npz", arrays, codec="raw")
+    got = load_weights(local, "clients/x.npz")
+    assert not got[0].flags.writeable             # di-mmap read-only dari file
+    np.testing.assert_array_equal(got[0], arrays[0])
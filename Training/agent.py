@@ -0,0 +1,223 @@
+# ============================================================
+# 🤖 AGENT INSTITUSI — tunggu model global → training → upload
+# ============================================================
+# Satu proses berjalan terus per institusi, menggantikan urutan manual
+# training → upload_model.py → (server agregasi) → download.py:
+#   1. long-poll /global/version sampai ada versi global baru
+#   2. unduh versi tersebut (container asli) & cek sha256 dari registry
+#   3. training lokal warm-start dari bobot global (train.py --init-weights)
+#   4. upload hanya jika bobot lokal berbeda dari upload terakhir
+# Progres ditulis ke <Instansi>/Models/agent_state.json setelah setiap langkah,
+# sehingga agent yang di-restart melanjutkan langkah yang belum selesai.
+#
+# Dipakai bersama semua instansi; <Instansi>/agent.py hanya mengisi --instansi.
+#
+#   python Training/agent.py --instansi dinsos            # jalan terus
+#   python Training/agent.py --instansi dinsos --once     # satu siklus lalu keluar (cron)
+import os
+import sys
+import json
+import time
+import hashlib
+import argparse
+import subprocess
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+import institutions
+import client
+from client import codec
+
+# ======================================================
+# ⚙️ KONFIGURASI
+# ======================================================
+parser = argparse.ArgumentParser(description="Agent federated: tunggu global, training, upload")
+parser.add_argument("--instansi", required=True, choices=sorted(institutions.INSTITUTIONS))
+parser.add_argument("--base-dir", help="folder instansi (default <repo>/<Instansi>)")
+parser.add_argument("--once", action="store_true",
+                    help="satu siklus (cek versi, training & upload bila perlu) lalu keluar")
+args = parser.parse_args()
+
+PATHS        = institutions.paths(args.instansi, base_dir=args.base_dir)
+BASE_DIR     = PATHS["base_dir"]
+TRAIN_SCRIPT = Path(__file__).resolve().parent / "train.py"
+MODEL_DIR    = PATHS["save_dir"]
+GLOBAL_DIR   = BASE_DIR / "Models/global"
+STATE_PATH   = BASE_DIR / "Models/agent_state.json"
+
+SERVER_URL   = client.SERVER_URL
+CLIENT_NAME  = args.instansi
+
+LONGPOLL_WAIT = 55    # detik per long-poll (server membatasi maks 60)
+HTTP_RETRIES  = 5     # retry transport (koneksi putus, 429/5xx) per request
+MAX_BACKOFF   = 300   # batas backoff antar siklus yang gagal
+
+# ======================================================
+# 🌐 HTTP SESSION
+# ======================================================
+def make_session() -> requests.Session:
+    """
+    Satu Session untuk semua request agent: koneksi keep-alive di-pool,
+    request idempoten (GET) diulang otomatis dengan backoff eksponensial.
+    Upload (POST) memakai retry sendiri di client.py.
+    """
+    retry = Retry(
+        total=HTTP_RETRIES,
+        backoff_factor=1.0,
+        status_forcelist=(429, 500, 502, 503, 504),
+        respect_retry_after_header=True,
+    )
+    adapter = HTTPAdapter(pool_connections=2, pool_maxsize=4, max_retries=retry)
+    session = requests.Session()
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    session.headers["User-Agent"] = f"fl-agent/{CLIENT_NAME}"
+    return session
+
+# ======================================================
+# 💾 STATE LOKAL
+# ======================================================
+def load_state() -> dict:
+    state = {
+        "global_version": 0,       # versi global terakhir yang diunduh
+        "global_path": None,
+        "trained_version": None,   # versi global yang menjadi titik awal training terakhir
+        "local_npz": None,
+        "local_sha256": None,      # digest bobot hasil training terakhir
+        "uploaded_sha256": None,   # digest bobot yang terakhir berhasil di-upload
+        "uploaded_at": None,
+    }
+    if STATE_PATH.exists():
+        state.update(json.loads(STATE_PATH.read_text()))
+    return state
+
+def save_state(state: dict):
+    """Tulis atomik: file sementara lalu os.replace (tidak pernah setengah tertulis)."""
+    STATE_PATH.parent.mkdir(parents=True, exist_ok=True)
+    tmp = STATE_PATH.with_suffix(".tmp")
+    tmp.write_text(json.dumps(state, indent=2))
+    os.replace(tmp, STATE_PATH)
+
+def weights_digest(path: Path) -> str:
+    """
+    sha256 isi tensor (dtype, shape, byte C-order). Zip NPZ menyimpan timestamp,
+    jadi hash file berubah walau bobotnya sama — yang dibandingkan isi tensornya.
+    """
+    h = hashlib.sha256()
+    for arr in codec.load(path, mmap=False):
+        h.update(f"{arr.dtype.str}{arr.shape}".encode())
+        h.update(np.asarray(arr, order="C").tobytes())
+    return h.hexdigest()
+
+# ======================================================
+# 🌍 VERSI & MODEL GLOBAL
+# ======================================================
+def poll_version(session, after: int, wait: float) -> dict:
+    res = session.get(
+        f"{SERVER_URL}/global/version",
+        params={"after": after, "wait": wait},
+        timeout=wait + 30,
+    )
+    res.raise_for_status()
+    return res.json()
+
+def pull_global(session, info: dict) -> Path:
+    """Unduh tepat versi yang diumumkan (bukan 'terbaru'), sha256 dicek."""
+    save_path, _ = client.fetch_global(GLOBAL_DIR, info, session=session)
+    print(f"🌍 Model global v{info['version']} diunduh: {save_path.name}")
+    return save_path
+
+# ======================================================
+# 🧠 TRAINING & UPLOAD
+# ======================================================
+def train(state: dict):
+    cmd = [sys.executable, str(TRAIN_SCRIPT), "--instansi", args.instansi, "--base-dir", str(BASE_DIR)]
+    if state["global_path"]:
+        cmd += ["--init-weights", state["global_path"]]
+    print(f"\n🚀 Training lokal dari global v{state['global_version']}: {' '.join(cmd)}")
+
+    start = time.time()
+    if subprocess.run(cmd, cwd=BASE_DIR).returncode != 0:
+        raise RuntimeError(f"training {args.instansi} gagal")
+
+    npz_path = client.find_existing_npz(MODEL_DIR, CLIENT_NAME)
+    if npz_path is None or npz_path.stat().st_mtime < start:
+        raise RuntimeError(f"training {args.instansi} tidak menghasilkan NPZ baru di {MODEL_DIR}")
+
+    state["trained_version"] = state["global_version"]
+    state["local_npz"] = str(npz_path)
+    state["local_sha256"] = weights_digest(npz_path)
+    save_state(state)
+    print(f"✅ Training selesai ({time.time() - start:.0f} detik): {npz_path.name}")
+
+def upload(session, state: dict):
+    if state["local_sha256"] == state["uploaded_sha256"]:
+        print("⏭️ Bobot lokal tidak berubah sejak upload terakhir, upload dilewati")
+        return
+    if not client.upload_model_to_server(CLIENT_NAME, Path(state["local_npz"]), MODEL_DIR,
+                                        session=session):
+        raise RuntimeError("upload model gagal")
+    state["uploaded_sha256"] = state["local_sha256"]
+    state["uploaded_at"] = datetime.utcnow().isoformat() + "Z"
+    save_state(state)
+
+def finish_pending(session, state: dict):
+    """Lanjutkan langkah yang belum selesai (juga setelah restart)."""
+    if state["trained_version"] != state["global_version"]:
+        train(state)
+    if state["local_sha256"] and state["local_sha256"] != state["uploaded_sha256"]:
+        upload(session, state)
+
+def check_global(session, state: dict, wait: float) -> bool:
+    info = poll_version(session, state["global_version"], wait)
+    if not info.get("changed"):
+        return False
+    print(f"\n🔔 Versi global {info['version']} dipublish ({info['file']})")
+    state["global_path"] = str(pull_global(session, info))
+    state["global_version"] = info["version"]
+    save_state(state)
+    return True
+
+# ======================================================
+# 🔁 LOOP
+# ======================================================
+def run(once: bool = False):
+    session = make_session()
+    state = load_state()
+    print(f"🤖 Agent {CLIENT_NAME.upper()} aktif (global v{state['global_version']}, state: {STATE_PATH})")
+
+    # pertama kali: ambil versi saat ini dulu agar tidak training dari nol
+    # padahal server sudah punya model global
+    first = True
+    backoff = 1
+    while True:
+        try:
+            if first:
+                check_global(session, state, wait=0)
+                first = False
+            finish_pending(session, state)
+            if once:
+                return
+            print(f"👀 Menunggu model global baru (versi terakhir: {state['global_version']})...")
+            while not check_global(session, state, LONGPOLL_WAIT):
+                pass
+            backoff = 1
+        except (requests.RequestException, RuntimeError, ValueError, OSError) as e:
+            if once:
+                raise
+            print(f"⚠️ Siklus gagal: {e} — coba lagi dalam {backoff} detik")
+            time.sleep(backoff)
+            backoff = min(backoff * 2, MAX_BACKOFF)
+
+
+if __name__ == "__main__":
+    try:
+        run(once=args.once)
+    except KeyboardInterrupt:
+        print("\n👋 Agent dihentikan")
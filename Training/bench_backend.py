@@ -0,0 +1,130 @@
+"""
+Benchmark end-to-end backend FedAvg: TFF vs Keras/tf.function (fedavg.py).
+
+Setiap backend dijalankan di proses Python baru agar waktu import TF/TFF,
+tracing dan kompilasi ikut terukur, lalu R round FedAvg + evaluasi held-out
+atas shard klien yang sama (bench_input.py / shards.py).
+
+    python bench_backend.py                       # data sintetis 100k × 53, 5 round
+    python bench_backend.py --rows 1000000 --rounds 3
+"""
+import sys
+import json
+import time
+import argparse
+import tempfile
+import subprocess
+from pathlib import Path
+
+import numpy as np
+
+STAGES = ("import", "setup", "round_1", "rounds_rest", "total")
+
+
+def run_backend(backend, shard_root, rows, rounds, start):
+    """Dijalankan di proses anak: ukur setiap tahap sejak proses dimulai."""
+    import tensorflow as tf
+    import bench_input
+    import shards
+    if backend == "tff":
+        import tensorflow_federated as tff
+    else:
+        import fedavg
+    t_import = time.perf_counter()
+
+    X, y = bench_input.synthetic(rows, bench_input.FEATURE_DIM)
+    parts = bench_input.client_parts(len(X), bench_input.N_CLIENTS)
+    n_val = len(X) // 5
+    clients = [shards.client_dataset(f, X.shape[1], bench_input.BATCH_SIZE)
+               for f in shards.write_clients(shard_root, X, y, [p[n_val // 10:] for p in parts])]
+    val = [shards.client_dataset(f, X.shape[1], bench_input.BATCH_SIZE, shuffle=False)
+           for f in shards.write_clients(shard_root, X, y, [p[:n_val // 10] for p in parts])]
+
+    def build_keras_model():
+        return tf.keras.Sequential([
+            tf.keras.layers.Input(shape=(X.shape[1],)),
+            tf.keras.layers.Dense(128, activation="relu"),
+            tf.keras.layers.BatchNormalization(),
+            tf.keras.layers.Dropout(0.3),
+            tf.keras.layers.Dense(64, activation="relu"),
+            tf.keras.layers.Dense(32, activation="relu"),
+            tf.keras.layers.Dense(1, activation="sigmoid"),
+        ])
+
+    if backend == "tff":
+        def model_fn():
+            return tff.learning.models.from_keras_model(
+                keras_model=build_keras_model(),
+                input_spec=clients[0].element_spec,
+                loss=tf.keras.losses.BinaryCrossentropy(),
+                metrics=[tf.keras.metrics.BinaryAccuracy(name="binary_accuracy")],
+            )
+        process = tff.learning.algorithms.build_unweighted_fed_avg(
+            model_fn,
+            client_optimizer_fn=tff.learning.optimizers.build_adam(0.005),
+            server_optimizer_fn=tff.learning.optimizers.build_adam(0.01),
+        )
+        eval_process = tff.learning.algorithms.build_fed_eval(model_fn)
+    else:
+        process = fedavg.build_unweighted_fed_avg(
+            build_keras_model,
+            client_optimizer_fn=lambda: tf.keras.optimizers.Adam(0.005),
+            server_optimizer_fn=lambda: tf.keras.optimizers.Adam(0.01),
+        )
+        eval_process = fedavg.build_fed_eval(build_keras_model)
+    state, eval_state = process.initialize(), eval_process.initialize()
+    t_setup = time.perf_counter()
+
+    marks = []
+    for _ in range(rounds):
+        state, metrics = process.next(state, clients)
+        eval_state = eval_process.set_model_weights(eval_state, process.get_model_weights(state))
+        eval_state, m = eval_process.next(eval_state, val)
+        marks.append(time.perf_counter())
+    m = m["client_work"]["eval"]["current_round_metrics"]
+
+    return {
+        "import": t_import - start,
+        "setup": t_setup - t_import,
+        "round_1": marks[0] - t_setup,
+        "rounds_rest": (marks[-1] - marks[0]) / max(rounds - 1, 1),
+        "total": marks[-1] - start,
+        "val_acc": float(m["binary_accuracy"]),
+        "val_loss": float(m["loss"]),
+    }
+
+
+if __name__ == "__main__":
+    start = time.perf_counter()
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--backends", nargs="*", default=["tff", "keras"])
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    parser.add_argument("--shard-root", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        result = run_backend(args.child, Path(args.shard_root), args.rows, args.rounds, start)
+        print("RESULT " + json.dumps(result))
+        sys.exit(0)
+
+    print(f"⏱️ Backend FedAvg end-to-end: {args.rows:,} baris, {args.rounds} round, "
+          f"proses baru per backend")
+    print(f"{'backend':<8} | " + " | ".join(f"{s:>11}" for s in STAGES) + " | val_acc")
+    results = {}
+    with tempfile.TemporaryDirectory() as workdir:
+        for backend in args.backends:
+            out = subprocess.run(
+                [sys.executable, __file__, "--child", backend, "--shard-root", workdir,
+                 "--rows", str(args.rows), "--rounds", str(args.rounds)],
+                cwd=Path(__file__).parent, capture_output=True, text=True, check=True,
+            ).stdout
+            r = json.loads(next(l for l in out.splitlines() if l.startswith("RESULT "))[7:])
+            results[backend] = r
+            print(f"{backend:<8} | " + " | ".join(f"{r[s]:>10.2f}s" for s in STAGES)
+                  + f" | {r['val_acc']:.4f}")
+
+    if {"tff", "keras"} <= results.keys():
+        print(f"\n📈 Total: tff {results['tff']['total']:.1f}s → keras "
+              f"{results['keras']['total']:.1f}s ({results['tff']['total'] / results['keras']['total']:.2f}×)")
@@ -0,0 +1,128 @@
+"""
+Benchmark input pipeline training federated: waktu per round TFF dengan
+from_tensor_slices (cara lama) vs shard TFRecord streaming (shards.py).
+
+    python bench_input.py                                   # data sintetis 100k × 53
+    python bench_input.py --rows 1000000 --rounds 5
+    python bench_input.py --csv ../Dinsos/DATASET/dinsos_balanced.csv \\
+                          --features ../Dinsos/Models/fitur_global.pkl
+
+Round pertama dilaporkan terpisah karena berisi tracing/kompilasi TFF.
+"""
+import time
+import argparse
+import tempfile
+from pathlib import Path
+
+import numpy as np
+import tensorflow as tf
+
+import shards
+import preprocess_cache
+
+BATCH_SIZE = 32
+N_CLIENTS = 10
+FEATURE_DIM = 53   # len(fitur_global.pkl)
+
+
+def synthetic(rows, dim, seed=0):
+    rng = np.random.default_rng(seed)
+    X = rng.random((rows, dim), dtype=np.float32)
+    y = (X[:, 0] + rng.normal(scale=0.1, size=rows) > 0.5).astype(np.float32)
+    return X, y
+
+
+def client_parts(n, n_clients, seed=0):
+    idx = np.random.default_rng(seed).permutation(n)
+    size = n // n_clients
+    return [idx[i * size:(i + 1) * size if i < n_clients - 1 else n] for i in range(n_clients)]
+
+
+def tensor_slices_clients(X, y, parts):
+    """Pipeline lama script training (salinan array + shuffle sebesar data klien)."""
+    clients = []
+    for idx in parts:
+        ds = tf.data.Dataset.from_tensor_slices(
+            (np.asarray(X[idx], dtype="float32"), y[idx].reshape(-1, 1).astype("float32"))
+        )
+        clients.append(ds.shuffle(len(idx)).batch(BATCH_SIZE))
+    return clients
+
+
+def shard_clients(X, y, parts, shard_root, cache):
+    files = shards.write_clients(shard_root, X, y, parts)
+    return [shards.client_dataset(f, X.shape[1], BATCH_SIZE, cache=cache) for f in files]
+
+
+def build_process(dim, element_spec):
+    import tensorflow_federated as tff  # lazy: bench_backend.py memakai helper modul ini tanpa TFF
+
+    def model_fn():
+        keras_model = tf.keras.Sequential([
+            tf.keras.layers.Input(shape=(dim,)),
+            tf.keras.layers.Dense(128, activation="relu"),
+            tf.keras.layers.BatchNormalization(),
+            tf.keras.layers.Dropout(0.3),
+            tf.keras.layers.Dense(64, activation="relu"),
+            tf.keras.layers.Dense(32, activation="relu"),
+            tf.keras.layers.Dense(1, activation="sigmoid"),
+        ])
+        return tff.learning.models.from_keras_model(
+            keras_model=keras_model,
+            input_spec=element_spec,
+            loss=tf.keras.losses.BinaryCrossentropy(),
+            metrics=[tf.keras.metrics.BinaryAccuracy(name="binary_accuracy")],
+        )
+
+    return tff.learning.algorithms.build_unweighted_fed_avg(
+        model_fn,
+        client_optimizer_fn=tff.learning.optimizers.build_adam(0.005),
+        server_optimizer_fn=tff.learning.optimizers.build_adam(0.01),
+    )
+
+
+def run_case(label, clients, rounds):
+    process = build_process(clients[0].element_spec[0].shape[-1], clients[0].element_spec)
+    state = process.initialize()
+    times = []
+    for _ in range(rounds):
+        t0 = time.perf_counter()
+        state, metrics = process.next(state, clients)
+        times.append(time.perf_counter() - t0)
+    acc = float(metrics["client_work"]["train"]["binary_accuracy"])
+    steady = times[1:] or times
+    print(f"{label:<16} | {times[0]:>8.2f}s | {np.median(steady):>8.2f}s | "
+          f"{min(steady):>8.2f}s | {acc:.4f}")
+    return float(np.median(steady))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--rounds", type=int, default=4)
+    parser.add_argument("--csv", help="pakai dataset instansi (via preprocess_cache)")
+    parser.add_argument("--features", help="fitur_global.pkl untuk --csv")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as workdir:
+        workdir = Path(workdir)
+        if args.csv:
+            import joblib
+            data = preprocess_cache.load_or_build(Path(args.csv), joblib.load(args.features),
+                                                  workdir / "cache")
+            X, y = data["X"], data["y"]
+        else:
+            X, y = synthetic(args.rows, FEATURE_DIM)
+        parts = client_parts(len(X), N_CLIENTS)
+
+        t0 = time.perf_counter()
+        sharded = shard_clients(X, y, parts, workdir / "shards", cache=False)
+        print(f"💾 Tulis shard {len(X):,} baris: {time.perf_counter() - t0:.2f} detik (sekali per split)")
+
+        print(f"\n⏱️ {N_CLIENTS} klien, {len(X):,} baris × {X.shape[1]}, {args.rounds} round")
+        print(f"{'pipeline':<16} | {'round 1':>9} | {'median':>9} | {'min':>9} | acc")
+        before = run_case("tensor_slices", tensor_slices_clients(X, y, parts), args.rounds)
+        after = run_case("shard", sharded, args.rounds)
+        run_case("shard+cache", shard_clients(X, y, parts, workdir / "shards", cache=True),
+                 args.rounds)
+        print(f"\n📈 Median per round: {before:.2f}s → {after:.2f}s ({before / after:.2f}×)")
@@ -0,0 +1,127 @@
+"""
+Benchmark & cek regresi akurasi langkah klien backend keras (fedavg.py):
+float32 biasa vs XLA (jit_compile) vs mixed_bfloat16 vs keduanya.
+
+Semua konfigurasi memakai shard klien, seed dan inisialisasi yang sama. Yang
+dilaporkan: waktu round pertama (trace/kompilasi), median round berikutnya, dan
+val_acc / val_loss akhir. Exit code 1 jika val_acc turun lebih dari --tolerance
+dibanding float32, jadi bisa dipakai sebagai cek sebelum mengaktifkan
+--xla / --mixed-precision di script training. Untuk cek akurasi pakai --csv;
+data sintetis hanya representatif untuk waktu (val_acc-nya tidak stabil).
+
+    python bench_precision.py                              # data sintetis 100k × 53
+    python bench_precision.py --csv ../Dinsos/DATASET/dinsos_balanced.csv \\
+                              --features ../Dinsos/Models/fitur_global.pkl --rounds 5
+"""
+import sys
+import time
+import argparse
+import tempfile
+from pathlib import Path
+
+import numpy as np
+import tensorflow as tf
+
+import bench_input
+import fedavg
+import preprocess_cache
+import shards
+
+CONFIGS = [
+    ("float32", False, False),
+    ("xla", True, False),
+    ("bf16", False, True),
+    ("xla+bf16", True, True),
+]
+
+
+def build_keras_model(dim):
+    def build():
+        return tf.keras.Sequential([
+            tf.keras.layers.Input(shape=(dim,)),
+            tf.keras.layers.Dense(128, activation="relu"),
+            tf.keras.layers.BatchNormalization(),
+            tf.keras.layers.Dropout(0.3),
+            tf.keras.layers.Dense(64, activation="relu"),
+            tf.keras.layers.Dense(32, activation="relu"),
+            tf.keras.layers.Dense(1, activation="sigmoid", dtype="float32"),
+        ])
+    return build
+
+
+def run_config(label, xla, bf16, clients, val, dim, rounds, seed):
+    tf.keras.utils.set_random_seed(seed)
+    model_fn = build_keras_model(dim)
+    process = fedavg.build_unweighted_fed_avg(
+        model_fn,
+        client_optimizer_fn=lambda: tf.keras.optimizers.Adam(0.005),
+        server_optimizer_fn=lambda: tf.keras.optimizers.Adam(0.01),
+        jit_compile=xla, mixed_precision=bf16,
+    )
+    eval_process = fedavg.build_fed_eval(model_fn)
+    state, eval_state = process.initialize(), eval_process.initialize()
+
+    times = []
+    for _ in range(rounds):
+        t0 = time.perf_counter()
+        state, _ = process.next(state, clients)
+        times.append(time.perf_counter() - t0)
+    eval_state, m = eval_process.next(process.get_model_weights(state), val)
+    m = m["client_work"]["eval"]["current_round_metrics"]
+
+    dtypes = {w.dtype for w in process.get_model_weights(state).trainable}
+    steady = float(np.median(times[1:] or times))
+    print(f"{label:<9} | {times[0]:>8.2f}s | {steady:>8.2f}s | {m['binary_accuracy']:.4f} | "
+          f"{m['loss']:.4f} | {','.join(sorted(str(d) for d in dtypes))}")
+    return {"steady": steady, "val_acc": float(m["binary_accuracy"]), "dtypes": dtypes}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--tolerance", type=float, default=0.01,
+                        help="penurunan val_acc maksimal vs float32")
+    parser.add_argument("--csv", help="pakai dataset instansi (via preprocess_cache)")
+    parser.add_argument("--features", help="fitur_global.pkl untuk --csv")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as workdir:
+        workdir = Path(workdir)
+        if args.csv:
+            import joblib
+            data = preprocess_cache.load_or_build(Path(args.csv), joblib.load(args.features),
+                                                  workdir / "cache")
+            X, y = data["X"], data["y"]
+        else:
+            X, y = bench_input.synthetic(args.rows, bench_input.FEATURE_DIM)
+
+        perm = np.random.default_rng(args.seed).permutation(len(X))
+        n_val = len(X) // 5
+        n = bench_input.N_CLIENTS
+        train_parts = np.array_split(perm[n_val:], n)
+        val_parts = np.array_split(perm[:n_val], n)
+        dim = X.shape[1]
+        clients = [shards.client_dataset(f, dim, bench_input.BATCH_SIZE)
+                   for f in shards.write_clients(workdir / "shards", X, y, train_parts)]
+        val = [shards.client_dataset(f, dim, bench_input.BATCH_SIZE, shuffle=False)
+               for f in shards.write_clients(workdir / "shards", X, y, val_parts)]
+
+        print(f"\n⏱️ Langkah klien: {n} klien, {len(X):,} baris × {dim}, {args.rounds} round")
+        print(f"{'config':<9} | {'round 1':>9} | {'median':>9} | val_acc | val_loss | bobot")
+        results = {label: run_config(label, xla, bf16, clients, val, dim, args.rounds, args.seed)
+                   for label, xla, bf16 in CONFIGS}
+
+    base = results["float32"]
+    failed = False
+    print()
+    for label, r in results.items():
+        if label == "float32":
+            continue
+        drop = base["val_acc"] - r["val_acc"]
+        ok = drop <= args.tolerance and r["dtypes"] == {np.dtype("float32")}
+        failed |= not ok
+        print(f"{'✅' if ok else '❌'} {label:<9} {base['steady'] / r['steady']:.2f}× | "
+              f"Δval_acc={-drop:+.4f} (toleransi {args.tolerance})")
+    sys.exit(1 if failed else 0)
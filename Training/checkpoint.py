@@ -0,0 +1,101 @@
+"""
+Checkpoint per round untuk script training federated (Dinsos.py, dst).
+
+Satu checkpoint = satu file container bobot (codec "raw", lihat Server/codec.py)
+berisi beberapa grup tensor (mis. state server TFF yang di-flatten dan bobot
+validasi terbaik), plus pointer checkpoint.json berisi metadata (round, seed,
+history, ...). Urutan tulis:
+    1. checkpoint_rNNN.bin.tmp → fsync → rename ke checkpoint_rNNN.bin
+    2. checkpoint.json.tmp → fsync → rename ke checkpoint.json   (titik commit)
+    3. file checkpoint round sebelumnya dihapus
+Proses yang mati di tengah jalan selalu meninggalkan pointer ke checkpoint
+lengkap terakhir. Modul ini tidak mengimport TensorFlow; flatten / pack
+struktur state dilakukan pemanggil (tf.nest).
+"""
+import os
+import sys
+import json
+import time
+from datetime import datetime
+from pathlib import Path
+
+# codec container dipakai bersama dengan server
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "Server"))
+import codec
+
+POINTER = "checkpoint.json"
+PREFIX = "checkpoint_r"
+
+
+def _write_atomic(path: Path, write):
+    tmp = path.with_name(path.name + ".tmp")
+    with open(tmp, "wb") as f:
+        write(f)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+
+def save(save_dir: Path, round_no: int, groups: dict, meta: dict) -> dict:
+    """
+    Simpan checkpoint round_no. groups: {nama: list ndarray}, meta: dict JSON.
+    Return {"file", "bytes", "seconds"} untuk mengukur biaya checkpoint.
+    """
+    start = time.perf_counter()
+    save_dir = Path(save_dir)
+
+    arrays, names, counts = [], [], {}
+    for group, tensors in groups.items():
+        counts[group] = len(tensors)
+        for i, t in enumerate(tensors):
+            arrays.append(t)
+            names.append(f"{group}/{i}")
+
+    data_path = save_dir / f"{PREFIX}{round_no:04d}.bin"
+    _write_atomic(data_path, lambda f: codec.write(f, arrays, "raw", names=names))
+
+    pointer = {
+        **meta,
+        "round": round_no,
+        "file": data_path.name,
+        "groups": counts,
+        "saved_at": datetime.utcnow().isoformat() + "Z",
+    }
+    payload = json.dumps(pointer, indent=2).encode("utf-8")
+    _write_atomic(save_dir / POINTER, lambda f: f.write(payload))
+
+    for old in save_dir.glob(f"{PREFIX}*.bin"):
+        if old != data_path:
+            old.unlink(missing_ok=True)
+
+    return {
+        "file": data_path.name,
+        "bytes": data_path.stat().st_size,
+        "seconds": time.perf_counter() - start,
+    }
+
+
+def load_meta(save_dir: Path):
+    """Metadata checkpoint terakhir, None jika belum ada."""
+    path = Path(save_dir) / POINTER
+    if not path.exists():
+        return None
+    return json.loads(path.read_text())
+
+
+def load(save_dir: Path, meta: dict) -> dict:
+    """Tensor checkpoint per grup: {nama: list ndarray} (urutan sama saat save)."""
+    arrays = codec.load(Path(save_dir) / meta["file"], mmap=False)
+    groups, pos = {}, 0
+    for group, n in meta["groups"].items():
+        groups[group] = arrays[pos:pos + n]
+        pos += n
+    return groups
+
+
+def clear(save_dir: Path):
+    """Hapus checkpoint setelah training selesai & artefak akhir tersimpan."""
+    save_dir = Path(save_dir)
+    (save_dir / POINTER).unlink(missing_ok=True)
+    for old in save_dir.glob(f"{PREFIX}*.bin*"):
+        old.unlink(missing_ok=True)
@@ -0,0 +1,406 @@
+"""
+Protokol client federated (dipakai bersama Dinsos/Dukcapil/Kemenkes).
+
+Upload bobot ke server (opsional secure aggregation & codec pengiriman),
+unduh model global dari registry versi, dan metrik/telemetry yang ikut
+dikirim. <Instansi>/upload_model.py hanya mengisi --instansi ke sini;
+agent.py & train.py --init-weights latest mengimport modul ini langsung.
+
+    python Training/client.py --instansi dinsos
+    python Training/client.py --instansi dinsos --codec fast
+    python Training/client.py --instansi dinsos --secure-round R1 --participants 3
+    python Training/client.py --instansi dinsos --secure-round R1 --reveal
+"""
+import os
+import sys
+import json
+import time
+import base64
+import hashlib
+import argparse
+import numpy as np
+import requests
+from pathlib import Path
+
+# codec & secagg harus identik di client & server: satu sumber di Server/
+# (seperti train.py / checkpoint.py), helper training di Training/
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "Server"))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+import codec
+import secagg
+import telemetry
+import institutions
+
+# ======================================================
+# ⚙️ KONFIGURASI
+# ======================================================
+SERVER_URL   = "https://federatedinstitusi.up.railway.app"
+
+TIMEOUT      = 180  # detik
+RETRY_LIMIT  = 3
+TELEMETRY_LIMIT = 50  # record round terakhir yang dikirim bersama model
+
+# SESUAIKAN DENGAN MODEL TRAINING
+EXPECTED_WEIGHTS = 12   # Dense + BN + Dense + Dense
+
+# Secure aggregation (opsional, aktif lewat --secure-round)
+SECAGG_POLL  = 5     # detik antar cek peserta round
+SECAGG_WAIT  = 600   # batas tunggu semua peserta register
+
+# ======================================================
+# 🔍 LOAD MODEL LOKAL
+# ======================================================
+def load_local_model(model_path: Path):
+    # tensorflow hanya diimport saat NPZ perlu dibuat dari SavedModel
+    # (agent.py memakai modul ini tanpa menanggung import TF)
+    import tensorflow as tf
+
+    print(f"📂 Memuat model dari: {model_path}")
+
+    try:
+        model = tf.keras.models.load_model(model_path)
+        print("✅ Model Keras berhasil dimuat")
+        return model
+    except Exception as e:
+        print(f"⚠️ Gagal load Keras: {e}")
+        print("➡️ Mencoba TFSMLayer...")
+
+    from tensorflow import keras
+    model = keras.Sequential([
+        keras.layers.TFSMLayer(
+            str(model_path),
+            call_endpoint="serving_default"
+        )
+    ])
+
+    print("✅ Model SavedModel dimuat via TFSMLayer")
+    return model
+
+# ======================================================
+# 💾 SIMPAN BOBOT → NPZ
+# ======================================================
+def save_weights_npz(model, save_path: Path):
+    weights = [w.numpy() for w in model.weights]
+    np.savez_compressed(save_path, *weights)
+
+    size_mb = save_path.stat().st_size / 1024 / 1024
+    print(f"💾 Bobot disimpan: {save_path.name} ({size_mb:.2f} MB)")
+
+# ======================================================
+# 📊 LOAD METRICS
+# ======================================================
+def read_history(hist_path: Path, limit: int = TELEMETRY_LIMIT) -> list:
+    """accuracy_history.txt (TSV ber-header) → list dict per round."""
+    lines = [ln for ln in hist_path.read_text().splitlines() if ln.strip()]
+    if not lines or not lines[0].startswith("round"):
+        return []
+    header = lines[0].split("\t")
+    rows = []
+    for ln in lines[1:][-limit:]:
+        row = dict(zip(header, ln.split("\t")))
+        for k, v in row.items():
+            if k != "timestamp":
+                try:
+                    row[k] = int(v) if k == "round" else float(v)
+                except ValueError:
+                    pass
+        rows.append(row)
+    return rows
+
+
+def load_metrics(model_dir: Path):
+    """
+    best_accuracy + riwayat round terstruktur:
+      telemetry → record telemetry.jsonl run terakhir (waktu, resource, metrik)
+      history   → [{"round", "accuracy", "timestamp"}] (format yang dibaca server)
+    Tanpa telemetry.jsonl (model lama) history diambil dari accuracy_history.txt.
+    """
+    metrics = {}
+
+    best_acc = model_dir / "best_accuracy.txt"
+    hist_acc = model_dir / "accuracy_history.txt"
+
+    if best_acc.exists():
+        try:
+            metrics["best_accuracy"] = float(best_acc.read_text().strip())
+        except Exception:
+            pass
+
+    try:
+        records = telemetry.read_run(model_dir, limit=TELEMETRY_LIMIT)
+        if records:
+            metrics["telemetry"] = records
+            metrics["history"] = [
+                {"round": r["round"], "accuracy": r.get("val_accuracy", r.get("accuracy")),
+                 "timestamp": r["timestamp"]}
+                for r in records
+            ]
+        elif hist_acc.exists():
+            metrics["history"] = [
+                {"round": r["round"], "accuracy": r.get("val_accuracy", r.get("accuracy")),
+                 "timestamp": r.get("timestamp", "")}
+                for r in read_history(hist_acc)
+            ]
+    except Exception as e:
+        print(f"⚠️ Gagal membaca riwayat training: {e}")
+
+    return metrics
+
+# ======================================================
+# 📦 CARI FILE NPZ TERBARU
+# ======================================================
+def find_existing_npz(model_dir: Path, client_name: str) -> Path | None:
+    npz_files = list(model_dir.glob(f"{client_name}_*.npz"))
+    if not npz_files:
+        return None
+
+    npz_files.sort(key=lambda p: p.stat().st_mtime, reverse=True)
+    return npz_files[0]
+
+# ======================================================
+# 🌍 UNDUH MODEL GLOBAL (registry versi)
+# ======================================================
+def file_sha256(path: Path) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+def fetch_global(dest_dir: Path, info: dict | None = None, session=None):
+    """
+    Unduh model global versi `info` (default: versi terbaru di /global/version)
+    sebagai container asli, cek sha256 dari registry. File yang sudah ada dan
+    cocok tidak diunduh ulang. Return (path, info).
+    """
+    http = session or requests
+    if info is None:
+        res = http.get(f"{SERVER_URL}/global/version", timeout=TIMEOUT)
+        res.raise_for_status()
+        info = res.json()
+        if not info.get("file"):
+            raise ValueError("Server belum punya model global (jalankan agregasi dulu)")
+
+    dest_dir.mkdir(parents=True, exist_ok=True)
+    save_path = dest_dir / Path(info["file"]).name
+    if save_path.exists() and info.get("sha256") and file_sha256(save_path) == info["sha256"]:
+        return save_path, info
+
+    tmp = save_path.with_suffix(".part")
+    h = hashlib.sha256()
+    with http.get(f"{SERVER_URL}/download/{info['file']}",
+                  params={"format": "container"}, stream=True, timeout=TIMEOUT) as res:
+        res.raise_for_status()
+        with open(tmp, "wb") as f:
+            for chunk in res.iter_content(1 << 20):
+                h.update(chunk)
+                f.write(chunk)
+
+    if info.get("sha256") and h.hexdigest() != info["sha256"]:
+        tmp.unlink(missing_ok=True)
+        raise ValueError(f"sha256 model global v{info['version']} tidak cocok")
+    os.replace(tmp, save_path)
+    return save_path, info
+
+# ======================================================
+# 🔎 VALIDASI WEIGHT
+# ======================================================
+def validate_npz(npz_path: Path):
+    n_weights = len(codec.load(npz_path))
+
+    print(f"🔎 Validasi weight: {n_weights} tensor")
+
+    if n_weights != EXPECTED_WEIGHTS:
+        raise ValueError(
+            f"❌ Jumlah weight tidak sesuai! "
+            f"Expected {EXPECTED_WEIGHTS}, got {n_weights}"
+        )
+
+# ======================================================
+# 🔐 SECURE AGGREGATION
+# ======================================================
+def secagg_key_path(model_dir: Path, round_id: str) -> Path:
+    return model_dir / f"secagg_{round_id}.json"
+
+def secagg_register(client_name: str, model_dir: Path, round_id: str) -> int:
+    """Buat/muat secret DH untuk round ini lalu daftarkan public key ke server."""
+    key_path = secagg_key_path(model_dir, round_id)
+    if key_path.exists():
+        secret = int(json.loads(key_path.read_text())["secret"], 16)
+        public = pow(secagg.MODP_G, secret, secagg.MODP_P)
+    else:
+        secret, public = secagg.generate_keypair()
+        key_path.write_text(json.dumps({"secret": f"{secret:x}"}))
+
+    res = requests.post(
+        f"{SERVER_URL}/secagg/{round_id}/register",
+        json={"client": client_name, "public_key": f"{public:x}"},
+        timeout=TIMEOUT
+    )
+    res.raise_for_status()
+    print(f"🔐 Terdaftar di secure round {round_id}: {res.json().get('registered')}")
+    return secret
+
+def secagg_wait_participants(round_id: str, n_participants: int) -> dict:
+    """Tunggu sampai semua peserta register, return {client: public_key int}."""
+    deadline = time.time() + SECAGG_WAIT
+    while True:
+        status = requests.get(f"{SERVER_URL}/secagg/{round_id}", timeout=TIMEOUT).json()
+        keys = status["public_keys"]
+
+        if status["locked"]:
+            return {c: int(keys[c], 16) for c in status["participants"]}
+        if len(keys) >= n_participants:
+            return {c: int(v, 16) for c, v in keys.items()}
+        if time.time() > deadline:
+            raise TimeoutError(f"Peserta secure round kurang ({len(keys)}/{n_participants})")
+
+        print(f"⏳ Menunggu peserta secure round ({len(keys)}/{n_participants})...")
+        time.sleep(SECAGG_POLL)
+
+def mask_npz(npz_path: Path, client_name: str, round_id: str, secret: int, public_keys: dict) -> bytes:
+    weights = codec.load(npz_path)
+    masked = secagg.mask_weights(weights, client_name, secret, public_keys, round_id)
+    return codec.encode(masked, "raw")   # uint64 acak, kompresi tidak berguna
+
+def secagg_reveal(client_name: str, model_dir: Path, round_id: str) -> bool:
+    """Buka seed pasangan untuk peserta yang drop agar server bisa unmask."""
+    key_path = secagg_key_path(model_dir, round_id)
+    if not key_path.exists():
+        print(f"❌ Secret round {round_id} tidak ditemukan di {key_path}")
+        return False
+    secret = int(json.loads(key_path.read_text())["secret"], 16)
+
+    status = requests.get(f"{SERVER_URL}/secagg/{round_id}", timeout=TIMEOUT).json()
+    dropped = status.get("dropped", [])
+    if not dropped:
+        print("✅ Tidak ada peserta yang drop")
+        return True
+
+    seeds = {
+        d: secagg.pair_seed(secret, int(status["public_keys"][d], 16), round_id, client_name, d).hex()
+        for d in dropped
+    }
+    res = requests.post(
+        f"{SERVER_URL}/secagg/{round_id}/reveal",
+        json={"client": client_name, "seeds": seeds},
+        timeout=TIMEOUT
+    )
+    print(f"📨 Reveal seed untuk {dropped}: {res.status_code} {res.text}")
+    return res.status_code == 200
+
+# ======================================================
+# 📡 UPLOAD KE SERVER
+# ======================================================
+def upload_model_to_server(client_name: str, npz_path: Path, model_dir: Path,
+                           secure_round: str | None = None, participants: int = 3,
+                           wire_codec: str = "npz", session=None):
+    http = session or requests   # agent.py mengirim Session ber-pool
+    print(f"📦 Menggunakan bobot: {npz_path.name}")
+
+    validate_npz(npz_path)
+
+    if secure_round:
+        secret = secagg_register(client_name, model_dir, secure_round)
+        public_keys = secagg_wait_participants(secure_round, participants)
+        raw = mask_npz(npz_path, client_name, secure_round, secret, public_keys)
+        print(f"🎭 Bobot di-mask untuk {len(public_keys)} peserta")
+    elif wire_codec != "npz":
+        raw = codec.encode(codec.load(npz_path), wire_codec)
+        print(f"🗜️ Bobot di-encode ulang dengan codec {wire_codec} ({len(raw) / 1024:.1f} KB)")
+    else:
+        with open(npz_path, "rb") as f:
+            raw = f.read()
+
+    encoded = base64.b64encode(raw).decode("utf-8")
+
+    payload = {
+        "client": client_name,
+        "compressed_weights": encoded,
+        "framework": "tensorflow",
+        "model_version": "v1.0",
+    }
+
+    if secure_round:
+        payload["secagg"] = {
+            "round": secure_round,
+            "participants": sorted(public_keys),
+            "scale_bits": secagg.SCALE_BITS,
+        }
+
+    metrics = load_metrics(model_dir)
+    if metrics:
+        payload["metrics"] = metrics
+
+    for attempt in range(1, RETRY_LIMIT + 1):
+        try:
+            print(f"📡 Upload model ({client_name}) percobaan {attempt}...")
+            start = time.time()
+
+            res = http.post(
+                f"{SERVER_URL}/upload-model",
+                json=payload,
+                timeout=TIMEOUT
+            )
+
+            dur = time.time() - start
+
+            if res.status_code == 200:
+                print(f"✅ Upload sukses ({dur:.2f} detik)")
+                print("📨 Server response:", res.json())
+                return True
+            else:
+                print(f"⚠️ Server menolak ({res.status_code}): {res.text}")
+
+        except requests.RequestException as e:
+            print(f"❌ Gagal upload: {e}")
+            time.sleep(3)
+
+    return False
+
+# ======================================================
+# 🧠 MAIN
+# ======================================================
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Upload model instansi ke server federated")
+    parser.add_argument("--instansi", required=True, choices=sorted(institutions.INSTITUTIONS))
+    parser.add_argument("--base-dir", help="folder instansi (default <repo>/<Instansi>)")
+    parser.add_argument("--name", help="nama run (default = instansi) → Models/saved_<name>_tff")
+    parser.add_argument("--secure-round", help="ID round secure aggregation (bobot di-mask)")
+    parser.add_argument("--participants", type=int, default=3, help="jumlah peserta secure round")
+    parser.add_argument("--reveal", action="store_true",
+                        help="buka seed untuk peserta yang drop di --secure-round")
+    parser.add_argument("--codec", choices=codec.CODECS, default="npz",
+                        help="format bobot saat dikirim (server mendeteksi otomatis)")
+    args = parser.parse_args()
+
+    client_name = args.instansi   # WAJIB lowercase & konsisten dengan server
+    model_path = institutions.paths(args.instansi, args.name, args.base_dir)["save_dir"]
+    model_path.mkdir(parents=True, exist_ok=True)
+
+    if args.reveal:
+        if not args.secure_round:
+            parser.error("--reveal membutuhkan --secure-round")
+        raise SystemExit(0 if secagg_reveal(client_name, model_path, args.secure_round) else 1)
+
+    npz_path = find_existing_npz(model_path, client_name)
+
+    if npz_path is None:
+        print("📦 NPZ belum ada, membuat dari model...")
+        model = load_local_model(model_path)
+
+        timestamp = time.strftime("%Y%m%d_%H%M%S")
+        npz_path = model_path / f"{client_name}_{timestamp}.npz"
+
+        save_weights_npz(model, npz_path)
+    else:
+        size_mb = npz_path.stat().st_size / 1024 / 1024
+        print(f"✅ Bobot ditemukan: {npz_path.name} ({size_mb:.2f} MB)")
+
+    success = upload_model_to_server(client_name, npz_path, model_path,
+                                     args.secure_round, args.participants, args.codec)
+
+    if success:
+        print(f"\n🎉 Model {client_name.upper()} berhasil dikirim ke server!")
+    else:
+        print(f"\n❌ Model {client_name.upper()} gagal dikirim.")
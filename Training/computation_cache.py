@@ -0,0 +1,109 @@
+"""
+Cache komputasi federated TFF (hasil tracing build_*) antar run training.
+
+tff.learning.algorithms.build_unweighted_fed_avg / build_fed_eval men-trace
+model_fn & optimizer menjadi komputasi TFF setiap kali script dijalankan,
+walaupun arsitektur dan FEATURE_DIM tidak berubah. Di sini keempat komputasi
+LearningProcess (initialize, next, get_model_weights, set_model_weights)
+diserialisasi ke proto sekali, lalu dipakai ulang run berikutnya:
+
+    <cache_dir>/computations/<key>/
+        initialize.pb  next.pb  get_model_weights.pb  set_model_weights.pb
+        meta.json
+
+key = sha256(versi TF/TFF + JSON arsitektur Keras + element_spec + setelan
+optimizer + label proses). Ubah arsitektur / fitur / learning rate → key baru,
+trace ulang. Bobot awal di dalam initialize.pb berasal dari run yang membuat
+cache; script training menimpanya dengan model Keras baru ber-seed run ini.
+Hanya KEEP entry terbaru yang disimpan. Modul ini mengimport TFF hanya saat
+dipanggil.
+"""
+import os
+import json
+import shutil
+import hashlib
+import tempfile
+from datetime import datetime
+from pathlib import Path
+
+VERSION = 1
+KEEP = 4
+FUNCTIONS = ("initialize", "next", "get_model_weights", "set_model_weights")
+
+
+def cache_key(label: str, *parts) -> str:
+    import tensorflow as tf
+    import tensorflow_federated as tff
+
+    h = hashlib.sha256(f"v{VERSION}|{label}|tf={tf.__version__}|tff={tff.__version__}".encode())
+    for part in parts:
+        h.update(b"|")
+        h.update(str(part).encode("utf-8"))
+    return h.hexdigest()[:32]
+
+
+def load(cache_dir: Path, key: str):
+    """LearningProcess dari proto tersimpan, None jika belum ada / gagal dibaca."""
+    import tensorflow_federated as tff
+    from tensorflow_federated.proto.v0 import computation_pb2
+
+    entry = Path(cache_dir) / key
+    if not (entry / "meta.json").exists():
+        return None
+    try:
+        fns = {
+            name: tff.framework.deserialize_computation(
+                computation_pb2.Computation.FromString((entry / f"{name}.pb").read_bytes())
+            )
+            for name in FUNCTIONS
+        }
+        os.utime(entry / "meta.json")
+        return tff.learning.templates.LearningProcess(*(fns[name] for name in FUNCTIONS))
+    except Exception as e:  # proto dari versi TFF lain / rusak → trace ulang
+        print(f"⚠️ Cache komputasi {key[:12]} tidak bisa dipakai ({e}), trace ulang")
+        shutil.rmtree(entry, ignore_errors=True)
+        return None
+
+
+def save(cache_dir: Path, key: str, process, meta: dict = None):
+    """Serialisasi komputasi process ke cache (rename atomik, aman paralel)."""
+    import tensorflow_federated as tff
+
+    cache_dir = Path(cache_dir)
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    tmp = Path(tempfile.mkdtemp(prefix=f".{key}.", dir=cache_dir))
+    try:
+        for name in FUNCTIONS:
+            (tmp / f"{name}.pb").write_bytes(
+                tff.framework.serialize_computation(getattr(process, name)).SerializeToString()
+            )
+        (tmp / "meta.json").write_text(json.dumps(
+            {**(meta or {}), "created_at": datetime.utcnow().isoformat() + "Z"}, indent=2
+        ))
+        os.rename(tmp, cache_dir / key)
+    except Exception as e:
+        shutil.rmtree(tmp, ignore_errors=True)
+        if not (cache_dir / key / "meta.json").exists():
+            print(f"⚠️ Cache komputasi tidak tersimpan: {e}")
+        return
+    _prune(cache_dir, keep=key)
+
+
+def _prune(cache_dir: Path, keep: str):
+    entries = sorted(
+        (p.parent for p in cache_dir.glob("*/meta.json") if p.parent.name != keep),
+        key=lambda d: (d / "meta.json").stat().st_mtime,
+        reverse=True,
+    )
+    for old in entries[KEEP - 1:]:
+        shutil.rmtree(old, ignore_errors=True)
+
+
+def load_or_build(cache_dir: Path, key: str, build, meta: dict = None):
+    """(process, hit): dari cache, atau build() lalu disimpan untuk run berikutnya."""
+    process = load(cache_dir, key)
+    if process is not None:
+        return process, True
+    process = build()
+    save(cache_dir, key, process, meta)
+    return process, False
@@ -0,0 +1,206 @@
+"""
+Encoder one-hot + min-max berbasis fitur_global.pkl untuk dataset besar.
+
+Setara dengan preprocessing pandas lama (get_dummies → reindex ke FEATURE_LIST
+→ min-max) tetapi tidak pernah memegang seluruh dataset di memori:
+
+    enc = FeatureEncoder.from_file("Models/fitur_global.pkl")
+    enc.fit("DATASET/dinsos_balanced.csv")          # pass 1: min/max per fitur
+    X = np.empty((enc.n_rows, enc.dim), "float32")
+    y = np.empty(enc.n_rows, "float32")
+    enc.transform_csv("DATASET/dinsos_balanced.csv", X, y)   # pass 2
+
+Setiap kolom CSV dipetakan sekali (per header & jenis dtype chunk) ke indeks FEATURE_LIST:
+    - nama kolom persis ada di FEATURE_LIST    → kolom numerik, disalin apa adanya
+    - dtype non-numerik & ada fitur "<kolom>_<nilai>" → kategorikal, nilai → indeks one-hot
+    - selain itu (ID, timestamp, kolom asing)  → diabaikan
+Seperti get_dummies, hanya kolom non-numerik yang di-one-hot: kolom numerik "umur"
+tidak ikut terpetakan ke fitur "umur_kategori_*" milik kolom lain.
+Nilai kategori yang tidak ada di FEATURE_LIST menjadi baris nol, sama seperti
+reindex pada get_dummies. Memori puncak ≈ chunksize × FEATURE_DIM × 8 byte,
+X/y tujuan boleh berupa np.memmap (mis. np.lib.format.open_memmap).
+"""
+import io
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+LABEL_COL = "layak_subsidi"
+CHUNKSIZE = 100_000
+
+
+def is_ignored(col: str) -> bool:
+    """Kolom ID / timestamp tidak ikut dijadikan fitur."""
+    return "id" in col.lower() or "timestamp" in col.lower()
+
+
+class _Prefix(io.RawIOBase):
+    """File terbuka yang hanya membaca nbytes pertama (snapshot ukuran CSV)."""
+
+    def __init__(self, f, nbytes: int):
+        self.f = f
+        self.left = nbytes
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, b) -> int:
+        n = self.f.readinto(memoryview(b)[:self.left]) if self.left > 0 else 0
+        self.left -= n
+        return n
+
+
+class FeatureEncoder:
+    def __init__(self, feature_list, label_col: str = LABEL_COL, chunksize: int = CHUNKSIZE):
+        self.feature_list = list(feature_list)
+        self.index = {f: i for i, f in enumerate(self.feature_list)}
+        self.dim = len(self.feature_list)
+        self.label_col = label_col
+        self.chunksize = chunksize
+        self.mins = None
+        self.maxs = None
+        self.n_rows = None
+        self._plans = {}
+
+    @classmethod
+    def from_file(cls, feature_path: Path, **kwargs) -> "FeatureEncoder":
+        import joblib
+        return cls(joblib.load(feature_path), **kwargs)
+
+    # ------------------------------------------------------
+    # PEMETAAN KOLOM
+    # ------------------------------------------------------
+    def _plan(self, chunk) -> tuple:
+        """(numerik [(kolom, idx)], kategorikal [kolom]) untuk header & dtype chunk ini."""
+        from pandas.api.types import is_numeric_dtype
+
+        key = tuple((col, is_numeric_dtype(dtype)) for col, dtype in chunk.dtypes.items())
+        if key not in self._plans:
+            numeric, categorical = [], []
+            for col, numeric_dtype in key:
+                if col == self.label_col or is_ignored(col):
+                    continue
+                if col in self.index:
+                    numeric.append((col, self.index[col]))
+                elif not numeric_dtype and any(f.startswith(col + "_") for f in self.feature_list):
+                    categorical.append(col)
+            self._plans[key] = (numeric, categorical)
+        return self._plans[key]
+
+    def encode(self, chunk, out: np.ndarray = None) -> np.ndarray:
+        """DataFrame chunk → matriks one-hot float64 (n, dim), belum di-scaling."""
+        import pandas as pd
+
+        n = len(chunk)
+        if out is None:
+            out = np.zeros((n, self.dim), dtype=np.float64)
+        else:
+            out[:] = 0.0
+
+        numeric, categorical = self._plan(chunk)
+        for col, idx in numeric:
+            out[:, idx] = chunk[col].to_numpy(dtype=np.float64, na_value=np.nan)
+
+        rows = np.arange(n)
+        for col in categorical:
+            codes, uniques = pd.factorize(chunk[col])
+            # kode -1 (NaN) jatuh ke elemen terakhir lut → tidak di-set
+            lut = np.array([self.index.get(f"{col}_{u}", -1) for u in uniques] + [-1])
+            idx = lut[codes]
+            hit = idx >= 0
+            out[rows[hit], idx[hit]] = 1.0
+        return out
+
+    def _chunks(self, csv_path: Path, nbytes: int = None):
+        """Chunk DataFrame; nbytes membatasi ke prefix file (baris yang di-append diabaikan)."""
+        import pandas as pd
+        if nbytes is None:
+            yield from pd.read_csv(csv_path, chunksize=self.chunksize)
+            return
+        with open(csv_path, "rb") as f:
+            yield from pd.read_csv(io.BufferedReader(_Prefix(f, nbytes)), chunksize=self.chunksize)
+
+    # ------------------------------------------------------
+    # FIT / TRANSFORM
+    # ------------------------------------------------------
+    def fit(self, csv_path: Path, nbytes: int = None) -> "FeatureEncoder":
+        """Satu pass streaming: min/max per fitur dan jumlah baris."""
+        mins = np.full(self.dim, np.inf)
+        maxs = np.full(self.dim, -np.inf)
+        n_rows, buf = 0, None
+        for chunk in self._chunks(csv_path, nbytes):
+            if self.label_col not in chunk.columns:
+                raise ValueError(f"Kolom '{self.label_col}' tidak ditemukan!")
+            if buf is None or len(buf) != len(chunk):
+                buf = np.empty((len(chunk), self.dim), dtype=np.float64)
+            enc = self.encode(chunk, buf)
+            # fmin/fmax mengabaikan NaN seperti DataFrame.min()
+            mins = np.fmin(mins, np.fmin.reduce(enc, axis=0, initial=np.inf))
+            maxs = np.fmax(maxs, np.fmax.reduce(enc, axis=0, initial=-np.inf))
+            n_rows += len(chunk)
+
+        # fitur tanpa nilai sama sekali → NaN, lalu di-scaling menjadi 0
+        mins[np.isinf(mins)] = np.nan
+        maxs[np.isinf(maxs)] = np.nan
+        self.mins, self.maxs, self.n_rows = mins, maxs, n_rows
+        return self
+
+    @property
+    def rng(self) -> np.ndarray:
+        rng = self.maxs - self.mins
+        rng[rng == 0] = 1.0
+        return rng
+
+    def transform(self, chunk, out: np.ndarray = None) -> np.ndarray:
+        """DataFrame chunk → matriks float32 ter-scaling (ditulis ke out jika ada)."""
+        if self.mins is None:
+            raise RuntimeError("FeatureEncoder belum di-fit")
+        scaled = self.encode(chunk)
+        scaled -= self.mins
+        scaled /= self.rng
+        np.nan_to_num(scaled, copy=False, nan=0.0)
+        if out is None:
+            return scaled.astype(np.float32)
+        out[:] = scaled
+        return out
+
+    def transform_csv(self, csv_path: Path, X_out: np.ndarray, y_out: np.ndarray,
+                      nbytes: int = None) -> int:
+        """Pass kedua: tulis seluruh CSV ke X_out (n, dim) dan y_out (n,) float32."""
+        start = 0
+        for chunk in self._chunks(csv_path, nbytes):
+            end = start + len(chunk)
+            if end > len(X_out):
+                raise ValueError("CSV bertambah setelah fit; jalankan fit ulang")
+            self.transform(chunk, X_out[start:end])
+            y_out[start:end] = chunk[self.label_col].to_numpy(dtype=np.float32)
+            start = end
+        if start != len(X_out):
+            raise ValueError(f"CSV berisi {start} baris, fit menghitung {len(X_out)}")
+        return start
+
+    def preprocess(self) -> dict:
+        """Dict preprocess.pkl ({"FEATURE_COLS", "mins", "rng"}) seperti training lama."""
+        import pandas as pd
+        return {
+            "FEATURE_COLS": list(self.feature_list),
+            "mins": pd.Series(self.mins, index=self.feature_list),
+            "rng": pd.Series(self.rng, index=self.feature_list),
+        }
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 3:
+        raise SystemExit("pakai: python encoder.py <csv> <fitur_global.pkl> [chunksize]")
+    csv_path, feature_path = Path(sys.argv[1]), Path(sys.argv[2])
+    chunksize = int(sys.argv[3]) if len(sys.argv) > 3 else CHUNKSIZE
+
+    t = time.perf_counter()
+    enc = FeatureEncoder.from_file(feature_path, chunksize=chunksize).fit(csv_path)
+    X = np.empty((enc.n_rows, enc.dim), dtype=np.float32)
+    y = np.empty(enc.n_rows, dtype=np.float32)
+    enc.transform_csv(csv_path, X, y)
+    print(f"⏱️ {enc.n_rows:,} baris → X{X.shape} dalam {time.perf_counter() - t:.2f} detik "
+          f"(chunk {chunksize:,})")
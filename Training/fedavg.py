@@ -0,0 +1,249 @@
+"""
+Backend FedAvg ringan (Keras + tf.function) sebagai alternatif TFF.
+
+Simulasi kita hanya FedAvg atas MLP Sequential, jadi import, tracing dan
+kompilasi TFF tidak diperlukan. Modul ini meniru antarmuka proses TFF yang
+dipakai script training sehingga loop round, evaluasi, checkpoint dan
+penyimpanan model tidak berubah:
+
+    process = fedavg.build_unweighted_fed_avg(
+        build_keras_model,
+        client_optimizer_fn=lambda: tf.keras.optimizers.Adam(0.005),
+        server_optimizer_fn=lambda: tf.keras.optimizers.Adam(0.01),
+    )
+    state = process.initialize()
+    state, metrics = process.next(state, clients)   # metrics["client_work"]["train"]
+    process.get_model_weights(state).assign_weights_to(keras_model)
+
+Semantik sama dengan tff.learning.algorithms.build_{un,}weighted_fed_avg:
+    - tiap klien mulai dari bobot global dengan state optimizer klien baru,
+      satu pass atas dataset klien (langkah gradien dalam satu tf.function)
+    - delta bobot trainable dirata-rata (unweighted, atau weighted per jumlah
+      contoh); klien dengan delta non-finite diabaikan
+    - optimizer server menerapkan -delta sebagai pseudo-gradient
+    - bobot non-trainable (statistik BatchNorm) tidak diagregasi, tetap milik
+      server seperti di TFF
+    - metrik train/eval dirata-rata per contoh atas semua klien
+
+Opsi percepatan langkah klien (hanya backend ini, TFF tidak mengizinkan):
+    jit_compile=True      → langkah gradien dikompilasi XLA
+    mixed_precision=True  → model klien memakai policy "mixed_bfloat16":
+                            komputasi bfloat16, variabel/master weight float32
+Model server & evaluasi tetap float32, jadi NPZ hasil training tetap float32.
+Layer output sebaiknya dtype="float32" agar sigmoid/loss tidak di bfloat16.
+State berupa namedtuple array NumPy sehingga tf.nest.flatten / pack_sequence_as
+(checkpoint) bekerja seperti pada state TFF.
+"""
+import time
+import collections
+
+import numpy as np
+import tensorflow as tf
+
+
+class ModelWeights(collections.namedtuple("ModelWeights", ["trainable", "non_trainable"])):
+    """Pengganti tff.learning.models.ModelWeights (list ndarray)."""
+
+    @classmethod
+    def from_model(cls, model):
+        return cls(
+            [v.numpy() for v in model.trainable_weights],
+            [v.numpy() for v in model.non_trainable_weights],
+        )
+
+    def assign_weights_to(self, model):
+        for v, w in zip(model.trainable_weights, self.trainable):
+            v.assign(w)
+        for v, w in zip(model.non_trainable_weights, self.non_trainable):
+            v.assign(w)
+
+
+ServerState = collections.namedtuple("ServerState", ["global_model_weights", "optimizer_state"])
+
+
+def _optimizer_variables(optimizer, var_list):
+    """Variabel optimizer Keras (dibuat sekarang agar struktur state tetap)."""
+    optimizer.build(var_list)
+    variables = optimizer.variables
+    return list(variables() if callable(variables) else variables)
+
+
+def _binary_metrics(model, loss_fn, x, y, training):
+    pred = tf.cast(model(x, training=training), tf.float32)
+    loss = loss_fn(y, pred)
+    n = tf.cast(tf.shape(x)[0], tf.float32)
+    correct = tf.reduce_sum(tf.cast(tf.equal(tf.cast(pred > 0.5, y.dtype), y), tf.float32))
+    return pred, loss, n, correct
+
+
+def _mean_metrics(loss_sum, correct, n) -> dict:
+    n = float(n)
+    return {
+        "binary_accuracy": correct / n if n else 0.0,
+        "loss": loss_sum / n if n else 0.0,
+        "num_examples": int(n),
+    }
+
+
+def _build_model(model_fn, mixed_precision: bool):
+    if not mixed_precision:
+        return model_fn()
+    previous = tf.keras.mixed_precision.global_policy()
+    tf.keras.mixed_precision.set_global_policy("mixed_bfloat16")
+    try:
+        return model_fn()
+    finally:
+        tf.keras.mixed_precision.set_global_policy(previous)
+
+
+class FedAvgProcess:
+    def __init__(self, model_fn, client_optimizer_fn, server_optimizer_fn, weighted: bool,
+                 jit_compile: bool = False, mixed_precision: bool = False):
+        self._weighted = weighted
+        self._loss = tf.keras.losses.BinaryCrossentropy()
+
+        self._client_model = _build_model(model_fn, mixed_precision)
+        self._client_opt = client_optimizer_fn()
+        self._client_vars = _optimizer_variables(self._client_opt,
+                                                 self._client_model.trainable_variables)
+
+        self._server_model = model_fn()
+        self._server_opt = server_optimizer_fn()
+        self._server_vars = _optimizer_variables(self._server_opt,
+                                                 self._server_model.trainable_variables)
+
+        # satu trace per element_spec dataset, loop batch berjalan di graph;
+        # hanya langkah gradien yang dikompilasi XLA (iterasi dataset tidak bisa)
+        self._train_step = tf.function(self._train_step_fn, jit_compile=jit_compile)
+        self._train_epoch = tf.function(self._train_epoch_fn)
+
+    def _train_step_fn(self, x, y):
+        model = self._client_model
+        with tf.GradientTape() as tape:
+            _, loss, n, c = _binary_metrics(model, self._loss, x, y, training=True)
+        grads = tape.gradient(loss, model.trainable_variables)
+        self._client_opt.apply_gradients(zip(grads, model.trainable_variables))
+        return loss, n, c
+
+    def _train_epoch_fn(self, dataset):
+        loss_sum, correct, count = tf.constant(0.0), tf.constant(0.0), tf.constant(0.0)
+        for x, y in dataset:
+            loss, n, c = self._train_step(x, y)
+            loss_sum += loss * n
+            correct += c
+            count += n
+        return loss_sum, correct, count
+
+    def initialize(self) -> ServerState:
+        return ServerState(
+            ModelWeights.from_model(self._server_model),
+            [v.numpy() for v in self._server_vars],
+        )
+
+    def get_model_weights(self, state: ServerState) -> ModelWeights:
+        return state.global_model_weights
+
+    def set_model_weights(self, state: ServerState, weights) -> ServerState:
+        return state._replace(global_model_weights=ModelWeights(
+            [np.asarray(w) for w in weights.trainable],
+            [np.asarray(w) for w in weights.non_trainable],
+        ))
+
+    def _client_update(self, global_weights: ModelWeights, dataset):
+        global_weights.assign_weights_to(self._client_model)
+        for v in self._client_vars:  # optimizer klien baru setiap round
+            v.assign(tf.zeros_like(v))
+        loss_sum, correct, n = (float(t) for t in self._train_epoch(dataset))
+        delta = [v.numpy() - g for v, g in
+                 zip(self._client_model.trainable_weights, global_weights.trainable)]
+        return delta, loss_sum, correct, n
+
+    def next(self, state: ServerState, clients):
+        t0 = time.perf_counter()
+        global_weights = state.global_model_weights
+        total = [np.zeros_like(g) for g in global_weights.trainable]
+        weight_sum = loss_sum = correct = n_sum = 0.0
+
+        for dataset in clients:
+            delta, loss, c, n = self._client_update(global_weights, dataset)
+            loss_sum, correct, n_sum = loss_sum + loss, correct + c, n_sum + n
+            if n == 0 or not all(np.isfinite(d).all() for d in delta):
+                continue
+            w = n if self._weighted else 1.0
+            for t, d in zip(total, delta):
+                t += w * d
+            weight_sum += w
+
+        t_clients = time.perf_counter()
+        trainable = global_weights.trainable
+        optimizer_state = state.optimizer_state
+        if weight_sum:
+            for v, g in zip(self._server_model.trainable_variables, trainable):
+                v.assign(g)
+            for v, s in zip(self._server_vars, optimizer_state):
+                v.assign(s)
+            pseudo_grads = [tf.constant(-t / weight_sum) for t in total]
+            self._server_opt.apply_gradients(zip(pseudo_grads, self._server_model.trainable_variables))
+            trainable = [v.numpy() for v in self._server_model.trainable_variables]
+            optimizer_state = [v.numpy() for v in self._server_vars]
+
+        new_state = ServerState(ModelWeights(trainable, global_weights.non_trainable), optimizer_state)
+        metrics = {
+            "client_work": {"train": _mean_metrics(loss_sum, correct, n_sum)},
+            "aggregator": {},
+            "finalizer": {},
+            # tidak ada di TFF: dipakai telemetry untuk memisah fase round
+            "timing": {"client_work": t_clients - t0,
+                       "aggregation": time.perf_counter() - t_clients},
+        }
+        return new_state, metrics
+
+
+class FedEvalProcess:
+    def __init__(self, model_fn):
+        self._model = model_fn()
+        self._loss = tf.keras.losses.BinaryCrossentropy()
+        self._eval_epoch = tf.function(self._eval_epoch_fn)
+
+    def _eval_epoch_fn(self, dataset):
+        loss_sum, correct, count = tf.constant(0.0), tf.constant(0.0), tf.constant(0.0)
+        for x, y in dataset:
+            _, loss, n, c = _binary_metrics(self._model, self._loss, x, y, training=False)
+            loss_sum += loss * n
+            correct += c
+            count += n
+        return loss_sum, correct, count
+
+    def initialize(self) -> ModelWeights:
+        return ModelWeights.from_model(self._model)
+
+    def set_model_weights(self, state, weights) -> ModelWeights:
+        return weights
+
+    def next(self, state: ModelWeights, clients):
+        state.assign_weights_to(self._model)
+        loss_sum = correct = n_sum = 0.0
+        for dataset in clients:
+            loss, c, n = (float(t) for t in self._eval_epoch(dataset))
+            loss_sum, correct, n_sum = loss_sum + loss, correct + c, n_sum + n
+        current = _mean_metrics(loss_sum, correct, n_sum)
+        return state, {"client_work": {"eval": {"current_round_metrics": current,
+                                                "total_rounds_metrics": current}}}
+
+
+def build_unweighted_fed_avg(model_fn, client_optimizer_fn, server_optimizer_fn,
+                             jit_compile=False, mixed_precision=False) -> FedAvgProcess:
+    """model_fn → tf.keras.Model baru; *_optimizer_fn → optimizer Keras baru."""
+    return FedAvgProcess(model_fn, client_optimizer_fn, server_optimizer_fn, weighted=False,
+                         jit_compile=jit_compile, mixed_precision=mixed_precision)
+
+
+def build_weighted_fed_avg(model_fn, client_optimizer_fn, server_optimizer_fn,
+                           jit_compile=False, mixed_precision=False) -> FedAvgProcess:
+    """Seperti build_unweighted_fed_avg, delta klien dibobot jumlah contoh."""
+    return FedAvgProcess(model_fn, client_optimizer_fn, server_optimizer_fn, weighted=True,
+                         jit_compile=jit_compile, mixed_precision=mixed_precision)
+
+
+def build_fed_eval(model_fn) -> FedEvalProcess:
+    return FedEvalProcess(model_fn)
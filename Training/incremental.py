@@ -0,0 +1,189 @@
+"""
+Mode training incremental: hanya baris yang ditambahkan ke CSV sejak run terakhir.
+
+Setiap run yang selesai menulis watermark ke SAVE_DIR/watermark.json:
+
+    {"csv": ".../dinsos_balanced.csv", "bytes": 7340032, "rows": 100000,
+     "sha256": "<sha256 bytes[0:bytes]>", "features": "<sha256 FEATURE_LIST>",
+     "mins": [...], "maxs": [...],          ← scaler min-max model terakhir
+     "model": "dinsos_20260101_000000.npz", "full_at": "...Z", "updated_at": "...Z"}
+
+Run berikutnya dengan --incremental:
+    1. prefix CSV sepanjang "bytes" di-hash ulang (tanpa parsing) dan dibandingkan
+       dengan "sha256"; jika berbeda (file ditulis ulang, bukan di-append) → full
+    2. hanya baris setelah offset "bytes" dibaca (read_csv mulai dari seek)
+    3. min/max mentah baris baru dibandingkan dengan scaler lama: keluar range
+       lebih dari drift_tolerance × range lama → drift, training full ulang;
+       di bawahnya min/max berjalan diperluas (fmin/fmax) untuk preprocess.pkl
+    4. training warm-start dari NPZ lokal terakhir ("model")
+Full refresh tetap dilakukan jika watermark belum ada, FEATURE_LIST berubah,
+atau full terakhir lebih lama dari full_every_days.
+
+Baris baru di-encode ke memori (ukurannya sebesar delta, bukan seluruh dataset).
+Modul ini tidak mengimport TensorFlow.
+"""
+import os
+import json
+import hashlib
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import numpy as np
+
+import encoder
+
+WATERMARK = "watermark.json"
+FULL_EVERY_DAYS = 7
+DRIFT_TOLERANCE = 0.1   # pelebaran range maksimal (fraksi range lama) tanpa full refresh
+
+
+def features_sha256(feature_list) -> str:
+    return hashlib.sha256(json.dumps(list(feature_list)).encode("utf-8")).hexdigest()
+
+
+def load_watermark(save_dir: Path):
+    path = Path(save_dir) / WATERMARK
+    if not path.exists():
+        return None
+    try:
+        return json.loads(path.read_text())
+    except ValueError:
+        return None
+
+
+def save_watermark(save_dir: Path, watermark: dict):
+    path = Path(save_dir) / WATERMARK
+    tmp = path.with_name(WATERMARK + ".tmp")
+    tmp.write_text(json.dumps(watermark, indent=2))
+    os.replace(tmp, path)
+
+
+def full_reason(watermark, csv_path: Path, feature_list, save_dir: Path,
+                full_every_days: int = FULL_EVERY_DAYS):
+    """Alasan mode incremental harus jadi full refresh, None jika boleh incremental."""
+    if watermark is None:
+        return "watermark belum ada"
+    if watermark["csv"] != str(Path(csv_path).resolve()):
+        return "CSV berbeda dari run terakhir"
+    if watermark["features"] != features_sha256(feature_list):
+        return "fitur_global.pkl berubah"
+    if not (Path(save_dir) / watermark["model"]).exists():
+        return f"model lokal {watermark['model']} tidak ditemukan"
+    full_at = datetime.fromisoformat(watermark["full_at"].rstrip("Z"))
+    if full_every_days and datetime.utcnow() - full_at >= timedelta(days=full_every_days):
+        return f"full refresh terakhir lebih dari {full_every_days} hari lalu"
+    return None
+
+
+def scan(csv_path: Path, offset: int):
+    """
+    Satu pass baca byte: (sha256 prefix[0:offset], sha256 seluruh file, ukuran,
+    byte terakhir prefix). Prefix yang cocok = file hanya di-append.
+    """
+    h = hashlib.sha256()
+    prefix_digest, last = None, b""
+    with open(csv_path, "rb") as f:
+        pos = 0
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            if prefix_digest is None and pos + len(chunk) >= offset:
+                cut = offset - pos
+                h.update(chunk[:cut])
+                prefix_digest = h.hexdigest()
+                last = chunk[cut - 1:cut] if cut else last
+                h.update(chunk[cut:])
+            else:
+                if prefix_digest is None:
+                    last = chunk[-1:]
+                h.update(chunk)
+            pos += len(chunk)
+    return prefix_digest, h.hexdigest(), pos, last
+
+
+def _scaler(mins, maxs):
+    rng = maxs - mins
+    rng[rng == 0] = 1.0
+    return rng
+
+
+def load_delta(csv_path: Path, feature_list, watermark: dict,
+               drift_tolerance: float = DRIFT_TOLERANCE,
+               label_col: str = encoder.LABEL_COL, chunksize: int = encoder.CHUNKSIZE):
+    """
+    Baris CSV setelah watermark → dict {X, y, rows, drift, preprocess, watermark}.
+    None jika prefix CSV tidak lagi sama (bukan append) → full refresh.
+    """
+    import pandas as pd
+
+    offset = watermark["bytes"]
+    prefix, digest, size, last = scan(csv_path, offset)
+    if size < offset or prefix != watermark["sha256"] or last != b"\n":
+        return None
+
+    enc = encoder.FeatureEncoder(feature_list, label_col=label_col, chunksize=chunksize)
+    columns = pd.read_csv(csv_path, nrows=0).columns
+    raw, labels = [], []
+    if size > offset:
+        with open(csv_path, "rb") as f:
+            f.seek(offset)
+            for chunk in pd.read_csv(f, header=None, names=columns, chunksize=chunksize):
+                raw.append(enc.encode(chunk))
+                labels.append(chunk[label_col].to_numpy(dtype=np.float32))
+    raw = np.concatenate(raw) if raw else np.empty((0, enc.dim))
+    y = np.concatenate(labels) if labels else np.empty(0, dtype=np.float32)
+
+    old_mins = np.array(watermark["mins"], dtype=np.float64)
+    old_maxs = np.array(watermark["maxs"], dtype=np.float64)
+    new_mins = np.fmin.reduce(raw, axis=0, initial=np.inf)
+    new_maxs = np.fmax.reduce(raw, axis=0, initial=-np.inf)
+
+    # pelebaran range relatif terhadap range lama (fitur tanpa nilai lama diabaikan)
+    with np.errstate(invalid="ignore"):
+        excess = np.fmax(old_mins - new_mins, new_maxs - old_maxs) / _scaler(old_mins, old_maxs)
+    drift = {
+        feature_list[i]: round(float(excess[i]), 4)
+        for i in np.flatnonzero(np.nan_to_num(excess, nan=0.0) > drift_tolerance)
+    }
+
+    enc.mins = np.fmin(old_mins, np.where(np.isinf(new_mins), np.nan, new_mins))
+    enc.maxs = np.fmax(old_maxs, np.where(np.isinf(new_maxs), np.nan, new_maxs))
+    rng = enc.rng
+    X = ((raw - enc.mins) / rng).astype(np.float32)
+    np.nan_to_num(X, copy=False, nan=0.0)
+
+    return {
+        "X": X,
+        "y": y,
+        "rows": len(X),
+        "drift": drift,
+        "preprocess": enc.preprocess(),
+        "watermark": {
+            **watermark,
+            "bytes": size,
+            "rows": watermark["rows"] + len(X),
+            "sha256": digest,
+            "mins": enc.mins.tolist(),
+            "maxs": enc.maxs.tolist(),
+        },
+    }
+
+
+def full_watermark(csv_path: Path, csv_bytes: int, csv_sha256: str, feature_list,
+                   rows: int, mins, rng) -> dict:
+    """
+    Watermark setelah full refresh. csv_bytes/csv_sha256 = snapshot yang dibaca
+    preprocess_cache.load_or_build (baris yang di-append setelahnya ikut run berikutnya).
+    maxs = mins + rng, sesuai scaler yang dipakai model.
+    """
+    mins = np.asarray(mins, dtype=np.float64)
+    now = datetime.utcnow().isoformat() + "Z"
+    return {
+        "csv": str(Path(csv_path).resolve()),
+        "bytes": int(csv_bytes),
+        "rows": int(rows),
+        "sha256": csv_sha256,
+        "features": features_sha256(feature_list),
+        "mins": mins.tolist(),
+        "maxs": (mins + np.asarray(rng, dtype=np.float64)).tolist(),
+        "full_at": now,
+        "updated_at": now,
+    }
@@ -0,0 +1,35 @@
+"""
+Lokasi data & artefak per instansi untuk Training/train.py dan orchestrate.py.
+
+Setiap instansi punya folder sendiri di root repo dengan susunan yang sama:
+
+    <Folder>/DATASET/<instansi>_balanced.csv
+    <Folder>/Models/fitur_global.pkl
+    <Folder>/Models/cache/                 ← cache preprocessing & shard klien
+    <Folder>/Models/saved_<name>_tff/      ← model, checkpoint, telemetry
+
+name = nama run (default = instansi); varian hyperparameter memakai name lain
+sehingga SAVE_DIR-nya terpisah tetapi cache preprocessing tetap dipakai bersama.
+"""
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+INSTITUTIONS = {
+    "dinsos": "Dinsos",
+    "dukcapil": "Dukcapil",
+    "kemenkes": "Kemenkes",
+}
+
+
+def paths(instansi: str, name: str = None, base_dir=None, data=None) -> dict:
+    base_dir = Path(base_dir) if base_dir else ROOT / INSTITUTIONS[instansi]
+    name = name or instansi
+    return {
+        "name": name,
+        "base_dir": base_dir,
+        "data": Path(data) if data else base_dir / f"DATASET/{instansi}_balanced.csv",
+        "features": base_dir / "Models/fitur_global.pkl",
+        "save_dir": base_dir / f"Models/saved_{name}_tff",
+        "cache_dir": base_dir / "Models/cache",
+    }
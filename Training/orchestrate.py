@@ -0,0 +1,206 @@
+"""
+Orchestrator training paralel: beberapa instansi (atau varian hyperparameter)
+dijalankan sebagai proses train.py terpisah di host yang sama.
+
+Sebelumnya Dinsos.py → Dukcapil.py → kemenkes.py dijalankan berurutan, jadi
+total waktu = jumlah ketiganya. Di sini setiap job mendapat irisan core sendiri
+(--cpus, os.sched_setaffinity) dengan thread TF dibatasi ke irisan tersebut
+(--intra-threads / --inter-threads, lihat runtime.py), sehingga total waktu ≈
+job paling lambat tanpa proses saling berebut core.
+
+    python orchestrate.py                                  # ketiga instansi
+    python orchestrate.py dinsos kemenkes -- --backend keras --rounds 5
+    python orchestrate.py --jobs jobs.json --parallel 2
+
+jobs.json (varian; name menentukan SAVE_DIR Models/saved_<name>_tff, data opsional):
+    [{"name": "dinsos", "instansi": "dinsos"},
+     {"name": "dinsos_lr01", "instansi": "dinsos", "args": ["--client-lr", "0.01"]}]
+
+Cache preprocessing (preprocess_cache.py) dibangun lebih dulu, sekali per
+dataset, lalu dipakai bersama oleh semua job instansi tersebut. Output:
+
+    <out>/<name>.log      stdout/stderr tiap job
+    <out>/summary.json    status, waktu, core, metrik terbaik & resource per job
+"""
+import sys
+import json
+import time
+import queue
+import argparse
+import subprocess
+from datetime import datetime
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+
+import runtime
+import telemetry
+import institutions
+
+TRAIN_PY = Path(__file__).resolve().parent / "train.py"
+RUNS_DIR = Path(__file__).resolve().parent / "runs"
+INTER_THREADS = 2   # per job; intra-op = jumlah core irisan job
+
+
+def load_jobs(args) -> list:
+    if args.jobs:
+        jobs = json.loads(Path(args.jobs).read_text())
+    else:
+        jobs = [{"name": i, "instansi": i} for i in args.instansi or sorted(institutions.INSTITUTIONS)]
+
+    for job in jobs:
+        job.setdefault("name", job["instansi"])
+        job.setdefault("args", [])
+        if job["instansi"] not in institutions.INSTITUTIONS:
+            raise ValueError(f"Instansi tidak dikenal: {job['instansi']}")
+    names = [job["name"] for job in jobs]
+    if len(set(names)) != len(names):
+        raise ValueError(f"Nama job harus unik (SAVE_DIR per nama): {names}")
+    return jobs
+
+
+def cpu_slices(n_slots: int) -> list:
+    """Bagi core yang tersedia rata ke n_slots irisan (minimal 1 core per irisan)."""
+    cpus = runtime.available_cpus()
+    size = max(len(cpus) // n_slots, 1)
+    return [cpus[(i * size) % len(cpus):][:size] for i in range(n_slots)]
+
+
+# ==========================================================
+# 🧮 CACHE PREPROCESSING (SEKALI PER DATASET)
+# ==========================================================
+def _warm_cache(data, features, cache_dir, refresh):
+    import joblib
+    import preprocess_cache
+    preprocess_cache.load_or_build(Path(data), joblib.load(features), Path(cache_dir),
+                                   refresh=refresh)
+    return str(data)
+
+
+def warm_caches(jobs, refresh: bool):
+    targets = {}
+    for job in jobs:
+        p = job["paths"]
+        if p["data"].exists() and p["features"].exists():
+            targets[(str(p["data"]), str(p["features"]), str(p["cache_dir"]))] = True
+    if not targets:
+        return
+    t0 = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=len(targets)) as pool:
+        futures = [pool.submit(_warm_cache, *key, refresh) for key in targets]
+        for f in futures:
+            try:
+                f.result()
+            except Exception as e:  # job terkait akan gagal dengan pesan lengkap di log-nya
+                print(f"⚠️ Cache preprocessing gagal: {e}")
+    print(f"🧮 Cache preprocessing {len(targets)} dataset siap ({time.perf_counter() - t0:.1f}s)")
+
+
+# ==========================================================
+# 🚀 JOB
+# ==========================================================
+def run_job(job, common_args, slots: queue.Queue, out_dir: Path) -> dict:
+    cpus = slots.get()
+    try:
+        cmd = [
+            sys.executable, str(TRAIN_PY),
+            "--instansi", job["instansi"], "--name", job["name"],
+            *(["--data", str(job["data"])] if job.get("data") else []),
+            "--cpus", runtime.format_cpus(cpus),
+            "--intra-threads", str(len(cpus)),
+            "--inter-threads", str(min(INTER_THREADS, len(cpus))),
+            *common_args, *job["args"],   # argumen job menimpa default di atas
+        ]
+        log_path = out_dir / f"{job['name']}.log"
+        started = telemetry.utc_now()
+        t0 = time.perf_counter()
+        print(f"🚀 {job['name']:<16} core {runtime.format_cpus(cpus)}\n", end="")  # satu write per baris antar thread
+        with open(log_path, "w", encoding="utf-8") as log:
+            code = subprocess.call(cmd, stdout=log, stderr=subprocess.STDOUT,
+                                   cwd=job["paths"]["base_dir"])
+        wall = time.perf_counter() - t0
+        print(f"{'✅' if code == 0 else '❌'} {job['name']:<16} {wall:.1f}s (exit {code})\n", end="")
+    finally:
+        slots.put(cpus)
+
+    # hanya record run ini (file telemetry berisi juga run-run sebelumnya)
+    records = [r for r in telemetry.read_run(job["paths"]["save_dir"])
+               if r.get("timestamp", "") >= started]
+    best = min(records, key=lambda r: r["val_loss"], default=None)
+    return {
+        "name": job["name"],
+        "instansi": job["instansi"],
+        "args": job["args"],
+        "status": "ok" if code == 0 else "failed",
+        "exit_code": code,
+        "wall_s": round(wall, 2),
+        "cpus": runtime.format_cpus(cpus),
+        "rounds": len(records),
+        "best_round": best["round"] if best else None,
+        "best_val_accuracy": best["val_accuracy"] if best else None,
+        "best_val_loss": best["val_loss"] if best else None,
+        "mean_round_s": (round(sum(r["wall_s"] for r in records) / len(records), 3)
+                         if records else None),
+        "peak_rss_mb": max((r["peak_rss_mb"] or 0 for r in records), default=None),
+        "save_dir": str(job["paths"]["save_dir"]),
+        "log": str(log_path),
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Training paralel beberapa instansi / varian",
+        epilog="argumen setelah -- diteruskan ke setiap train.py",
+    )
+    parser.add_argument("instansi", nargs="*",
+                        help=f"instansi yang dilatih: {', '.join(sorted(institutions.INSTITUTIONS))} "
+                             "(default semua)")
+    parser.add_argument("--jobs", help="file JSON daftar job (name, instansi, args)")
+    parser.add_argument("--parallel", type=int, default=0,
+                        help="maks job bersamaan (0 = semua job sekaligus)")
+    parser.add_argument("--out", help=f"folder log & summary (default {RUNS_DIR}/<waktu>)")
+    argv = sys.argv[1:]
+    common = argv[argv.index("--") + 1:] if "--" in argv else []
+    args = parser.parse_args(argv[:argv.index("--")] if "--" in argv else argv)
+
+    jobs = load_jobs(args)
+    for job in jobs:
+        job["paths"] = institutions.paths(job["instansi"], job["name"], data=job.get("data"))
+
+    n_slots = min(args.parallel or len(jobs), len(jobs))
+    slots = queue.Queue()
+    for s in cpu_slices(n_slots):
+        slots.put(s)
+
+    out_dir = Path(args.out) if args.out else RUNS_DIR / datetime.utcnow().strftime("%Y%m%dT%H%M%SZ")
+    out_dir.mkdir(parents=True, exist_ok=True)
+
+    # --refresh-cache dikerjakan sekali di sini, bukan di setiap job
+    refresh = "--refresh-cache" in common
+    common = [a for a in common if a != "--refresh-cache"]
+    warm_caches(jobs, refresh)
+
+    print(f"\n=== ORCHESTRATOR: {len(jobs)} job, {n_slots} paralel, "
+          f"{len(runtime.available_cpus())} core ===")
+    t0 = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=n_slots) as pool:
+        results = list(pool.map(lambda job: run_job(job, common, slots, out_dir), jobs))
+    total = time.perf_counter() - t0
+
+    summary = {
+        "started_at": out_dir.name,
+        "total_wall_s": round(total, 2),
+        "sum_job_wall_s": round(sum(r["wall_s"] for r in results), 2),
+        "parallel": n_slots,
+        "common_args": common,
+        "jobs": results,
+    }
+    (out_dir / "summary.json").write_text(json.dumps(summary, indent=2))
+
+    print(f"\n{'job':<16} | {'status':<6} | {'waktu':>8} | {'round':>5} | {'val_acc':>7} | {'core'}")
+    for r in results:
+        val = f"{r['best_val_accuracy']:.4f}" if r["best_val_accuracy"] is not None else "-"
+        print(f"{r['name']:<16} | {r['status']:<6} | {r['wall_s']:>7.1f}s | {r['rounds']:>5} | "
+              f"{val:>7} | {r['cpus']}")
+    print(f"\n⏱️ Total {total:.1f}s (berurutan ≈ {summary['sum_job_wall_s']:.1f}s)")
+    print(f"📄 Summary: {out_dir / 'summary.json'}")
+    sys.exit(0 if all(r["status"] == "ok" for r in results) else 1)
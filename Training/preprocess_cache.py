@@ -0,0 +1,254 @@
+"""
+Cache matriks fitur hasil preprocessing training.
+
+Preprocessing (read_csv per chunk → drop kolom ID/timestamp → one-hot langsung
+ke indeks FEATURE_LIST → min-max, lihat encoder.py) selalu menghasilkan matriks
+yang sama selama CSV dan fitur_global.pkl tidak berubah. Hasilnya disimpan sekali per kombinasi:
+
+    <cache_dir>/<key>/
+        X.npy     float32 (n, FEATURE_DIM)  — hasil scaling
+        y.npy     float32 (n,)
+        mins.npy  float64 (FEATURE_DIM,)
+        rng.npy   float64 (FEATURE_DIM,)
+        preprocess.pkl                       — sama persis dengan yang disimpan training
+        meta.json
+
+key = sha256(isi CSV + FEATURE_LIST + label + PREPROC_VERSION). Cache miss ditulis
+langsung ke X.npy (open_memmap) dengan memori terbatas; cache hit dibaca
+dengan np.load(mmap_mode="r") tanpa import pandas. sha256 CSV diingat per
+(path, size, mtime) di index.json agar file besar tidak di-hash ulang setiap run.
+Ukuran & sha256 diambil dari satu snapshot (csv_snapshot) dan build hanya membaca
+byte sebanyak itu, jadi baris yang di-append selama preprocessing tidak ikut
+matriks; load_or_build mengembalikan snapshot tersebut (csv_bytes, csv_sha256).
+Naikkan PREPROC_VERSION jika logika preprocessing berubah.
+
+    python Training/preprocess_cache.py Dinsos/DATASET/dinsos_balanced.csv Dinsos/Models/fitur_global.pkl
+"""
+import os
+import sys
+import json
+import time
+import shutil
+import hashlib
+import tempfile
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+import encoder
+
+PREPROC_VERSION = 1
+LABEL_COL = encoder.LABEL_COL
+INDEX = "index.json"
+
+
+# ==========================================================
+# 🔑 KEY CACHE
+# ==========================================================
+def csv_snapshot(path: Path, cache_dir: Path = None) -> tuple:
+    """
+    (size, sha256 byte[0:size]) dari satu stat: yang di-hash tepat size byte
+    walau file di-append saat dibaca. Diingat di <cache_dir>/index.json per (size, mtime).
+    """
+    path = Path(path).resolve()
+    st = path.stat()
+    index_path = Path(cache_dir) / INDEX if cache_dir else None
+    index = {}
+    if index_path is not None and index_path.exists():
+        try:
+            index = json.loads(index_path.read_text())
+        except ValueError:
+            index = {}
+
+    entry = index.get(str(path))
+    if entry and entry["size"] == st.st_size and entry["mtime_ns"] == st.st_mtime_ns:
+        return st.st_size, entry["sha256"]
+
+    h = hashlib.sha256()
+    left = st.st_size
+    with open(path, "rb") as f:
+        while left > 0:
+            chunk = f.read(min(1 << 20, left))
+            if not chunk:
+                raise ValueError(f"{path} terpotong saat di-hash (ukuran berubah)")
+            h.update(chunk)
+            left -= len(chunk)
+    digest = h.hexdigest()
+
+    if index_path is not None:
+        index[str(path)] = {"size": st.st_size, "mtime_ns": st.st_mtime_ns, "sha256": digest}
+        index_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = index_path.with_name(INDEX + f".{os.getpid()}.tmp")
+        tmp.write_text(json.dumps(index, indent=2))
+        os.replace(tmp, index_path)
+    return st.st_size, digest
+
+
+def file_sha256(path: Path, cache_dir: Path = None) -> str:
+    """sha256 file (lihat csv_snapshot)."""
+    return csv_snapshot(path, cache_dir)[1]
+
+
+def cache_key(csv_sha256: str, feature_list, label_col: str = LABEL_COL) -> str:
+    h = hashlib.sha256()
+    h.update(csv_sha256.encode())
+    h.update(json.dumps(list(feature_list)).encode("utf-8"))
+    h.update(f"{label_col}|minmax|v{PREPROC_VERSION}".encode())
+    return h.hexdigest()[:32]
+
+
+# ==========================================================
+# 🔧 PREPROCESSING (streaming, hanya saat cache miss)
+# ==========================================================
+def build(csv_path: Path, feature_list, out_dir: Path, label_col: str = LABEL_COL,
+          chunksize: int = encoder.CHUNKSIZE, nbytes: int = None) -> int:
+    """
+    Preprocessing CSV → X/y/mins/rng.npy + preprocess.pkl di out_dir. Dua pass
+    read_csv per chunk (FeatureEncoder), X ditulis langsung ke .npy lewat
+    open_memmap sehingga memori tidak bergantung pada jumlah baris.
+    nbytes: hanya prefix CSV sepanjang ini yang dibaca (snapshot).
+    """
+    import joblib
+
+    out_dir = Path(out_dir)
+    print(f"📂 Load dataset (chunk {chunksize:,} baris): {csv_path}")
+    enc = encoder.FeatureEncoder(feature_list, label_col=label_col, chunksize=chunksize)
+
+    print("🔧 Min-Max per fitur (pass 1)...")
+    enc.fit(csv_path, nbytes)
+    print(f"✅ {enc.n_rows:,} baris | {enc.dim} fitur")
+
+    print("🔧 One-hot encoding & normalisasi (pass 2)...")
+    X = np.lib.format.open_memmap(out_dir / "X.npy", mode="w+",
+                                  dtype=np.float32, shape=(enc.n_rows, enc.dim))
+    y = np.lib.format.open_memmap(out_dir / "y.npy", mode="w+",
+                                  dtype=np.float32, shape=(enc.n_rows,))
+    enc.transform_csv(csv_path, X, y, nbytes)
+    X.flush()
+    y.flush()
+    del X, y
+
+    np.save(out_dir / "mins.npy", enc.mins.astype("float64"))
+    np.save(out_dir / "rng.npy", enc.rng.astype("float64"))
+    joblib.dump(enc.preprocess(), out_dir / "preprocess.pkl")
+    return enc.n_rows
+
+
+# ==========================================================
+# 💾 SIMPAN / MUAT
+# ==========================================================
+def _entry_dir(cache_dir: Path, key: str) -> Path:
+    return Path(cache_dir) / key
+
+
+def load(cache_dir: Path, key: str, mmap: bool = True):
+    """Entry cache → dict (X/y di-mmap read-only), None jika belum ada."""
+    entry = _entry_dir(cache_dir, key)
+    if not (entry / "meta.json").exists():
+        return None
+    mode = "r" if mmap else None
+    return {
+        "X": np.load(entry / "X.npy", mmap_mode=mode),
+        "y": np.load(entry / "y.npy", mmap_mode=mode),
+        "mins": np.load(entry / "mins.npy"),
+        "rng": np.load(entry / "rng.npy"),
+        "preprocess_path": entry / "preprocess.pkl",
+        "meta": json.loads((entry / "meta.json").read_text()),
+    }
+
+
+def store(cache_dir: Path, key: str, write, meta: dict):
+    """
+    write(tmp_dir) mengisi file entry di direktori sementara, lalu rename
+    (atomik, aman dipanggil paralel). Return meta yang disimpan.
+    """
+    cache_dir = Path(cache_dir)
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    tmp = Path(tempfile.mkdtemp(prefix=f".{key}.", dir=cache_dir))
+    try:
+        meta = {**meta, **(write(tmp) or {})}
+        (tmp / "meta.json").write_text(json.dumps(meta, indent=2))
+        os.rename(tmp, _entry_dir(cache_dir, key))
+    except OSError:
+        # proses lain sudah menulis key yang sama lebih dulu
+        shutil.rmtree(tmp, ignore_errors=True)
+        if load(cache_dir, key) is None:
+            raise
+    except BaseException:
+        shutil.rmtree(tmp, ignore_errors=True)
+        raise
+    return meta
+
+
+def prune(cache_dir: Path, csv_path: Path, keep: str):
+    """Hapus entry lama untuk CSV yang sama (versi data sebelumnya)."""
+    csv_path = str(Path(csv_path).resolve())
+    for meta_path in Path(cache_dir).glob("*/meta.json"):
+        entry = meta_path.parent
+        if entry.name == keep:
+            continue
+        try:
+            if json.loads(meta_path.read_text()).get("csv") == csv_path:
+                shutil.rmtree(entry, ignore_errors=True)
+        except ValueError:
+            continue
+
+
+def lookup(csv_path: Path, feature_list, cache_dir: Path, label_col: str = LABEL_COL):
+    """(key, hit) tanpa memuat matriks (mis. untuk --dry-run)."""
+    key = cache_key(file_sha256(csv_path, cache_dir), feature_list, label_col)
+    return key, (_entry_dir(cache_dir, key) / "meta.json").exists()
+
+
+def load_or_build(csv_path: Path, feature_list, cache_dir: Path,
+                  label_col: str = LABEL_COL, refresh: bool = False,
+                  chunksize: int = encoder.CHUNKSIZE) -> dict:
+    """
+    Matriks training dari cache (hit: mmap, tanpa pandas) atau preprocessing
+    penuh lalu disimpan ke cache (miss). refresh=True memaksa build ulang.
+    csv_bytes / csv_sha256 di hasil = snapshot CSV yang menjadi isi matriks.
+    """
+    start = time.perf_counter()
+    csv_bytes, csv_sha256 = csv_snapshot(csv_path, cache_dir)
+    key = cache_key(csv_sha256, feature_list, label_col)
+    snapshot = {"csv_bytes": csv_bytes, "csv_sha256": csv_sha256}
+
+    data = None if refresh else load(cache_dir, key)
+    if data is not None:
+        print(f"⚡ Cache preprocessing hit ({key[:12]}): {data['X'].shape[0]:,} baris, "
+              f"{(time.perf_counter() - start) * 1000:.0f} ms")
+        return {**data, **snapshot}
+
+    meta = {
+        "csv": str(Path(csv_path).resolve()),
+        "feature_dim": len(feature_list),
+        "label": label_col,
+        "preproc_version": PREPROC_VERSION,
+        "chunksize": chunksize,
+        "created_at": datetime.utcnow().isoformat() + "Z",
+    }
+    if refresh:
+        shutil.rmtree(_entry_dir(cache_dir, key), ignore_errors=True)
+    store(cache_dir, key,
+          lambda tmp: {"rows": build(csv_path, feature_list, tmp, label_col, chunksize, csv_bytes)},
+          meta)
+    prune(cache_dir, csv_path, keep=key)
+    print(f"💾 Cache preprocessing dibuat ({key[:12]}): {time.perf_counter() - start:.1f} detik")
+    return {**load(cache_dir, key), **snapshot}
+
+
+if __name__ == "__main__":
+    import joblib
+
+    if len(sys.argv) < 3:
+        raise SystemExit("pakai: python preprocess_cache.py <csv> <fitur_global.pkl> [cache_dir]")
+    csv_path, feature_path = Path(sys.argv[1]), Path(sys.argv[2])
+    cache_dir = Path(sys.argv[3]) if len(sys.argv) > 3 else feature_path.parent / "cache"
+
+    features = joblib.load(feature_path)
+    for attempt in ("pertama", "kedua"):
+        t = time.perf_counter()
+        data = load_or_build(csv_path, features, cache_dir)
+        print(f"⏱️ Load {attempt}: {(time.perf_counter() - t) * 1000:.1f} ms → X{data['X'].shape}")
@@ -0,0 +1,127 @@
+"""
+Konfigurasi execution context TFF untuk script training federated.
+
+Default TFF menjalankan semua klien sekaligus dengan thread pool TensorFlow
+seukuran jumlah core. Di host training 32 core, 10 klien × 32 thread intra-op
+saling berebut core. Modul ini mengatur:
+
+    max_clients   → max_concurrent_computation_calls context C++ lokal
+                    (jumlah komputasi klien yang berjalan bersamaan)
+    intra_threads → thread per op (mis. matmul) per klien
+    inter_threads → op independen yang berjalan paralel
+    workers       → opsional: pool worker TFF terpisah (host:port, gRPC);
+                    klien dibagi ke worker lewat remote execution context
+    cpus          → opsional: pin proses ke core tertentu ("0-7", "8-15,24");
+                    dipakai orchestrate.py agar proses training tidak berebut core
+
+Jumlah thread diset lewat tf.config.threading dan juga TF_NUM_INTRAOP_THREADS /
+TF_NUM_INTEROP_THREADS, karena session TensorFlow di executor C++ TFF membaca
+environment saat dibuat. Panggil configure() sebelum op TensorFlow pertama
+(tf.data, Keras, build_* TFF); setelah runtime TF aktif jumlah thread tidak bisa
+diubah lagi. 0 / kosong = default TFF.
+
+Setelan yang dikembalikan configure() ikut dicatat di config setiap record
+telemetry round (Training/telemetry.py) untuk membandingkan setelan antar run.
+"""
+import os
+
+
+def add_arguments(parser, max_clients=0, intra_threads=0, inter_threads=0):
+    """Tambahkan flag execution context ke argparse script training."""
+    group = parser.add_argument_group("execution context TFF")
+    group.add_argument("--max-clients", type=int, default=max_clients,
+                       help="maks komputasi klien bersamaan (0 = default TFF, semua)")
+    group.add_argument("--intra-threads", type=int, default=intra_threads,
+                       help="thread intra-op TensorFlow (0 = default, jumlah core)")
+    group.add_argument("--inter-threads", type=int, default=inter_threads,
+                       help="thread inter-op TensorFlow (0 = default)")
+    group.add_argument("--workers", default="",
+                       help="pool worker TFF, mis. localhost:8000,localhost:8001 (kosong = lokal)")
+    group.add_argument("--cpus", default="",
+                       help="pin proses ke core, mis. 0-7 atau 0-3,16-19 (kosong = semua)")
+
+
+def parse_cpus(spec: str) -> list:
+    """'0-3,8' → [0, 1, 2, 3, 8]."""
+    cpus = set()
+    for part in spec.split(","):
+        part = part.strip()
+        if not part:
+            continue
+        lo, _, hi = part.partition("-")
+        cpus.update(range(int(lo), int(hi or lo) + 1))
+    return sorted(cpus)
+
+
+def format_cpus(cpus) -> str:
+    """[0, 1, 2, 3, 8] → '0-3,8'."""
+    ranges, cpus = [], sorted(cpus)
+    for c in cpus:
+        if ranges and c == ranges[-1][1] + 1:
+            ranges[-1][1] = c
+        else:
+            ranges.append([c, c])
+    return ",".join(f"{lo}-{hi}" if hi > lo else str(lo) for lo, hi in ranges)
+
+
+def available_cpus() -> list:
+    if hasattr(os, "sched_getaffinity"):
+        return sorted(os.sched_getaffinity(0))
+    return list(range(os.cpu_count() or 1))
+
+
+def configure(max_clients: int = 0, intra_threads: int = 0, inter_threads: int = 0,
+              workers: str = "", backend: str = "tff", cpus: str = "") -> dict:
+    """
+    Set thread TensorFlow & execution context TFF. Return ringkasan setelan.
+    backend="keras" (Training/fedavg.py) melatih klien berurutan tanpa TFF:
+    hanya jumlah thread yang berlaku.
+    """
+    if cpus:
+        if hasattr(os, "sched_setaffinity"):
+            os.sched_setaffinity(0, parse_cpus(cpus))
+        else:
+            print("⚠️ --cpus diabaikan: pinning core tidak didukung di platform ini")
+            cpus = ""
+
+    import tensorflow as tf
+
+    if intra_threads:
+        os.environ["TF_NUM_INTRAOP_THREADS"] = str(intra_threads)
+        tf.config.threading.set_intra_op_parallelism_threads(intra_threads)
+    if inter_threads:
+        os.environ["TF_NUM_INTEROP_THREADS"] = str(inter_threads)
+        tf.config.threading.set_inter_op_parallelism_threads(inter_threads)
+
+    max_calls = max_clients if max_clients > 0 else -1
+    addresses = [w.strip() for w in workers.split(",") if w.strip()]
+    if backend == "keras":
+        if max_clients or addresses:
+            print("⚠️ --max-clients / --workers diabaikan pada backend keras (klien berurutan)")
+        max_clients, addresses = 1, []
+        mode = "keras (tanpa TFF)"
+    elif addresses:
+        import grpc
+        import tensorflow_federated as tff
+        channels = [grpc.insecure_channel(a) for a in addresses]
+        tff.backends.native.set_sync_remote_cpp_execution_context(channels)
+        mode = f"{len(addresses)} worker remote"
+    else:
+        import tensorflow_federated as tff
+        tff.backends.native.set_sync_local_cpp_execution_context(
+            max_concurrent_computation_calls=max_calls,
+        )
+        mode = "lokal"
+
+    settings = {
+        "max_clients": max_clients or "semua",
+        "intra": intra_threads or "default",
+        "inter": inter_threads or "default",
+        "workers": ",".join(addresses) or "-",
+        "cpus": cpus or "semua",
+    }
+    print(f"⚙️ Execution context {mode} | klien bersamaan={settings['max_clients']} "
+          f"| intra={settings['intra']} | inter={settings['inter']} "
+          f"| {len(available_cpus())} core ({settings['cpus']})")
+    return settings
+
@@ -0,0 +1,190 @@
+"""
+Shard TFRecord per klien untuk pipeline tf.data training federated.
+
+Sebelumnya setiap klien dibuat dengan from_tensor_slices atas salinan array di
+memori: data ikut tertanam di graph dataset, shuffle memakai buffer sebesar
+seluruh data klien, tanpa prefetch. Di sini baris tiap klien ditulis SEKALI ke
+disk, lalu dibaca kembali secara streaming:
+
+    <shard_root>/<tag>/
+        client_00/part-00000.tfrecord ...
+        client_01/...
+        manifest.json
+
+Satu record = blok float32 RECORD_ROWS × (FEATURE_DIM + 1), kolom terakhir label.
+Partisi train/validasi & klien (partition) ditentukan hash nomor baris, bukan seed
+run: data, N_CLIENTS & VAL_SPLIT yang sama selalu menghasilkan partisi yang sama,
+dan baris yang di-append tidak memindahkan baris lama. tag = sha256(FEATURE_DIM +
+indeks baris tiap klien), jadi run berikutnya memakai ulang shard yang ada; acak
+per run dilakukan di tf.data (urutan file + shuffle buffer, seed TF run).
+Hanya KEEP tag terbaru yang disimpan. Baris ditulis per SHARD_ROWS dari X/y
+(boleh memmap dari preprocess_cache) sehingga memori tetap terbatas.
+
+Pipeline per klien (client_dataset):
+    file → interleave(TFRecordDataset) → decode blok → unbatch
+         → [cache] → shuffle(shuffle_buffer) → batch → prefetch(AUTOTUNE)
+Dataset berbasis file tetap bisa diserialisasi oleh TFF (tanpa py_function).
+"""
+import os
+import json
+import shutil
+import hashlib
+import tempfile
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+
+SHARD_ROWS = 65_536     # baris per file TFRecord
+RECORD_ROWS = 256       # baris per record
+SHUFFLE_BUFFER = 10_000
+CYCLE_LENGTH = 4        # file dibaca paralel per klien
+KEEP = 4                # jumlah split (tag) yang disimpan per shard_root
+MANIFEST = "manifest.json"
+PARTITION_SALT = 0x5EED   # ganti → semua partisi (dan shard) berubah
+
+
+def _row_hash(rows) -> np.ndarray:
+    """splitmix64 nomor baris → uint64 acak-semu yang stabil antar run."""
+    z = np.asarray(rows, dtype=np.uint64) + np.uint64(PARTITION_SALT)
+    z = z + np.uint64(0x9E3779B97F4A7C15)
+    z = (z ^ (z >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+    z = (z ^ (z >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+    return z ^ (z >> np.uint64(31))
+
+
+def partition(n_rows: int, n_clients: int, val_split: float, offset: int = 0):
+    """
+    (train_parts, val_parts): list indeks baris per klien. Baris i masuk validasi
+    jika hash(offset + i) jatuh di porsi val_split, kliennya dari bit hash yang
+    lain; di dalam klien baris diurutkan menurut hash (acak-semu, tetap antar run).
+    offset = nomor baris global baris pertama (mode incremental).
+    """
+    rows = np.arange(n_rows, dtype=np.int64)
+    h = _row_hash(rows + offset)
+    is_val = (h % np.uint64(1_000_000)) < np.uint64(round(val_split * 1_000_000))
+    client = ((h >> np.uint64(32)) % np.uint64(n_clients)).astype(np.int64)
+    order = np.argsort(h, kind="stable")
+    rows, is_val, client = rows[order], is_val[order], client[order]
+    return tuple(
+        [rows[mask & (client == k)] for k in range(n_clients)]
+        for mask in (~is_val, is_val)
+    )
+
+
+def split_tag(feature_dim: int, parts) -> str:
+    h = hashlib.sha256(f"dim={feature_dim}|record={RECORD_ROWS}|".encode())
+    for idx in parts:
+        h.update(np.ascontiguousarray(idx, dtype=np.int64).tobytes())
+        h.update(b"|")
+    return h.hexdigest()[:16]
+
+
+def _write_client(client_dir: Path, X, y, idx) -> list:
+    import tensorflow as tf
+
+    client_dir.mkdir(parents=True)
+    dim = X.shape[1]
+    files = []
+    for part, s in enumerate(range(0, len(idx), SHARD_ROWS)):
+        chunk = idx[s:s + SHARD_ROWS]
+        # memmap dibaca berurutan, urutan acak split dipertahankan di file
+        order = np.argsort(chunk)
+        rows = chunk[order]
+        block = np.empty((len(chunk), dim + 1), dtype="<f4")
+        block[order, :dim] = X[rows]
+        block[order, dim] = y[rows]
+
+        path = client_dir / f"part-{part:05d}.tfrecord"
+        with tf.io.TFRecordWriter(str(path)) as writer:
+            for r in range(0, len(block), RECORD_ROWS):
+                writer.write(block[r:r + RECORD_ROWS].tobytes())
+        files.append(path.name)
+    return files
+
+
+def _prune(shard_root: Path, keep: str):
+    tags = sorted(
+        (p.parent for p in shard_root.glob(f"*/{MANIFEST}") if p.parent.name != keep),
+        key=lambda d: (d / MANIFEST).stat().st_mtime,
+        reverse=True,
+    )
+    for old in tags[KEEP - 1:]:
+        shutil.rmtree(old, ignore_errors=True)
+
+
+def write_clients(shard_root: Path, X, y, parts) -> list:
+    """
+    Tulis shard untuk setiap array indeks di parts (satu per klien) jika belum
+    ada. Return list (per klien) berisi list path file TFRecord.
+    """
+    shard_root = Path(shard_root)
+    tag = split_tag(X.shape[1], parts)
+    target = shard_root / tag
+
+    if not (target / MANIFEST).exists():
+        shard_root.mkdir(parents=True, exist_ok=True)
+        tmp = Path(tempfile.mkdtemp(prefix=f".{tag}.", dir=shard_root))
+        try:
+            clients = [
+                _write_client(tmp / f"client_{k:02d}", X, y, idx)
+                for k, idx in enumerate(parts)
+            ]
+            manifest = {
+                "feature_dim": int(X.shape[1]),
+                "record_rows": RECORD_ROWS,
+                "rows": [int(len(idx)) for idx in parts],
+                "files": clients,
+                "created_at": datetime.utcnow().isoformat() + "Z",
+            }
+            (tmp / MANIFEST).write_text(json.dumps(manifest, indent=2))
+            os.rename(tmp, target)
+        except OSError:
+            # proses lain sudah menulis split yang sama lebih dulu
+            shutil.rmtree(tmp, ignore_errors=True)
+            if not (target / MANIFEST).exists():
+                raise
+        except BaseException:
+            shutil.rmtree(tmp, ignore_errors=True)
+            raise
+        print(f"💾 Shard klien ditulis: {target}")
+    else:
+        os.utime(target / MANIFEST)
+
+    _prune(shard_root, keep=tag)
+    manifest = json.loads((target / MANIFEST).read_text())
+    return [
+        [target / f"client_{k:02d}" / name for name in files]
+        for k, files in enumerate(manifest["files"])
+    ]
+
+
+def client_dataset(files, feature_dim: int, batch_size: int, shuffle: bool = True,
+                   shuffle_buffer: int = SHUFFLE_BUFFER, cache=False):
+    """
+    tf.data streaming dari shard satu klien → batch (x [b, dim], y [b, 1]).
+    cache: False, True (memori) atau path file cache tf.data.
+    """
+    import tensorflow as tf
+
+    width = feature_dim + 1
+
+    def decode(record):
+        block = tf.reshape(tf.io.decode_raw(record, tf.float32), (-1, width))
+        return block[:, :feature_dim], block[:, feature_dim:]
+
+    ds = tf.data.Dataset.from_tensor_slices([str(f) for f in files])
+    if shuffle and len(files) > 1:
+        ds = ds.shuffle(len(files))
+    ds = ds.interleave(
+        tf.data.TFRecordDataset,
+        cycle_length=min(len(files), CYCLE_LENGTH),
+        num_parallel_calls=tf.data.AUTOTUNE,
+        deterministic=not shuffle,
+    )
+    ds = ds.map(decode, num_parallel_calls=tf.data.AUTOTUNE).unbatch()
+    if cache:
+        ds = ds.cache() if cache is True else ds.cache(str(cache))
+    if shuffle:
+        ds = ds.shuffle(shuffle_buffer)
+    return ds.batch(batch_size).prefetch(tf.data.AUTOTUNE)
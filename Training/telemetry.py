@@ -0,0 +1,179 @@
+"""
+Telemetri terstruktur per round untuk script training federated.
+
+Setiap round menulis SATU record JSON ke SAVE_DIR/telemetry.jsonl saat round
+selesai (bukan di akhir training), sehingga run yang terputus tetap punya
+datanya dan durasi round bisa dibaca langsung:
+
+    {"run_id": "20260101T000000Z-1234", "round": 3, "timestamp": "...Z",
+     "wall_s": 5.12,
+     "phases": {"client_work": 4.61, "aggregation": 0.02, "eval": 0.41, "checkpoint": 0.08},
+     "examples": 80000, "examples_per_s": 17277.5,
+     "cpu_s": 38.4, "cpu_util": 7.5, "rss_mb": 812.3, "peak_rss_mb": 840.1,
+     "accuracy": 0.95, "loss": 0.21, "val_accuracy": 0.95, "val_loss": 0.22,
+     "config": {"instansi": "dinsos", "backend": "keras", ...}}
+
+Pada backend TFF agregasi tidak bisa dipisah dari process.next, jadi seluruh
+waktunya tercatat sebagai client_work dan aggregation bernilai null. cpu_util =
+cpu_s / wall_s (jumlah core rata-rata yang terpakai). Record round pertama
+sebuah run juga berisi "startup" (import, data, trace, first_round; lihat
+Startup). Hanya modul standar, tanpa psutil.
+"""
+import os
+import sys
+import json
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+
+try:
+    import resource
+except ImportError:  # Windows: peak RSS tidak tersedia
+    resource = None
+
+TELEMETRY_FILE = "telemetry.jsonl"
+
+
+def _round(value, digits):
+    return round(value, digits) if value is not None else None
+
+
+def utc_now() -> str:
+    return datetime.utcnow().isoformat() + "Z"
+
+
+def rss_mb():
+    """RSS proses saat ini (MB); fallback ke peak jika /proc tidak ada."""
+    try:
+        with open("/proc/self/statm") as f:
+            pages = int(f.read().split()[1])
+        return pages * os.sysconf("SC_PAGE_SIZE") / 1e6
+    except (OSError, ValueError, IndexError):
+        return peak_rss_mb()
+
+
+def peak_rss_mb():
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux: KB, macOS: byte
+    return peak / 1e6 if sys.platform == "darwin" else peak / 1e3
+
+
+class RoundTelemetry:
+    def __init__(self, save_dir: Path, config: dict, run_id: str = None):
+        """run_id dari checkpoint saat --resume agar round lanjutan tetap satu run."""
+        self.path = Path(save_dir) / TELEMETRY_FILE
+        self.run_id = run_id or datetime.utcnow().strftime("%Y%m%dT%H%M%SZ") + f"-{os.getpid()}"
+        self.config = config
+        self.round = None
+
+    def start(self, round_no: int):
+        self.round = round_no
+        self.phases = {}
+        self._wall = time.perf_counter()
+        self._cpu = time.process_time()
+
+    def elapsed(self) -> float:
+        return time.perf_counter() - self._wall
+
+    @contextmanager
+    def phase(self, name: str):
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases[name] = self.phases.get(name, 0.0) + time.perf_counter() - t0
+
+    def emit(self, examples: int = None, timing: dict = None, startup: dict = None,
+             **metrics) -> dict:
+        """
+        Tulis record round ini. timing: pembagian waktu fase "train" dari backend
+        ({"client_work", "aggregation"}); tanpa timing seluruh fase train = client_work.
+        startup: Startup.summary() (hanya record round pertama run).
+        """
+        wall = self.elapsed()
+        cpu = time.process_time() - self._cpu
+        phases = dict(self.phases)
+        train = phases.pop("train", None)
+        if timing:
+            phases = {"client_work": timing.get("client_work"),
+                      "aggregation": timing.get("aggregation"), **phases}
+        elif train is not None:
+            phases = {"client_work": train, "aggregation": None, **phases}
+        busy = (phases.get("client_work") or 0.0) + (phases.get("aggregation") or 0.0)
+
+        record = {
+            "run_id": self.run_id,
+            "round": self.round,
+            "timestamp": utc_now(),
+            "wall_s": round(wall, 4),
+            "phases": {k: _round(v, 4) for k, v in phases.items()},
+            "examples": examples,
+            "examples_per_s": round(examples / busy, 1) if examples and busy else None,
+            "cpu_s": round(cpu, 3),
+            "cpu_util": round(cpu / wall, 2) if wall else None,
+            "rss_mb": _round(rss_mb(), 1),
+            "peak_rss_mb": _round(peak_rss_mb(), 1),
+            **{k: (float(v) if v is not None else None) for k, v in metrics.items()},
+            "config": self.config,
+        }
+        if startup:
+            record["startup"] = startup
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(record) + "\n")
+            f.flush()
+        return record
+
+
+class Startup:
+    """
+    Breakdown waktu startup script training: import TF/TFF, load data,
+    trace komputasi, round pertama. Waktu di luar stage dicatat sebagai "other".
+    """
+
+    def __init__(self, t0: float = None):
+        self.t0 = t0 if t0 is not None else time.perf_counter()
+        self.stages = {}
+
+    def add(self, name: str, seconds: float):
+        self.stages[name] = self.stages.get(name, 0.0) + seconds
+
+    @contextmanager
+    def stage(self, name: str):
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(name, time.perf_counter() - t0)
+
+    def summary(self) -> dict:
+        total = time.perf_counter() - self.t0
+        out = {k: round(v, 3) for k, v in self.stages.items()}
+        out["other"] = round(total - sum(self.stages.values()), 3)
+        out["total"] = round(total, 3)
+        return out
+
+    def report(self) -> str:
+        s = self.summary()
+        parts = " | ".join(f"{k} {v:.1f}s" for k, v in s.items() if k != "total")
+        return f"⏱️ Startup {s['total']:.1f}s → {parts}"
+
+
+def read_run(save_dir: Path, run_id: str = None, limit: int = None) -> list:
+    """Record telemetry satu run (default: run terakhir di file)."""
+    path = Path(save_dir) / TELEMETRY_FILE
+    if not path.exists():
+        return []
+    records = []
+    for line in path.read_text(encoding="utf-8").splitlines():
+        try:
+            records.append(json.loads(line))
+        except ValueError:
+            continue  # baris terpotong (proses mati saat menulis)
+    if not records:
+        return []
+    run_id = run_id or records[-1].get("run_id")
+    records = [r for r in records if r.get("run_id") == run_id]
+    return records[-limit:] if limit else records
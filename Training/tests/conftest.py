@@ -0,0 +1,21 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+# modul training diimport flat (import encoder, import checkpoint) seperti di train.py
+ROOT = Path(__file__).resolve().parent.parent.parent
+sys.path.insert(0, str(ROOT / "Server"))
+sys.path.insert(0, str(ROOT / "Training"))
+
+
+@pytest.fixture(scope="session")
+def dinsos(tmp_path_factory):
+    """(csv 3.000 baris pertama dataset Dinsos + baris kategori asing / NaN, FEATURE_LIST)."""
+    import joblib
+
+    lines = (ROOT / "Dinsos" / "DATASET" / "dinsos_balanced.csv").read_text().splitlines()[:3001]
+    lines += ["750000,3,gubuk,pensiunan,S3,2,0", ",4,layak,,SMA,,1"]
+    path = tmp_path_factory.mktemp("data") / "dinsos.csv"
+    path.write_text("\n".join(lines) + "\n")
+    return path, joblib.load(ROOT / "Dinsos" / "Models" / "fitur_global.pkl")
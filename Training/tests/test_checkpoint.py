@@ -0,0 +1,76 @@
+import json
+
+import numpy as np
+import pytest
+
+import checkpoint
+import codec
+
+
+def groups(round_no):
+    return {"state": [np.full((3, 2), round_no, dtype=np.float32), np.arange(4)],
+            "best": [np.ones(5, dtype=np.float64) * round_no]}
+
+
+def assert_groups(got, want):
+    assert list(got) == list(want)
+    for name in want:
+        for g, w in zip(got[name], want[name]):
+            assert g.dtype == w.dtype
+            np.testing.assert_array_equal(g, w)
+
+
+def test_save_load_keeps_only_latest(tmp_path):
+    for r in (1, 2, 3):
+        info = checkpoint.save(tmp_path, r, groups(r), {"seed": 7, "history": [r]})
+    assert info["file"] == "checkpoint_r0003.bin" and info["bytes"] > 0
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["checkpoint.json", "checkpoint_r0003.bin"]
+
+    meta = checkpoint.load_meta(tmp_path)
+    assert meta["round"] == 3 and meta["seed"] == 7 and meta["groups"] == {"state": 2, "best": 1}
+    assert_groups(checkpoint.load(tmp_path, meta), groups(3))
+
+    checkpoint.clear(tmp_path)
+    assert checkpoint.load_meta(tmp_path) is None and not list(tmp_path.iterdir())
+
+
+def test_crash_during_data_write_keeps_previous(tmp_path, monkeypatch):
+    checkpoint.save(tmp_path, 1, groups(1), {})
+
+    def crash(fileobj, *a, **kw):
+        fileobj.write(b"setengah")
+        raise KeyboardInterrupt("proses mati")
+
+    monkeypatch.setattr(codec, "write", crash)
+    with pytest.raises(KeyboardInterrupt):
+        checkpoint.save(tmp_path, 2, groups(2), {})
+    monkeypatch.undo()
+
+    meta = checkpoint.load_meta(tmp_path)
+    assert meta["round"] == 1
+    assert_groups(checkpoint.load(tmp_path, meta), groups(1))
+    assert not (tmp_path / "checkpoint_r0002.bin").exists()
+
+    # round berikutnya menimpa sisa .tmp dan clear() membersihkannya
+    checkpoint.save(tmp_path, 2, groups(2), {})
+    assert checkpoint.load_meta(tmp_path)["round"] == 2
+    checkpoint.clear(tmp_path)
+    assert not list(tmp_path.glob("checkpoint_r*"))
+
+
+def test_crash_before_pointer_commit(tmp_path, monkeypatch):
+    checkpoint.save(tmp_path, 1, groups(1), {})
+    real = checkpoint._write_atomic
+
+    def fail_pointer(path, write):
+        if path.name == checkpoint.POINTER:
+            raise OSError("disk penuh")
+        real(path, write)
+
+    monkeypatch.setattr(checkpoint, "_write_atomic", fail_pointer)
+    with pytest.raises(OSError):
+        checkpoint.save(tmp_path, 2, groups(2), {})
+
+    meta = json.loads((tmp_path / checkpoint.POINTER).read_text())
+    assert meta["round"] == 1                      # pointer masih ke checkpoint lengkap lama
+    assert_groups(checkpoint.load(tmp_path, meta), groups(1))
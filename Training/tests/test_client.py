@@ -0,0 +1,60 @@
+import os
+import hashlib
+
+import numpy as np
+import pytest
+
+pytest.importorskip("requests")
+import client
+import codec
+
+
+class Response:
+    def __init__(self, chunks):
+        self.chunks = chunks
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def raise_for_status(self):
+        pass
+
+    def iter_content(self, size):
+        return iter(self.chunks)
+
+
+class Session:
+    def __init__(self, blob):
+        self.blob = blob
+        self.calls = []
+
+    def get(self, url, **kw):
+        self.calls.append((url, kw.get("params")))
+        return Response([self.blob[:10], self.blob[10:]])
+
+
+def test_fetch_global_verifies_and_skips_existing(tmp_path):
+    blob = codec.encode([np.ones((3, 2), dtype=np.float32)], "raw")
+    info = {"version": 4, "file": "global/global_v4.npz", "sha256": hashlib.sha256(blob).hexdigest()}
+    session = Session(blob)
+
+    path, _ = client.fetch_global(tmp_path, info, session=session)
+    assert path.read_bytes() == blob and session.calls[0][1] == {"format": "container"}
+    client.fetch_global(tmp_path, info, session=session)
+    assert len(session.calls) == 1                       # sha cocok → tidak diunduh ulang
+
+    bad = dict(info, file="global/global_v5.npz", version=5, sha256="0" * 64)
+    with pytest.raises(ValueError, match="sha256"):
+        client.fetch_global(tmp_path, bad, session=session)
+    assert not list(tmp_path.glob("*.part")) and not (tmp_path / "global_v5.npz").exists()
+
+
+def test_find_existing_npz_per_client(tmp_path):
+    for i, name in enumerate(["dinsos_1.npz", "dinsos_2.npz", "kemenkes_3.npz"]):
+        (tmp_path / name).write_bytes(b"x")
+        os.utime(tmp_path / name, (i, i))
+    assert client.find_existing_npz(tmp_path, "dinsos").name == "dinsos_2.npz"
+    assert client.find_existing_npz(tmp_path, "dukcapil") is None
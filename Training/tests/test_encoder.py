@@ -0,0 +1,77 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import encoder
+
+
+def pandas_reference(csv_path, feature_list, label_col=encoder.LABEL_COL):
+    """Preprocessing lama (get_dummies → reindex → min-max) sebelum FeatureEncoder."""
+    df = pd.read_csv(csv_path)
+    y = df[label_col].astype("float32").values
+    X_raw = df.drop(columns=[label_col])
+    X_raw = X_raw.drop(columns=[c for c in X_raw.columns if encoder.is_ignored(c)])
+    X_oh = pd.get_dummies(X_raw, drop_first=False).astype(float)
+    X_oh = X_oh.reindex(columns=list(feature_list), fill_value=0.0)
+    mins = X_oh.min()
+    rng = (X_oh.max() - mins).replace(0, 1.0)
+    X = ((X_oh - mins) / rng).fillna(0.0).astype("float32")
+    return X.values, y, mins.values.astype("float64"), rng.values.astype("float64")
+
+
+@pytest.mark.parametrize("chunksize", [100_000, 777, 1])
+def test_bit_identical_to_pandas(dinsos, chunksize):
+    csv_path, features = dinsos
+    if chunksize == 1:
+        csv_lines = csv_path.read_text().splitlines()
+        csv_path = csv_path.with_name("small.csv")
+        csv_path.write_text("\n".join(csv_lines[:40] + csv_lines[-2:]) + "\n")
+
+    X_ref, y_ref, mins_ref, rng_ref = pandas_reference(csv_path, features)
+    enc = encoder.FeatureEncoder(features, chunksize=chunksize).fit(csv_path)
+    X = np.empty((enc.n_rows, enc.dim), dtype=np.float32)
+    y = np.empty(enc.n_rows, dtype=np.float32)
+    assert enc.transform_csv(csv_path, X, y) == len(X_ref)
+
+    assert X.tobytes() == X_ref.tobytes()
+    assert y.tobytes() == y_ref.tobytes()
+    np.testing.assert_array_equal(enc.mins, mins_ref)
+    np.testing.assert_array_equal(enc.rng, rng_ref)
+
+
+def test_unknown_category_is_zero_row(dinsos):
+    _, features = dinsos
+    enc = encoder.FeatureEncoder(features)
+    chunk = pd.DataFrame({"kondisi_rumah": ["gubuk", "layak"], "id_warga": [1, 2], "layak_subsidi": [0, 1]})
+    out = enc.encode(chunk)
+    assert out[0].sum() == 0.0
+    assert out[1, features.index("kondisi_rumah_layak")] == 1.0 and out[1].sum() == 1.0
+
+
+def test_csv_growth_after_fit_rejected(dinsos, tmp_path):
+    csv_path, features = dinsos
+    path = tmp_path / "grow.csv"
+    path.write_bytes(csv_path.read_bytes())
+    enc = encoder.FeatureEncoder(features).fit(path)
+    with open(path, "a") as f:
+        f.write("100,1,layak,PNS,SMA,1,0\n")
+    X = np.empty((enc.n_rows, enc.dim), dtype=np.float32)
+    with pytest.raises(ValueError):
+        enc.transform_csv(path, X, np.empty(enc.n_rows, dtype=np.float32))
+
+
+def test_numeric_column_prefixing_other_features(tmp_path):
+    """Kolom numerik 'umur' bukan kategorikal walau ada fitur 'umur_kategori_*' / 'umur_30'."""
+    path = tmp_path / "umur.csv"
+    path.write_text("umur,umur_kategori,layak_subsidi\n30,muda,1\n65,tua,0\n30,,1\n")
+    features = ["umur_kategori_muda", "umur_kategori_tua", "umur_30"]
+
+    enc = encoder.FeatureEncoder(features).fit(path)
+    chunk = pd.read_csv(path)
+    assert enc._plan(chunk) == ([], ["umur_kategori"])
+
+    X = np.empty((enc.n_rows, enc.dim), dtype=np.float32)
+    enc.transform_csv(path, X, np.empty(enc.n_rows, dtype=np.float32))
+    X_ref, _, _, _ = pandas_reference(path, features)
+    assert X.tobytes() == X_ref.tobytes()
+    assert X[:, features.index("umur_30")].sum() == 0.0
@@ -0,0 +1,91 @@
+from datetime import datetime, timedelta
+
+import numpy as np
+import pytest
+
+import incremental
+import preprocess_cache
+
+
+@pytest.fixture
+def run(dinsos, tmp_path):
+    """CSV + SAVE_DIR setelah satu full run (watermark + NPZ model lokal)."""
+    src, features = dinsos
+    csv_path = tmp_path / "data.csv"
+    csv_path.write_bytes(src.read_bytes())
+    save_dir = tmp_path / "save"
+    save_dir.mkdir()
+
+    data = preprocess_cache.load_or_build(csv_path, features, tmp_path / "cache")
+    watermark = incremental.full_watermark(csv_path, data["csv_bytes"], data["csv_sha256"], features,
+                                           len(data["X"]), data["mins"], data["rng"])
+    watermark["model"] = "model.npz"
+    (save_dir / "model.npz").write_bytes(b"npz")
+    incremental.save_watermark(save_dir, watermark)
+    return csv_path, features, save_dir, data
+
+
+def append(csv_path, lines):
+    with open(csv_path, "a") as f:
+        f.write("".join(line + "\n" for line in lines))
+
+
+def test_only_appended_rows_are_read(run):
+    csv_path, features, save_dir, data = run
+    watermark = incremental.load_watermark(save_dir)
+    assert incremental.full_reason(watermark, csv_path, features, save_dir) is None
+
+    old_lines = csv_path.read_text().splitlines()[1:6]      # baris dalam range scaler lama
+    append(csv_path, old_lines)
+    delta = incremental.load_delta(csv_path, features, watermark)
+
+    assert delta["rows"] == 5 and delta["drift"] == {}
+    np.testing.assert_allclose(delta["X"], data["X"][:5], atol=1e-6)
+    np.testing.assert_array_equal(delta["y"], data["y"][:5])
+    new = delta["watermark"]
+    assert new["bytes"] == csv_path.stat().st_size and new["rows"] == watermark["rows"] + 5
+    assert new["sha256"] == preprocess_cache.file_sha256(csv_path)
+
+    # watermark baru → run berikutnya tidak membaca ulang baris yang sama
+    again = incremental.load_delta(csv_path, features, new)
+    assert again["rows"] == 0 and again["X"].shape == (0, len(features))
+
+
+def test_drift_detected(run):
+    csv_path, features, save_dir, _ = run
+    watermark = incremental.load_watermark(save_dir)
+    append(csv_path, ["999999999,3,layak,PNS,SMA,4,0"])
+    delta = incremental.load_delta(csv_path, features, watermark, drift_tolerance=0.1)
+    assert "penghasilan" in delta["drift"]
+    assert delta["watermark"]["maxs"][features.index("penghasilan")] == 999999999
+
+
+def test_rewritten_csv_forces_full(run):
+    csv_path, features, save_dir, _ = run
+    watermark = incremental.load_watermark(save_dir)
+    text = csv_path.read_text()
+    csv_path.write_text(text.replace("\n6", "\n7", 1) + "1,1,layak,PNS,SMA,1,0\n")
+    assert incremental.load_delta(csv_path, features, watermark) is None
+
+    csv_path.write_text(text[:100])                    # file dipotong
+    assert incremental.load_delta(csv_path, features, watermark) is None
+
+
+def test_full_reasons(run):
+    csv_path, features, save_dir, _ = run
+    watermark = incremental.load_watermark(save_dir)
+    assert incremental.full_reason(None, csv_path, features, save_dir) == "watermark belum ada"
+    assert "fitur" in incremental.full_reason(watermark, csv_path, features[:-1], save_dir)
+    assert "CSV" in incremental.full_reason(watermark, save_dir / "lain.csv", features, save_dir)
+
+    stale = dict(watermark, full_at=(datetime.utcnow() - timedelta(days=8)).isoformat() + "Z")
+    assert "hari" in incremental.full_reason(stale, csv_path, features, save_dir, full_every_days=7)
+    assert incremental.full_reason(stale, csv_path, features, save_dir, full_every_days=0) is None
+
+    (save_dir / "model.npz").unlink()
+    assert "model lokal" in incremental.full_reason(watermark, csv_path, features, save_dir)
+
+
+def test_corrupt_watermark_is_ignored(tmp_path):
+    (tmp_path / incremental.WATERMARK).write_text("{rusak")
+    assert incremental.load_watermark(tmp_path) is None
@@ -0,0 +1,77 @@
+import joblib
+import numpy as np
+
+import encoder
+import preprocess_cache
+
+
+def test_miss_then_hit(dinsos, tmp_path):
+    csv_path, features = dinsos
+    cache_dir = tmp_path / "cache"
+    key, hit = preprocess_cache.lookup(csv_path, features, cache_dir)
+    assert not hit
+
+    built = preprocess_cache.load_or_build(csv_path, features, cache_dir, chunksize=500)
+    assert preprocess_cache.lookup(csv_path, features, cache_dir) == (key, True)
+    cached = preprocess_cache.load_or_build(csv_path, features, cache_dir)
+    assert isinstance(cached["X"], np.memmap) and not cached["X"].flags.writeable
+    assert cached["X"].tobytes() == built["X"].tobytes()
+
+    # isi cache sama dengan encoder langsung
+    enc = encoder.FeatureEncoder(features).fit(csv_path)
+    X = np.empty((enc.n_rows, enc.dim), dtype=np.float32)
+    y = np.empty(enc.n_rows, dtype=np.float32)
+    enc.transform_csv(csv_path, X, y)
+    assert cached["X"].tobytes() == X.tobytes() and cached["y"].tobytes() == y.tobytes()
+    pre = joblib.load(cached["preprocess_path"])
+    assert pre["FEATURE_COLS"] == list(features)
+    np.testing.assert_array_equal(pre["rng"].to_numpy(), cached["rng"])
+
+
+def test_csv_change_new_key_and_prune(dinsos, tmp_path):
+    csv_path, features = dinsos
+    path = tmp_path / "data.csv"
+    path.write_bytes(csv_path.read_bytes())
+    cache_dir = tmp_path / "cache"
+    first = preprocess_cache.load_or_build(path, features, cache_dir)
+    old_key, _ = preprocess_cache.lookup(path, features, cache_dir)
+
+    with open(path, "a") as f:
+        f.write("100,1,layak,PNS,SMA,1,0\n")
+    second = preprocess_cache.load_or_build(path, features, cache_dir)
+    new_key, hit = preprocess_cache.lookup(path, features, cache_dir)
+    assert hit and new_key != old_key
+    assert len(second["X"]) == len(first["X"]) + 1
+    assert not (cache_dir / old_key).exists()        # entry CSV versi lama dihapus
+
+
+def test_refresh_rebuilds(dinsos, tmp_path):
+    csv_path, features = dinsos
+    cache_dir = tmp_path / "cache"
+    preprocess_cache.load_or_build(csv_path, features, cache_dir)
+    key, _ = preprocess_cache.lookup(csv_path, features, cache_dir)
+    (cache_dir / key / "X.npy").write_bytes(b"rusak")
+    data = preprocess_cache.load_or_build(csv_path, features, cache_dir, refresh=True)
+    assert data["X"].shape == (3002, len(features))
+
+
+def test_rows_appended_during_build_are_not_read(dinsos, tmp_path, monkeypatch):
+    """Matriks, csv_bytes & csv_sha256 berasal dari satu snapshot CSV."""
+    import hashlib
+
+    csv_path, features = dinsos
+    path = tmp_path / "data.csv"
+    path.write_bytes(csv_path.read_bytes())
+    snapshot = path.read_bytes()
+    real_build = preprocess_cache.build
+
+    def build_while_appending(*args, **kw):
+        with open(path, "a") as f:
+            f.write("100,1,layak,PNS,SMA,1,0\n")
+        return real_build(*args, **kw)
+
+    monkeypatch.setattr(preprocess_cache, "build", build_while_appending)
+    data = preprocess_cache.load_or_build(path, features, tmp_path / "cache")
+    assert data["csv_bytes"] == len(snapshot)
+    assert data["csv_sha256"] == hashlib.sha256(snapshot).hexdigest()
+    assert data["X"].shape == (3002, len(features)) and data["meta"]["rows"] == 3002
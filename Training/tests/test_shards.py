@@ -0,0 +1,27 @@
+import numpy as np
+
+import shards
+
+
+def test_partition_is_stable_and_complete():
+    train, val = shards.partition(10_000, 4, 0.2)
+    again = shards.partition(10_000, 4, 0.2)
+    assert all(np.array_equal(a, b) for a, b in zip(train + val, again[0] + again[1]))
+
+    rows = np.concatenate(train + val)
+    assert np.array_equal(np.sort(rows), np.arange(10_000))     # tiap baris tepat satu kali
+    assert abs(sum(map(len, val)) / 10_000 - 0.2) < 0.02
+    assert all(abs(len(p) - 2_000) < 200 for p in train)
+    assert not np.array_equal(train[0], np.sort(train[0]))       # urutan acak-semu, bukan urutan CSV
+
+
+def test_appended_rows_keep_old_assignment():
+    old_train, old_val = shards.partition(5_000, 3, 0.2)
+    new_train, new_val = shards.partition(6_000, 3, 0.2)
+    for old, new in zip(old_train + old_val, new_train + new_val):
+        assert np.array_equal(new[new < 5_000], old)
+
+    # offset (incremental): baris delta dipartisi seperti baris global yang sama
+    delta_train, _ = shards.partition(1_000, 3, 0.2, offset=5_000)
+    for new, delta in zip(new_train, delta_train):
+        assert np.array_equal(new[new >= 5_000] - 5_000, delta)
@@ -0,0 +1,628 @@
+"""
+Training federated satu instansi (entry point bersama Dinsos/Dukcapil/Kemenkes).
+
+Script per instansi (Dinsos/Dinsos.py, ...) hanya meneruskan --instansi ke sini;
+orchestrate.py menjalankan beberapa instansi / varian sebagai proses terpisah.
+
+    python Training/train.py --instansi dinsos
+    python Training/train.py --instansi dinsos --name dinsos_lr01 --client-lr 0.01
+    python Training/train.py --instansi dinsos --dry-run           # cek konfigurasi & cache
+
+TensorFlow / TFF baru diimport setelah data siap, sehingga --dry-run dan
+--preprocess-only tidak membayar import keduanya.
+"""
+# ============================================================
+# IMPORT (TANPA TENSORFLOW)
+# ============================================================
+import time
+T_START = time.perf_counter()
+
+import sys
+import atexit
+import argparse
+import shutil
+import tempfile
+import numpy as np
+import joblib
+from pathlib import Path
+
+# codec bobot dipakai bersama dengan server, helper training di Training/
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "Server"))
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "Training"))
+import codec
+import checkpoint
+import preprocess_cache
+import shards
+import runtime
+import telemetry
+import institutions
+import incremental
+import computation_cache
+
+# ============================================================
+# KONFIGURASI
+# ============================================================
+BATCH_SIZE = 32
+N_CLIENTS  = 10
+ROUNDS     = 15
+WARM_ROUNDS = 3   # round default saat warm-start dari model global
+VAL_SPLIT  = 0.2  # porsi data held-out untuk evaluasi federated per round
+PATIENCE   = 3    # stop jika val_loss tidak membaik sekian round (0 = nonaktif)
+MIN_DELTA  = 1e-4 # perbaikan val_loss minimal yang dihitung
+SEED       = None # None = acak per run (disimpan di checkpoint untuk resume)
+SHUFFLE_BUFFER = 10_000  # buffer shuffle per klien (baris)
+MAX_CLIENTS   = 0  # klien dilatih bersamaan per round (0 = semua, default TFF)
+INTRA_THREADS = 0  # thread intra-op TF (0 = default); host 32 core: mis. 8 klien × 4
+INTER_THREADS = 0  # thread inter-op TF (0 = default)
+BACKEND    = "tff"  # "tff" atau "keras" (FedAvg tanpa TFF, Training/fedavg.py)
+XLA        = False  # backend keras: langkah klien dikompilasi XLA
+MIXED_PRECISION = False  # backend keras: bfloat16 di klien, bobot master float32
+CLIENT_LR  = 0.005
+SERVER_LR  = 0.01
+
+parser = argparse.ArgumentParser(description="Training federated satu instansi")
+parser.add_argument("--instansi", required=True, choices=sorted(institutions.INSTITUTIONS))
+parser.add_argument("--name",
+                    help="nama run / varian (default = instansi) → SAVE_DIR Models/saved_<name>_tff")
+parser.add_argument("--base-dir", help="folder instansi (default <repo>/<Instansi>)")
+parser.add_argument("--data", help="CSV dataset (default <base-dir>/DATASET/<instansi>_balanced.csv)")
+parser.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+parser.add_argument("--n-clients", type=int, default=N_CLIENTS, help="jumlah klien simulasi")
+parser.add_argument("--client-lr", type=float, default=CLIENT_LR, help="learning rate Adam klien")
+parser.add_argument("--server-lr", type=float, default=SERVER_LR, help="learning rate Adam server")
+parser.add_argument("--init-weights",
+                    help="warm-start: path NPZ/container model global, atau 'latest' (registry server)")
+parser.add_argument("--rounds", type=int,
+                    help=f"jumlah round federated (default {ROUNDS}, warm-start {WARM_ROUNDS})")
+parser.add_argument("--patience", type=int, default=PATIENCE,
+                    help="early stopping: round tanpa perbaikan val_loss (0 = nonaktif)")
+parser.add_argument("--seed", type=int, default=SEED, help="seed split data & shuffle")
+parser.add_argument("--resume", action="store_true",
+                    help="lanjutkan dari checkpoint round terakhir di SAVE_DIR")
+parser.add_argument("--refresh-cache", action="store_true",
+                    help="abaikan cache preprocessing & bangun ulang dari CSV")
+parser.add_argument("--cache", default="off", metavar="{off,memory,PATH}",
+                    help="cache tf.data baris klien setelah round pertama: off, memory, "
+                         "atau folder untuk file cache (dihapus di akhir run)")
+parser.add_argument("--shuffle-buffer", type=int, default=SHUFFLE_BUFFER,
+                    help="buffer shuffle per klien (baris)")
+parser.add_argument("--incremental", action="store_true",
+                    help="latih hanya baris CSV baru sejak run terakhir (warm-start model lokal)")
+parser.add_argument("--full-every-days", type=int, default=incremental.FULL_EVERY_DAYS,
+                    help="--incremental: paksa full refresh jika full terakhir lebih lama (0 = tidak)")
+parser.add_argument("--drift-tolerance", type=float, default=incremental.DRIFT_TOLERANCE,
+                    help="--incremental: pelebaran min/max (fraksi range) sebelum full refresh")
+parser.add_argument("--backend", choices=["tff", "keras"], default=BACKEND,
+                    help="engine simulasi FedAvg: TFF atau Keras/tf.function (startup cepat)")
+parser.add_argument("--xla", action=argparse.BooleanOptionalAction, default=XLA,
+                    help="kompilasi langkah klien dengan XLA (backend keras)")
+parser.add_argument("--mixed-precision", action=argparse.BooleanOptionalAction,
+                    default=MIXED_PRECISION,
+                    help="policy mixed_bfloat16 untuk klien (backend keras)")
+parser.add_argument("--computation-cache", action=argparse.BooleanOptionalAction, default=True,
+                    help="pakai ulang komputasi TFF hasil trace run sebelumnya (backend tff)")
+parser.add_argument("--dry-run", action="store_true",
+                    help="cek konfigurasi, path & status cache lalu keluar (tanpa TF/TFF)")
+parser.add_argument("--preprocess-only", action="store_true",
+                    help="bangun cache preprocessing lalu keluar (tanpa TF/TFF)")
+runtime.add_arguments(parser, MAX_CLIENTS, INTRA_THREADS, INTER_THREADS)
+args = parser.parse_args()
+if args.backend == "tff" and (args.xla or args.mixed_precision):
+    parser.error("--xla / --mixed-precision hanya tersedia dengan --backend keras")
+if args.incremental and (args.resume or args.init_weights):
+    parser.error("--incremental tidak bisa digabung dengan --resume / --init-weights")
+if args.shuffle_buffer < 1:
+    parser.error("--shuffle-buffer minimal 1")
+
+startup = telemetry.Startup(T_START)
+ROUNDS = args.rounds or (WARM_ROUNDS if args.init_weights else ROUNDS)
+PATIENCE = args.patience
+BATCH_SIZE = args.batch_size
+N_CLIENTS = args.n_clients
+
+INSTANSI   = args.instansi
+PATHS      = institutions.paths(INSTANSI, args.name, args.base_dir, args.data)
+NAME       = PATHS["name"]
+BASE_DIR   = PATHS["base_dir"]
+DATA_PATH  = PATHS["data"]
+FEATURE_PATH = PATHS["features"]
+SAVE_DIR   = PATHS["save_dir"]
+CACHE_DIR  = PATHS["cache_dir"]   # matriks fitur hasil preprocessing (.npy)
+
+# ============================================================
+# CHECKPOINT & SEED
+# ============================================================
+ckpt = checkpoint.load_meta(SAVE_DIR) if args.resume else None
+if args.resume and ckpt is None:
+    print("ℹ️ Checkpoint tidak ditemukan, training dimulai dari round 1")
+
+if ckpt:
+    # seed sama → urutan shuffle & bobot awal identik dengan run yang terputus
+    # (partisi train/validasi & klien selalu sama, lihat shards.partition)
+    SEED = ckpt["seed"]
+    ROUNDS = args.rounds or ckpt["rounds"]
+elif args.seed is not None:
+    SEED = args.seed
+else:
+    SEED = int(np.random.SeedSequence().entropy % 2**31)
+
+np.random.seed(SEED)
+
+print(f"\n=== TRAINING FEDERATED {INSTANSI.upper()}"
+      f"{f' ({NAME})' if NAME != INSTANSI else ''} ===")
+
+# ============================================================
+# LOAD FITUR GLOBAL
+# ============================================================
+if not FEATURE_PATH.exists():
+    raise FileNotFoundError(
+        "Models/fitur_global.pkl tidak ditemukan.\n"
+        "Jalankan dulu pembuat fitur global."
+    )
+
+FEATURE_LIST = joblib.load(FEATURE_PATH)
+FEATURE_DIM  = len(FEATURE_LIST)
+print(f"🔑 Total fitur global: {FEATURE_DIM}")
+
+if ckpt and ckpt["feature_dim"] != FEATURE_DIM:
+    raise ValueError(
+        f"Checkpoint dibuat dengan {ckpt['feature_dim']} fitur, FEATURE_DIM saat ini {FEATURE_DIM}. "
+        "Jalankan tanpa --resume."
+    )
+if ckpt and ckpt.get("backend", "tff") != args.backend:
+    raise ValueError(
+        f"Checkpoint dibuat dengan backend {ckpt.get('backend', 'tff')}, bukan {args.backend}. "
+        "Pakai --backend yang sama atau jalankan tanpa --resume."
+    )
+
+# ============================================================
+# DRY RUN (TANPA TENSORFLOW / TFF)
+# ============================================================
+if args.dry_run:
+    mode = "full"
+    if args.incremental:
+        reason = incremental.full_reason(incremental.load_watermark(SAVE_DIR), DATA_PATH,
+                                         FEATURE_LIST, SAVE_DIR, args.full_every_days)
+        mode = f"full ({reason})" if reason else "incremental"
+    size = f"{DATA_PATH.stat().st_size / 1e6:.1f} MB" if DATA_PATH.exists() else "TIDAK ADA"
+    print(f"📄 Dataset      : {DATA_PATH} ({size})")
+    if DATA_PATH.exists():
+        key, hit = preprocess_cache.lookup(DATA_PATH, FEATURE_LIST, CACHE_DIR)
+        print(f"⚡ Cache        : {key[:12]} {'hit' if hit else 'miss (akan dibangun)'}")
+    print(f"📂 SAVE_DIR     : {SAVE_DIR}")
+    resume = f" | resume round {ckpt['round'] + 1}" if ckpt else ""
+    print(f"🧪 Backend      : {args.backend} | round {ROUNDS} | seed {SEED} | mode {mode}{resume}")
+    print(f"👥 Klien        : {N_CLIENTS} × batch {BATCH_SIZE} | lr klien {args.client_lr} "
+          f"| lr server {args.server_lr}")
+    print(f"🔀 tf.data      : shuffle buffer {args.shuffle_buffer:,} | cache {args.cache}")
+    print(f"📦 Modul berat  : tensorflow={'tensorflow' in sys.modules} "
+          f"tensorflow_federated={'tensorflow_federated' in sys.modules}")
+    sys.exit(0)
+
+SAVE_DIR.mkdir(parents=True, exist_ok=True)
+
+# ============================================================
+# MODE INCREMENTAL (HANYA BARIS BARU)
+# ============================================================
+# watermark run terakhir → hanya baris setelah offset-nya yang dibaca & dilatih,
+# warm-start dari NPZ lokal terakhir (Training/incremental.py)
+t_data = time.perf_counter()
+delta = None
+if args.incremental:
+    watermark = incremental.load_watermark(SAVE_DIR)
+    reason = incremental.full_reason(watermark, DATA_PATH, FEATURE_LIST, SAVE_DIR,
+                                     args.full_every_days)
+    if reason is None:
+        delta = incremental.load_delta(DATA_PATH, FEATURE_LIST, watermark, args.drift_tolerance)
+        if delta is None:
+            reason = "CSV tidak hanya di-append sejak run terakhir"
+        elif delta["drift"]:
+            reason = f"drift min/max > {args.drift_tolerance:.0%} range: {delta['drift']}"
+            delta = None
+    if reason:
+        print(f"🔁 Full refresh: {reason}")
+    elif delta["rows"] < N_CLIENTS * BATCH_SIZE:
+        print(f"ℹ️ Baris baru {delta['rows']:,} < {N_CLIENTS * BATCH_SIZE:,} "
+              f"(N_CLIENTS × BATCH_SIZE), model tidak diubah")
+        sys.exit(0)
+    else:
+        print(f"➕ Incremental: {delta['rows']:,} baris baru sejak {watermark['updated_at']} "
+              f"(warm-start {watermark['model']})")
+        ROUNDS = args.rounds or WARM_ROUNDS
+
+# ============================================================
+# PREPROCESSING (CACHE)
+# ============================================================
+# One-hot + align + min-max hanya dihitung ulang jika CSV / FEATURE_LIST berubah;
+# cache hit dibaca sebagai memmap .npy tanpa pandas (Training/preprocess_cache.py)
+if delta is None:
+    # data["csv_bytes"] / data["csv_sha256"]: snapshot CSV yang menjadi isi matriks (watermark)
+    data = preprocess_cache.load_or_build(DATA_PATH, FEATURE_LIST, CACHE_DIR,
+                                          refresh=args.refresh_cache)
+    X_scaled, y_all = data["X"], data["y"]
+else:
+    X_scaled, y_all = delta["X"], delta["y"]
+
+print("✅ Preprocessing selesai")
+startup.add("data", time.perf_counter() - t_data)
+
+if args.preprocess_only:
+    print(f"⏱️ {len(X_scaled):,} baris siap dalam {startup.stages['data']:.1f}s (tanpa TF/TFF)")
+    sys.exit(0)
+
+# ============================================================
+# IMPORT TENSORFLOW / TFF (SETELAH DATA SIAP)
+# ============================================================
+with startup.stage("import"):
+    # pin core & thread TF wajib sebelum import/op TensorFlow pertama; TFF
+    # (lama & terikat versi TF) hanya diimport jika backend-nya dipakai
+    RUNTIME = runtime.configure(args.max_clients, args.intra_threads, args.inter_threads,
+                                args.workers, backend=args.backend, cpus=args.cpus)
+    import tensorflow as tf
+    if args.backend == "tff":
+        import tensorflow_federated as tff
+    else:
+        import fedavg
+tf.random.set_seed(SEED)
+
+# ============================================================
+# TF.DATA (SHARD) & SPLIT CLIENT
+# ============================================================
+# baris tiap klien ditulis sekali sebagai shard TFRecord (Training/shards.py),
+# dibaca streaming: interleave → shuffle terbatas → batch → prefetch
+# varian lain dari instansi yang sama punya folder shard sendiri (pruning per folder)
+t_data = time.perf_counter()
+SHARD_DIR = CACHE_DIR / "shards"
+if NAME != INSTANSI:
+    SHARD_DIR = SHARD_DIR / NAME
+if delta is not None:
+    SHARD_DIR = SHARD_DIR / "incremental"
+
+# --cache: baris hasil decode shard disimpan saat round pertama, round
+# berikutnya dibaca dari cache. File cache dibuat per run (split & data bisa
+# berbeda antar run) lalu dihapus saat proses selesai.
+if args.cache == "off":
+    DATA_CACHE = None
+elif args.cache == "memory":
+    DATA_CACHE = "memory"
+else:
+    Path(args.cache).mkdir(parents=True, exist_ok=True)
+    DATA_CACHE = Path(tempfile.mkdtemp(prefix=f"{NAME}_", dir=args.cache))
+    atexit.register(shutil.rmtree, DATA_CACHE, ignore_errors=True)
+
+def client_cache(kind: str, k: int):
+    """Argumen cache shards.client_dataset untuk klien ke-k (train / val)."""
+    if DATA_CACHE is None:
+        return False
+    if DATA_CACHE == "memory":
+        return True
+    return DATA_CACHE / f"{kind}_{k:02d}"
+
+def client_datasets(X, y, parts, shuffle=True, kind="train"):
+    return [
+        shards.client_dataset(files, FEATURE_DIM, BATCH_SIZE, shuffle=shuffle,
+                              shuffle_buffer=args.shuffle_buffer, cache=client_cache(kind, k))
+        for k, files in enumerate(shards.write_clients(SHARD_DIR, X, y, parts))
+    ]
+
+# partisi train / held-out (validasi per round) & klien tetap antar run (hash nomor
+# baris, bukan SEED) → shard dipakai ulang; acak per run ada di tf.data (seed TF)
+row_offset = 0 if delta is None else delta["watermark"]["rows"] - delta["rows"]
+train_parts, val_parts = shards.partition(len(X_scaled), N_CLIENTS, VAL_SPLIT, offset=row_offset)
+n_train, n_val = sum(map(len, train_parts)), sum(map(len, val_parts))
+
+clients     = client_datasets(X_scaled, y_all, train_parts)
+val_clients = client_datasets(X_scaled, y_all, val_parts, shuffle=False, kind="val")
+print(f"👥 {len(clients)} klien federated siap ({n_train:,} train | {n_val:,} validasi)")
+startup.add("data", time.perf_counter() - t_data)
+
+# ============================================================
+# MODEL FN (IDENTIK DENGAN TEST)
+# ============================================================
+def build_keras_model():
+    return tf.keras.Sequential([
+        tf.keras.layers.Input(shape=(FEATURE_DIM,)),
+        tf.keras.layers.Dense(128, activation="relu"),
+        tf.keras.layers.BatchNormalization(),
+        tf.keras.layers.Dropout(0.3),
+        tf.keras.layers.Dense(64, activation="relu"),
+        tf.keras.layers.Dense(32, activation="relu"),
+        # output tetap float32 saat klien memakai mixed precision
+        tf.keras.layers.Dense(1, activation="sigmoid", dtype="float32"),
+    ])
+
+def model_fn():
+    return tff.learning.models.from_keras_model(
+        keras_model=build_keras_model(),
+        input_spec=clients[0].element_spec,
+        loss=tf.keras.losses.BinaryCrossentropy(),
+        metrics=[tf.keras.metrics.BinaryAccuracy(name="binary_accuracy")]
+    )
+
+# ============================================================
+# BOBOT AWAL (WARM-START)
+# ============================================================
+def load_init_weights(source):
+    """Bobot model global → list tensor, dicek terhadap arsitektur & FEATURE_DIM."""
+    if source == "latest":
+        import client  # registry /global/version (tanpa import TF tambahan)
+        path, info = client.fetch_global(BASE_DIR / "Models/global")
+        print(f"🌍 Model global v{info['version']} dari registry: {path.name}")
+    else:
+        path = Path(source)
+
+    weights = codec.load(path, mmap=False)
+    expected = [tuple(w.shape) for w in build_keras_model().weights]
+    got = [tuple(w.shape) for w in weights]
+
+    if len(got) != len(expected):
+        raise ValueError(
+            f"Model global berisi {len(got)} tensor, arsitektur butuh {len(expected)}"
+        )
+    if got[0] != expected[0]:
+        raise ValueError(
+            f"Model global dilatih dengan {got[0][0]} fitur, "
+            f"FEATURE_DIM saat ini {FEATURE_DIM} (cek fitur_global.pkl)"
+        )
+    for i, (g, e) in enumerate(zip(got, expected)):
+        if g != e:
+            raise ValueError(f"Shape tensor {i} tidak cocok: model global {g}, arsitektur {e}")
+    return weights
+
+# saat resume bobot awal sudah ada di state checkpoint
+init_weights = load_init_weights(args.init_weights) if args.init_weights and not ckpt else None
+if delta is not None:
+    init_weights = load_init_weights(SAVE_DIR / watermark["model"])
+
+# ============================================================
+# FEDERATED PROCESS
+# ============================================================
+def cached_computation(label, build, *parts):
+    """Komputasi TFF dari cache (Training/computation_cache.py) atau build() + simpan."""
+    if not args.computation_cache:
+        return build(), False
+    arch = build_keras_model().to_json()
+    key = computation_cache.cache_key(label, arch, clients[0].element_spec, *parts)
+    return computation_cache.load_or_build(
+        CACHE_DIR / "computations", key, build,
+        {"label": label, "instansi": INSTANSI, "feature_dim": FEATURE_DIM},
+    )
+
+startup_trace = time.perf_counter()
+computation_hit = False
+if args.backend == "tff":
+    process, train_hit = cached_computation(
+        "unweighted_fed_avg",
+        lambda: tff.learning.algorithms.build_unweighted_fed_avg(
+            model_fn,
+            client_optimizer_fn=tff.learning.optimizers.build_adam(args.client_lr),
+            server_optimizer_fn=tff.learning.optimizers.build_adam(args.server_lr),
+        ),
+        f"adam:{args.client_lr}", f"adam:{args.server_lr}",
+    )
+    eval_process, eval_hit = cached_computation(
+        "fed_eval", lambda: tff.learning.algorithms.build_fed_eval(model_fn)
+    )
+    computation_hit = train_hit
+    if train_hit or eval_hit:
+        print(f"⚡ Komputasi TFF dari cache (train={train_hit}, eval={eval_hit})")
+    ModelWeights = tff.learning.models.ModelWeights
+else:
+    # FedAvg & evaluasi yang sama dengan Keras + tf.function (Training/fedavg.py);
+    # tracing tf.function terjadi di round pertama
+    process = fedavg.build_unweighted_fed_avg(
+        build_keras_model,
+        client_optimizer_fn=lambda: tf.keras.optimizers.Adam(args.client_lr),
+        server_optimizer_fn=lambda: tf.keras.optimizers.Adam(args.server_lr),
+        jit_compile=args.xla,
+        mixed_precision=args.mixed_precision,
+    )
+    eval_process = fedavg.build_fed_eval(build_keras_model)
+    ModelWeights = fedavg.ModelWeights
+
+eval_state   = eval_process.initialize()
+
+state = process.initialize()
+startup.add("trace", time.perf_counter() - startup_trace)
+
+if computation_hit and init_weights is None:
+    # initialize dari cache membawa bobot awal run pembuat cache → acak ulang dengan SEED run ini
+    state = process.set_model_weights(state, ModelWeights.from_model(build_keras_model()))
+
+if init_weights is not None:
+    # bobot global menggantikan inisialisasi acak sebelum round 1;
+    # state optimizer server tetap baru
+    print(f"🌍 Warm-start dari {'model lokal terakhir' if delta is not None else 'model global'} "
+          f"({ROUNDS} round)")
+    init_model = build_keras_model()
+    init_model.set_weights(init_weights)
+    state = process.set_model_weights(state, ModelWeights.from_model(init_model))
+
+# ============================================================
+# EVALUASI HELD-OUT
+# ============================================================
+def evaluate(model_weights):
+    """(val_acc, val_loss) bobot global saat ini pada klien validasi."""
+    global eval_state
+    eval_state = eval_process.set_model_weights(eval_state, model_weights)
+    eval_state, m = eval_process.next(eval_state, val_clients)
+    m = m["client_work"]["eval"]["current_round_metrics"]
+    return float(m["binary_accuracy"]), float(m["loss"])
+
+# ============================================================
+# TRAINING + HISTORY
+# ============================================================
+history = []
+best = {"round": 0, "val_acc": 0.0, "val_loss": float("inf"), "weights": None}
+start_round = 1
+
+if ckpt:
+    groups = checkpoint.load(SAVE_DIR, ckpt)
+    state = tf.nest.pack_sequence_as(state, groups["state"])
+    if groups["best"]:
+        best["weights"] = tf.nest.pack_sequence_as(process.get_model_weights(state), groups["best"])
+    best.update(ckpt["best"])
+    history = [tuple(h) for h in ckpt["history"]]
+    start_round = ckpt["round"] + 1
+    print(f"♻️ Resume dari checkpoint round {ckpt['round']} (seed {SEED})")
+
+# satu record JSON per round di SAVE_DIR/telemetry.jsonl (Training/telemetry.py)
+tel = telemetry.RoundTelemetry(
+    SAVE_DIR,
+    {
+        "instansi": INSTANSI,
+        "name": NAME,
+        "backend": args.backend,
+        "xla": args.xla,
+        "mixed_precision": args.mixed_precision,
+        "n_clients": N_CLIENTS,
+        "batch_size": BATCH_SIZE,
+        "client_lr": args.client_lr,
+        "server_lr": args.server_lr,
+        "mode": "incremental" if delta is not None else "full",
+        **RUNTIME,
+    },
+    run_id=ckpt.get("run_id") if ckpt else None,
+)
+
+def save_checkpoint(r, round_seconds):
+    info = checkpoint.save(
+        SAVE_DIR, r,
+        {
+            "state": tf.nest.flatten(state),
+            "best": tf.nest.flatten(best["weights"]) if best["weights"] is not None else [],
+        },
+        {
+            "instansi": INSTANSI,
+            "backend": args.backend,
+            "run_id": tel.run_id,
+            "seed": SEED,
+            "feature_dim": FEATURE_DIM,
+            "rounds": ROUNDS,
+            "best": {k: best[k] for k in ("round", "val_acc", "val_loss")},
+            "history": history,
+        },
+    )
+    print(f"💾 Checkpoint round {r}: {info['bytes'] / 1024:.0f} KB, "
+          f"{info['seconds'] * 1000:.0f} ms ({info['seconds'] / round_seconds:.1%} waktu round)")
+
+print("\n🚀 TRAINING START")
+for r in range(start_round, ROUNDS + 1):
+    tel.start(r)
+    with tel.phase("train"):
+        state, metrics = process.next(state, clients)
+
+    m    = metrics["client_work"]["train"]
+    acc  = float(m["binary_accuracy"])
+    loss = float(m["loss"])
+
+    weights = process.get_model_weights(state)
+    with tel.phase("eval"):
+        val_acc, val_loss = evaluate(weights)
+
+    history.append((r, acc, loss, val_acc, val_loss, telemetry.utc_now()))
+    print(f"[{NAME.upper()}] Round {r:02d} | acc={acc:.4f} | loss={loss:.4f} "
+          f"| val_acc={val_acc:.4f} | val_loss={val_loss:.4f} | {tel.elapsed():.1f}s")
+
+    stop = False
+    if val_loss < best["val_loss"] - MIN_DELTA:
+        best.update(round=r, val_acc=val_acc, val_loss=val_loss, weights=weights)
+    elif PATIENCE and r - best["round"] >= PATIENCE:
+        print(f"⏹️ Early stopping: val_loss tidak membaik {PATIENCE} round "
+              f"(terbaik round {best['round']})")
+        stop = True
+
+    if not stop:
+        with tel.phase("checkpoint"):
+            save_checkpoint(r, tel.elapsed())
+
+    first = r == start_round
+    if first:
+        startup.add("first_round", tel.elapsed())
+        print(startup.report())
+    tel.emit(
+        examples=int(m.get("num_examples", n_train)),
+        timing=metrics.get("timing"),
+        startup=startup.summary() if first else None,
+        accuracy=acc, loss=loss, val_accuracy=val_acc, val_loss=val_loss,
+    )
+    if stop:
+        break
+
+if best["weights"] is None:  # val_loss NaN di semua round → pakai bobot terakhir
+    best.update(round=history[-1][0] if history else 0, weights=process.get_model_weights(state))
+
+# ============================================================
+# SIMPAN MODEL KERAS (BOBOT VALIDASI TERBAIK)
+# ============================================================
+keras_model = build_keras_model()
+
+best["weights"].assign_weights_to(keras_model)
+keras_model.save(SAVE_DIR, include_optimizer=False)
+
+# ============================================================
+# SIMPAN MODEL .NPZ
+# ============================================================
+timestamp = time.strftime("%Y%m%d_%H%M%S")
+np.savez_compressed(
+    SAVE_DIR / f"{INSTANSI}_{timestamp}.npz",
+    *keras_model.get_weights()
+)
+
+# ============================================================
+# SIMPAN PREPROCESS
+# ============================================================
+# {"FEATURE_COLS", "mins", "rng"} sudah dibuat bersama cache preprocessing;
+# incremental: scaler dengan min/max berjalan yang diperluas baris baru
+if delta is None:
+    shutil.copyfile(data["preprocess_path"], SAVE_DIR / "preprocess.pkl")
+else:
+    joblib.dump(delta["preprocess"], SAVE_DIR / "preprocess.pkl")
+
+# ============================================================
+# SIMPAN HISTORY LOG
+# ============================================================
+HISTORY_HEADER = "round\taccuracy\tloss\tval_accuracy\tval_loss\ttimestamp"
+history_path = SAVE_DIR / "accuracy_history.txt"
+if history_path.exists() and history_path.read_text().splitlines()[:1] != [HISTORY_HEADER]:
+    # log format lama (tanpa kolom validasi) disimpan terpisah
+    history_path.replace(SAVE_DIR / "accuracy_history_old.txt")
+if not history_path.exists():
+    history_path.write_text(HISTORY_HEADER + "\n")
+
+with open(history_path, "a", encoding="utf-8") as f:
+    # timestamp = saat round selesai (checkpoint lama belum menyimpannya)
+    for r, acc, loss, val_acc, val_loss, *ts in history:
+        f.write(
+            f"{r}\t{acc:.6f}\t{loss:.6f}\t{val_acc:.6f}\t{val_loss:.6f}\t"
+            f"{ts[0] if ts else telemetry.utc_now()}\n"
+        )
+
+# ============================================================
+# BEST ACCURACY (VALIDASI, ROUND DENGAN VAL_LOSS TERBAIK)
+# ============================================================
+best_acc = best["val_acc"]
+(SAVE_DIR / "best_accuracy.txt").write_text(f"{best_acc:.6f}\n")
+
+# watermark → run --incremental berikutnya mulai dari baris setelah data ini
+if delta is None:
+    watermark = incremental.full_watermark(
+        DATA_PATH, data["csv_bytes"], data["csv_sha256"], FEATURE_LIST, len(X_scaled),
+        data["mins"], data["rng"],
+    )
+else:
+    watermark = delta["watermark"]
+watermark.update(model=f"{INSTANSI}_{timestamp}.npz", updated_at=telemetry.utc_now())
+incremental.save_watermark(SAVE_DIR, watermark)
+
+# artefak akhir lengkap → checkpoint tidak diperlukan lagi
+checkpoint.clear(SAVE_DIR)
+
+# ============================================================
+# SELESAI
+# ============================================================
+print("\n✅ TRAINING SELESAI")
+print(f"📂 Model        : {SAVE_DIR}")
+print(f"🏆 Best Val Acc : {best_acc:.4f} (round {best['round']}, val_loss={best['val_loss']:.4f})")
+print(f"📈 History file : accuracy_history.txt")
+print(f"💾 Weights NPZ  : {INSTANSI}_{timestamp}.npz")